@@ -0,0 +1,395 @@
+"""Análisis semántico en paralelo de las funciones del nivel global (ver CompileSession.procesosSemantico).
+
+Las definiciones de función del nivel global se reconocen en los tokens antes de parsear (ver
+funcionesGlobales) y se sacan del stream. El proceso principal parsea y analiza el resto (el código
+global) y, cada vez que el parseo pasa por el lugar de una función, le aplica a la TS global lo que
+habría hecho su definición y la manda a un pool de procesos junto con una foto de los símbolos
+globales de ese momento. Cada worker parsea y analiza el cuerpo con una Escucha común sobre esa foto.
+
+Al final se juntan los resultados en el orden del fuente: los diagnósticos se vuelven a reportar en
+la sesión en el orden en que los habría encontrado el análisis en serie, los contextos de cada
+función se insertan en el historial de la TS donde habrían estado, y lo que cada función hizo con
+los símbolos globales (usarlos, inicializarlos, leerlos o escribirlos) se aplica antes del análisis
+de flujo del código global. El resultado es el mismo que el de una sola Escucha.
+
+Si algo no encaja (menos de dos funciones, un error sintáctico, una decisión que SLL no alcanza a
+tomar) no se devuelve árbol y la compilación se hace en serie, desde cero.
+
+El demonio de compilación (ver Demonio) usa el mismo esquema sin el pool: con un AnalisisIncremental
+en la sesión, las funciones que no cambiaron desde la compilación anterior no se vuelven a analizar.
+"""
+import itertools
+from concurrent.futures import Future, ProcessPoolExecutor
+from antlr4 import CommonTokenStream, Token
+from antlr4.ListTokenSource import ListTokenSource
+from antlr4.Token import CommonToken
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorStrategy import BailErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from compiladorParser import compiladorParser
+from CompileSession import CompileSession
+from Escucha import Escucha
+from tablaDeSimbolos.Variable import Variable
+from tablaDeSimbolos.Funcion import Funcion
+
+P = compiladorParser
+_TIPOS = (P.INT, P.DOUBLE, P.CHAR, P.VOID)
+_FIN_DE_INSTRUCCION = (None, P.PYC, P.LLC) # lo que puede venir justo antes de una definición global
+
+
+def _cierre(tokens: list, i: int, abre: int, cierra: int) -> int:
+    """Índice siguiente al token que cierra el que está en `i` (que es `abre`), o None si no se cierra."""
+    nivel = 0
+    for j in range(i, len(tokens)):
+        tipo = tokens[j].type
+        if tipo == abre:
+            nivel += 1
+        elif tipo == cierra:
+            nivel -= 1
+            if nivel == 0:
+                return j + 1
+    return None
+
+
+def funcionesGlobales(tokens: list) -> list:
+    """Tramos [inicio, fin) de `tokens` con las definiciones de función del nivel global, sin parsear.
+
+    Una definición global es `tipo ID ( ... ) { ... }` fuera de toda llave y paréntesis, justo después
+    de una instrucción completa (`;` o `}`) o al principio. Las que van seguidas de un `else` quedan
+    en su lugar: sin ellas el `else` se pegaría a un if anterior. Con errores de sintaxis esto puede
+    equivocarse, pero entonces también falla el parseo y se vuelve a compilar en serie.
+    """
+    tramos = []
+    llaves = parentesis = 0
+    anterior = None
+    i = 0
+    while i < len(tokens):
+        tipo = tokens[i].type
+        if (llaves == parentesis == 0 and tipo in _TIPOS and anterior in _FIN_DE_INSTRUCCION and i + 2 < len(tokens)
+                and tokens[i + 1].type == P.ID and tokens[i + 2].type == P.PA):
+            cuerpo = _cierre(tokens, i + 2, P.PA, P.PC)
+            if cuerpo is not None and tokens[cuerpo].type == P.LLA:
+                fin = _cierre(tokens, cuerpo, P.LLA, P.LLC)
+                if fin is None:
+                    break
+                if tokens[fin].type != P.ELSE:
+                    tramos.append((i, fin))
+                    i = fin
+                    anterior = P.LLC
+                    continue
+        if tipo == P.LLA:
+            llaves += 1
+        elif tipo == P.LLC:
+            llaves = max(0, llaves - 1)
+        elif tipo == P.PA:
+            parentesis += 1
+        elif tipo == P.PC:
+            parentesis = max(0, parentesis - 1)
+        anterior = tipo
+        i += 1
+    return tramos
+
+
+def _describir(simbolo) -> tuple:
+    """Descripción inmutable de un símbolo global, para mandarla a los workers."""
+    if isinstance(simbolo, Funcion):
+        return ("f", simbolo.getNombre(), simbolo.getTipoDato(), tuple((a.getNombre(), a.getTipoDato()) for a in simbolo.getListaArgs()))
+    return ("v", simbolo.getNombre(), simbolo.getTipoDato())
+
+
+def _simbolo(descripcion: tuple):
+    if descripcion[0] == "f":
+        return Funcion(descripcion[1], descripcion[2], [Variable(nombre, tipo) for nombre, tipo in descripcion[3]])
+    return Variable(descripcion[1], descripcion[2])
+
+
+def _cabecera(tokens: list) -> tuple:
+    """(nombre, tipo de retorno, parámetros) de una definición, leídos de sus tokens (tipo, texto, línea, columna)."""
+    params = []
+    i = 3
+    while i + 1 < len(tokens) and tokens[i][0] in _TIPOS and tokens[i + 1][0] == P.ID:
+        params.append(Variable(tokens[i + 1][1], tokens[i][1]))
+        i += 2
+        if tokens[i][0] != P.COMA:
+            break
+        i += 1
+    return tokens[1][1], tokens[0][1], params
+
+
+# ------------------------------
+# Worker
+# ------------------------------
+def _analizarLote(globales: list, trabajos: list) -> list:
+    """Analiza un lote de funciones. Cada trabajo es (tokens, cantidad de globales que ve, si su nombre ya está definido)."""
+    return [_analizarFuncion(globales[:visibles], tokens, definida) for tokens, visibles, definida in trabajos]
+
+
+def _analizarFuncion(globales: list, tokens: list, definida: bool) -> dict:
+    """Parsea y analiza una definición sobre los símbolos globales dados. None si tiene errores sintácticos."""
+    for modo in (PredictionMode.SLL, PredictionMode.LL):
+        sesion = CompileSession(rutaTS=None, eco=False)
+        simbolos = [_simbolo(descripcion) for descripcion in globales]
+        for simbolo in simbolos:
+            sesion.TS.addSimbolo(simbolo)
+        propia = sesion.TS.buscarSimbolo(tokens[1][1])
+        if isinstance(propia, Funcion) and definida:
+            propia.setInicializado()
+
+        lista = []
+        for tipo, texto, linea, columna in tokens:
+            token = CommonToken(type=tipo)
+            token.text, token.line, token.column = texto, linea, columna
+            lista.append(token)
+        parser = compiladorParser(CommonTokenStream(ListTokenSource(lista)))
+        parser.removeErrorListeners()
+        parser._interp.predictionMode = modo
+        parser._errHandler = BailErrorStrategy()
+        escucha = Escucha(sesion)
+        parser.addParseListener(escucha)
+        try:
+            parser.funcion()
+        except ParseCancellationException:
+            continue
+        if parser.getCurrentToken().type != Token.EOF:
+            return None
+        return {
+            "diagnosticos": [(d.tipo, d.codigo, d.mensaje, d.linea, d.columna) for d in sesion.diagnosticos.registros],
+            "suprimidos": sesion.diagnosticos.suprimidos,
+            "contextos": sesion.TS.historialCTX[1:],
+            "usadas": [s.getNombre() for s in simbolos if s.getUsado()],
+            "inicializadas": [s.getNombre() for s in simbolos if s.getInicializado()],
+            "efectos": [(funcion.getNombre(), [s.getNombre() for s in simbolos if s in escritas],
+                         [s.getNombre() for s in simbolos if s in leidas], [llamada.getNombre() for llamada in llamadasSeguras],
+                         [llamada.getNombre() for llamada in llamadas])
+                        for funcion, (escritas, leidas, llamadasSeguras, llamadas) in escucha._efectosDeFunciones.items()],
+        }
+    return None
+
+
+# ------------------------------
+# Proceso principal
+# ------------------------------
+class _Pendiente:
+    """Una definición global sacada del stream: dónde estaba y sus tokens."""
+    __slots__ = ("inicio", "tokens", "segmento", "historial")
+
+    def __init__(self, inicio: int, tokens: list):
+        self.inicio = inicio # posición en el fuente de su primer caracter
+        self.tokens = tokens
+        self.segmento = None # diagnósticos del código global anteriores a la función
+        self.historial = None # contextos de la TS anteriores a la función
+
+
+class EscuchaParalela(Escucha):
+    """Escucha del código global: las funciones que se sacaron del stream se analizan en el pool.
+
+    Los diagnósticos del código global se guardan hasta el final para intercalarlos con los de las funciones.
+    """
+
+    def __init__(self, sesion: CompileSession, funciones: list, analizador):
+        super().__init__(sesion)
+        self.funciones = funciones
+        self.fallida = False # alguna función tuvo un error sintáctico: hay que compilar en serie
+        self._analizador = analizador # Repartidor o AnalisisIncremental
+        self._tamanoLote = analizador.tamanoLote(len(funciones))
+        self._siguiente = 0 # próxima función por aplicar
+        self._globales = [] # descripción de cada símbolo del contexto global, en orden de declaración
+        self._lote = []
+        self._lotes = [] # futures, en orden
+        self._diagnosticos = [] # del código global, todavía sin reportar
+        self._analizando = True
+
+    def registrarError(self, tipo, codigo, msj, nodo=None):
+        if self._analizando:
+            self._diagnosticos.append((tipo, codigo, msj, *self.posicion(nodo)))
+        else:
+            super().registrarError(tipo, codigo, msj, nodo)
+
+    def enterInstruccion(self, ctx):
+        self._alcanzar(ctx.start.start)
+        super().enterInstruccion(ctx)
+
+    def exitPrograma(self, ctx):
+        self._alcanzar(None)
+        self._enviar()
+        resultados = [resultado for lote in self._lotes for resultado in lote.result()]
+        if any(resultado is None for resultado in resultados):
+            self.fallida = True
+            return
+        self._juntar(resultados)
+        self._analizando = False
+        super().exitPrograma(ctx)
+
+    def _alcanzar(self, posicion: int):
+        """Aplica las funciones que en el fuente estaban antes de `posicion` (todas, si es None)."""
+        while self._siguiente < len(self.funciones) and (posicion is None or self.funciones[self._siguiente].inicio < posicion):
+            self._aplicar(self.funciones[self._siguiente])
+            self._siguiente += 1
+
+    def _aplicar(self, funcion: _Pendiente):
+        """Lo que hace la definición en la TS global (ver Escucha.declararFuncion), y el pedido de su análisis."""
+        globales = self.TS.contextos[0].simbolos
+        for simbolo in itertools.islice(globales.values(), len(self._globales), None):
+            self._globales.append(_describir(simbolo))
+
+        funcion.segmento = len(self._diagnosticos)
+        funcion.historial = len(self.TS.historialCTX)
+        nombre, tipo, args = _cabecera(funcion.tokens)
+        existente = globales.get(nombre)
+        definida = isinstance(existente, Funcion) and existente.getInicializado()
+        self._lote.append((funcion.tokens, len(self._globales), definida))
+        if existente is None:
+            self.TS.addSimbolo(Funcion(nombre, tipo, args, inicializado=True))
+        elif isinstance(existente, Funcion):
+            existente.setInicializado()
+        if len(self._lote) >= self._tamanoLote:
+            self._enviar()
+
+    def _enviar(self):
+        if not self._lote:
+            return
+        self._lotes.append(self._analizador.enviar(self._globales[:self._lote[-1][1]], self._lote))
+        self._lote = []
+
+    def _juntar(self, resultados: list):
+        """Reporta los diagnósticos en el orden del fuente y aplica lo que hizo cada función con los símbolos globales."""
+        globales = self.TS.contextos[0].simbolos
+        historial = []
+        reportados = anterior = 0
+        for funcion, resultado in zip(self.funciones, resultados):
+            for diagnostico in self._diagnosticos[reportados:funcion.segmento]:
+                self.sesion.reportar(*diagnostico)
+            reportados = funcion.segmento
+            for diagnostico in resultado["diagnosticos"]:
+                self.sesion.reportar(*diagnostico)
+            self.sesion.diagnosticos.suprimidos += resultado["suprimidos"]
+
+            historial.extend(self.TS.historialCTX[anterior:funcion.historial])
+            historial.extend(resultado["contextos"])
+            anterior = funcion.historial
+
+            for nombre in resultado["usadas"]:
+                globales[nombre].setUsado()
+            for nombre in resultado["inicializadas"]:
+                globales[nombre].setInicializado()
+            for nombre, escritas, leidas, llamadasSeguras, llamadas in resultado["efectos"]:
+                self._efectosDeFunciones[globales[nombre]] = ({globales[variable] for variable in escritas},
+                                                              {globales[variable] for variable in leidas},
+                                                              {globales[llamada] for llamada in llamadasSeguras},
+                                                              {globales[llamada] for llamada in llamadas})
+
+        for diagnostico in self._diagnosticos[reportados:]:
+            self.sesion.reportar(*diagnostico)
+        historial.extend(self.TS.historialCTX[anterior:])
+        self.TS.historialCTX[:] = historial
+
+
+class Repartidor:
+    """Manda los lotes de funciones a un pool de procesos, que se crea con el primero."""
+    minimo = 2 # con menos funciones no vale la pena levantar el pool
+
+    def __init__(self, procesos: int):
+        self.procesos = procesos
+        self._pool = None
+
+    def tamanoLote(self, funciones: int) -> int:
+        # Lotes chicos: menos viajes entre procesos sin desbalancear la carga (como en Lotes)
+        return max(1, funciones // (self.procesos * 4))
+
+    def enviar(self, globales: list, trabajos: list) -> Future:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos)
+        return self._pool.submit(_analizarLote, globales, trabajos)
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+
+class AnalisisIncremental:
+    """Los resultados de las funciones globales de un archivo, de una compilación a la siguiente (ver Demonio).
+
+    Una función se vuelve a analizar solo si cambió su texto, su columna o lo que ve del nivel global
+    (los símbolos declarados antes que ella). Si solo se corrió de línea, se reutiliza su resultado
+    (diagnósticos y contextos de la TS) con las líneas desplazadas. Se guardan solo las funciones de
+    la última compilación.
+    """
+    minimo = 1
+
+    def __init__(self):
+        self._anteriores = {}
+        self._actuales = {}
+        self.estadisticas = {"reutilizadas": 0, "analizadas": 0}
+
+    def tamanoLote(self, funciones: int) -> int:
+        return funciones
+
+    def enviar(self, globales: list, trabajos: list) -> Future:
+        resultados = []
+        for tokens, visibles, definida in trabajos:
+            linea = tokens[0][2]
+            clave = (tuple((tipo, texto, l - linea, columna) for tipo, texto, l, columna in tokens), tuple(globales[:visibles]), definida)
+            guardado = self._actuales.get(clave) or self._anteriores.get(clave)
+            if guardado is None:
+                resultado = _analizarFuncion(globales[:visibles], tokens, definida)
+                self.estadisticas["analizadas"] += 1
+                if resultado is not None:
+                    self._actuales[clave] = self._desplazar(resultado, 1 - linea)
+            else:
+                self._actuales[clave] = guardado
+                resultado = self._desplazar(guardado, linea - 1)
+                self.estadisticas["reutilizadas"] += 1
+            resultados.append(resultado)
+        futuro = Future()
+        futuro.set_result(resultados)
+        return futuro
+
+    @staticmethod
+    def _desplazar(resultado: dict, lineas: int) -> dict:
+        if not lineas:
+            return resultado
+        diagnosticos = [(tipo, codigo, mensaje, linea + lineas if linea is not None else None, columna)
+                        for tipo, codigo, mensaje, linea, columna in resultado["diagnosticos"]]
+        return {**resultado, "diagnosticos": diagnosticos}
+
+    def cerrar(self):
+        self._anteriores, self._actuales = self._actuales, {}
+
+
+def parsearEnParalelo(stream: CommonTokenStream, sesion: CompileSession, envolver=None):
+    """Parsea y analiza el programa con las funciones globales repartidas en `sesion.procesosSemantico`
+    procesos o, si la sesión tiene un AnalisisIncremental, reutilizando las que no cambiaron.
+
+    Devuelve el árbol (sin las funciones globales) o None si hay que compilar en serie; en ese caso la
+    sesión puede haber quedado a medias. `envolver` recibe la escucha y devuelve el listener que se
+    registra en el parser (para el perfilador).
+    """
+    stream.fill()
+    tokens = stream.tokens
+    tramos = funcionesGlobales(tokens)
+    analizador = sesion.incremental or Repartidor(sesion.procesosSemantico)
+    if len(tramos) < analizador.minimo:
+        return None
+
+    restantes = []
+    funciones = []
+    anterior = 0
+    for inicio, fin in tramos:
+        restantes.extend(t.clone() for t in tokens[anterior:inicio])
+        funciones.append(_Pendiente(tokens[inicio].start, [(t.type, t.text, t.line, t.column) for t in tokens[inicio:fin]]))
+        anterior = fin
+    restantes.extend(t.clone() for t in tokens[anterior:])
+
+    parser = compiladorParser(CommonTokenStream(ListTokenSource(restantes)))
+    parser.removeErrorListeners()
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    escucha = EscuchaParalela(sesion, funciones, analizador)
+    parser.addParseListener(escucha if envolver is None else envolver(escucha))
+    try:
+        tree = parser.programa()
+    except ParseCancellationException:
+        return None
+    finally:
+        analizador.cerrar()
+    return None if escucha.fallida else tree
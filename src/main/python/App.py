@@ -1,16 +1,14 @@
+import os
 import sys
-from antlr4 import *
-from compiladorLexer  import compiladorLexer
-from compiladorParser import compiladorParser
-from Escucha import Escucha
-from EscuchaErroresSintacticos import EscuchaErroresSintacticos
-from Caminante import Caminante
+import argparse
+from Optimizador import PASES
+from tablaDeSimbolos.Exportadores import EXPORTADORES
 
 # En caso de no poder ejecutar el programa Python por
 # problemas de version (error ATNdeserializer), se
 # pueden generar los archivos a mano.
 #
-# Ir a la carpeta donde esta el archivo .g4 y ejecutar 
+# Ir a la carpeta donde esta el archivo .g4 y ejecutar
 #     antlr4 -Dlanguage=Python3 -visitor compilador.g4 -o .
 
 def main(argv):
@@ -19,28 +17,183 @@ def main(argv):
     archivo = "input/entradaConErrores.txt"
     # archivo = "input/entradaCorrecta.txt"
 
-    if len(argv) > 1 :
-        archivo = argv[1]
-    input = FileStream(archivo)
-    lexer = compiladorLexer(input)
-    stream = CommonTokenStream(lexer)
-    parser = compiladorParser(stream)
+    argumentos = argparse.ArgumentParser(description="Compilador DHS2025")
+    argumentos.add_argument("entradas", nargs="*", help="archivo fuente, o - para leerlo de la entrada estándar (o, con --lote, archivos, directorios y globs)")
+    argumentos.add_argument("--mmap", action="store_true",
+                            help="lee el fuente mapeado en memoria y de a bloques, guardando solo los últimos tokens (para fuentes muy grandes; sin caché)")
+    argumentos.add_argument("--ts", default="ContenidoTS.txt", metavar="RUTA", help="archivo donde se escribe la tabla de símbolos")
+    argumentos.add_argument("--formato-ts", choices=list(EXPORTADORES), default="texto", help="formato del archivo de la tabla de símbolos")
+    argumentos.add_argument("--sin-ts", action="store_true", help="no exporta la tabla de símbolos (solo diagnósticos)")
+    argumentos.add_argument("--lote", action="store_true", help="compila muchos archivos en paralelo con un pool de procesos")
+    argumentos.add_argument("--procesos", type=int, default=None, help="cantidad de workers del modo lote (por defecto, uno por CPU)")
+    argumentos.add_argument("--patron", default="*.txt", help="patrón de archivos a buscar dentro de los directorios del lote")
+    argumentos.add_argument("--salida", default=None, help="directorio donde el modo lote vuelca la TS de cada archivo (por defecto no se genera)")
+    argumentos.add_argument("--enlazar", action="store_true",
+                            help="compila cada entrada (fuente o .obj) a un archivo objeto, solo si cambió, y las enlaza en el programa de --tac")
+    argumentos.add_argument("--objetos", default="objetos", metavar="DIR", help="directorio de los archivos objeto del modo --enlazar")
+    argumentos.add_argument("--semantico-paralelo", nargs="?", type=int, const=0, default=None, metavar="N",
+                            help="analiza las funciones globales en N procesos (por defecto, uno por CPU); la salida es la misma que en serie")
+    argumentos.add_argument("--demonio", default=None, metavar="SOCKET",
+                            help="compila con el demonio que atiende en SOCKET (ver Demonio.py), que ya tiene el parser cargado")
+    argumentos.add_argument("--ll", action="store_true", help="parsea directamente con LL completo, sin intentar antes la etapa SLL")
+    argumentos.add_argument("--estadisticas", action="store_true", help="informa qué etapa de parseo resolvió cada compilación")
+    argumentos.add_argument("--tac", default=None, metavar="RUTA", help="genera el código de tres direcciones en RUTA")
+    argumentos.add_argument("--optimizar", action="store_true", help="optimiza el código de tres direcciones generado con --tac")
+    argumentos.add_argument("--sin-pase", action="append", default=[], choices=PASES, metavar="PASE",
+                            help=f"desactiva un pase del optimizador (se puede repetir): {', '.join(PASES)}")
+    argumentos.add_argument("--reusar-temporales", action="store_true",
+                            help="reasigna los temporales de cada función del código de --tac para que reutilicen los mismos lugares")
+    argumentos.add_argument("--max-temporales", type=int, default=None, metavar="N",
+                            help="con --reusar-temporales, guarda en la pila los temporales que pasan de N vivos a la vez (implica --reusar-temporales)")
+    argumentos.add_argument("--ejecutar", action="store_true", help="ejecuta el código de tres direcciones generado con --tac en la máquina virtual")
+    argumentos.add_argument("--max-errores", type=int, default=None, metavar="N",
+                            help="detiene el parseo y el análisis semántico al llegar a N errores")
+    argumentos.add_argument("--formato", choices=["texto", "json"], default="texto", help="formato de salida de los diagnósticos")
+    argumentos.add_argument("--cache", nargs="?", const=".cacheCompilador", default=None, metavar="DIR",
+                            help="reutiliza los resultados de compilaciones anteriores del mismo fuente, guardados en DIR (por defecto .cacheCompilador)")
+    argumentos.add_argument("--cache-dfa", nargs="?", const=".cacheCompilador", default=None, metavar="DIR",
+                            help="arranca con los DFA de predicción que dejaron compilaciones anteriores, guardados en DIR, y los actualiza al terminar")
+    argumentos.add_argument("--cache-max", type=float, default=64, metavar="MB", help="tamaño máximo del caché; se desalojan las entradas usadas hace más tiempo")
+    argumentos.add_argument("--profile", nargs="?", const="-", default=None, metavar="RUTA",
+                            help="mide tiempo, CPU y memoria de cada fase y escribe el JSON en RUTA (sin RUTA, por consola)")
+    args = argumentos.parse_args(argv[1:])
+    if args.max_temporales is not None and args.max_temporales < 1:
+        argumentos.error("--max-temporales tiene que ser al menos 1")
+    if args.demonio:
+        # Opciones del proceso que compila: el demonio tiene su propio caché, y no mide ni ejecuta para el cliente
+        locales = {"--ejecutar": args.ejecutar, "--estadisticas": args.estadisticas, "--profile": args.profile,
+                   "--mmap": args.mmap, "--cache": args.cache, "--cache-dfa": args.cache_dfa,
+                   "--semantico-paralelo": args.semantico_paralelo is not None}
+        noSoportadas = [opcion for opcion, valor in locales.items() if valor]
+        if noSoportadas:
+            argumentos.error(f"{', '.join(noSoportadas)}: no se puede(n) usar con --demonio")
 
-    # Eliminación del ErrorListener por defecto
-    parser.removeErrorListeners()
-    escuchaErroresSintacticos = EscuchaErroresSintacticos()
-    parser.addErrorListener(escuchaErroresSintacticos)
+    if args.lote:
+        # Import diferido: el proceso padre no necesita cargar el parser, solo los workers
+        from Lotes import ejecutarLote
+        resumen = ejecutarLote(args.entradas, args.procesos, args.patron, args.profile,
+                               directorioTS=None if args.sin_ts else args.salida, formatoTS=args.formato_ts,
+                               dosEtapas=not args.ll, maxErrores=args.max_errores, formato=args.formato,
+                               directorioCache=args.cache, maxBytesCache=int(args.cache_max * 1024 * 1024))
+        return 1 if resumen["conErrores"] else 0
 
-    escucha = Escucha()
-    parser.addParseListener(escucha)
+    if args.entradas :
+        archivo = args.entradas[0]
 
-    tree = parser.programa()
+    pasesTAC = [p for p in PASES if p not in args.sin_pase] if args.optimizar else None
 
-    # visitante = Caminante()
-    # visitante.visitPrograma(tree)
-    
-    # print(escucha)
-    # print(tree.toStringTree(recog=parser))
+    if args.enlazar:
+        return enlazar(args.entradas, args.objetos, args.tac or "programa.tac", pasesTAC, args)
+
+    if args.demonio:
+        return compilarEnDemonio(archivo, args)
+
+    from Compilador import compilar, estadisticasParseo
+    from CompileSession import CompileSession
+    perfilador = None
+    if args.profile:
+        from Perfilador import Perfilador
+        perfilador = Perfilador()
+    cache = None
+    if args.cache:
+        from Cache import CacheCompilacion
+        cache = CacheCompilacion(args.cache, int(args.cache_max * 1024 * 1024))
+
+    cacheDFA = None
+    if args.cache_dfa:
+        from CacheDFA import CacheDFA
+        cacheDFA = CacheDFA(args.cache_dfa)
+        cacheDFA.cargar()
+
+    procesosSemantico = None
+    if args.semantico_paralelo is not None:
+        procesosSemantico = args.semantico_paralelo or os.cpu_count() or 1
+
+    resultado = compilar(archivo, CompileSession(archivo, rutaTS=None if args.sin_ts else args.ts, formatoTS=args.formato_ts,
+                                                  perfilador=perfilador, maxErrores=args.max_errores,
+                                                  formato=args.formato, rutaTAC=args.tac, pasesTAC=pasesTAC, cache=cache,
+                                                  procesosSemantico=procesosSemantico,
+                                                  reusarTemporales=args.reusar_temporales or args.max_temporales is not None,
+                                                  maxTemporales=args.max_temporales),
+                         dosEtapas=not args.ll, mapeado=args.mmap)
+
+    if cacheDFA is not None:
+        cacheDFA.guardar()
+    if perfilador is not None:
+        from Perfilador import escribirJSON
+        escribirJSON({"archivo": archivo, "segundos": resultado["segundos"], "fallbackLL": resultado["fallbackLL"], **resultado["perfil"]}, args.profile)
+    if args.ejecutar:
+        ejecutar(args.tac, resultado)
+    if args.estadisticas:
+        print(f"Parseo: {estadisticasParseo['sll']} resuelto(s) con SLL, {estadisticasParseo['fallbackLL']} con reparseo LL")
+        if procesosSemantico is not None:
+            print(f"Semántico: {estadisticasParseo['paralelo']} compilación(es) con las funciones en paralelo")
+        if cache is not None:
+            print(cache.resumen())
+        if cacheDFA is not None:
+            print(cacheDFA.resumen())
+
+def enlazar(entradas: list, directorio: str, rutaTAC: str, pasesTAC, args) -> int:
+    """Modo --enlazar: recompila los módulos que cambiaron, los enlaza e informa los errores de cada módulo y del enlace."""
+    from Enlazador import construir
+    construccion = construir(entradas, directorio, rutaTAC, pasesTAC, args.max_errores, dosEtapas=not args.ll)
+    for resultado in construccion["compilados"]:
+        if resultado["diagnosticos"]:
+            print(f"===== {resultado['archivo']} =====")
+            for linea in resultado["diagnosticos"]:
+                print(linea)
+    for linea in construccion["enlace"].textos():
+        print(linea)
+
+    print(f"Módulos: {construccion['modulos']} ({len(construccion['compilados'])} compilado(s), {construccion['reutilizados']} sin cambios)")
+    if construccion["instrucciones"] is None:
+        print("No se enlazó el programa: hay errores.")
+        return 1
+    print(f"Programa enlazado: {construccion['instrucciones']} instrucciones en {rutaTAC}")
+    if args.ejecutar:
+        ejecutar(rutaTAC, {"codigoIntermedio": {"despues": construccion["instrucciones"]}})
+    return 0
+
+def compilarEnDemonio(archivo: str, args) -> int:
+    """Modo --demonio: el demonio compila el archivo y escribe la TS y el código donde los dejaría App."""
+    from Demonio import pedir, ErrorPedido
+    params = {"formato": args.formato, "formatoTS": args.formato_ts, "maxErrores": args.max_errores, "ll": args.ll,
+              "reusarTemporales": args.reusar_temporales or args.max_temporales is not None, "maxTemporales": args.max_temporales}
+    if archivo == "-": # el demonio no ve la entrada estándar del cliente: se le manda el texto
+        params["archivo"] = archivo
+        params["texto"] = sys.stdin.read()
+    else:
+        params["archivo"] = os.path.abspath(archivo)
+    if args.optimizar:
+        params["pases"] = [p for p in PASES if p not in args.sin_pase]
+    if not args.sin_ts:
+        params["ts"] = os.path.abspath(args.ts)
+    if args.tac:
+        params["tac"] = os.path.abspath(args.tac)
+    try:
+        resultado = pedir(args.demonio, "compilar", params)
+    except (OSError, ErrorPedido) as error:
+        print(f"No se pudo compilar con el demonio: {error}")
+        return 1
+    sys.stdout.write(resultado["salida"])
+    return 1 if resultado["huboErrores"] else 0
+
+def ejecutar(rutaTAC: str, resultado: dict):
+    """Corre en la máquina virtual el código que dejó la compilación e informa cuánto ejecutó y el estado final."""
+    if rutaTAC is None or resultado["codigoIntermedio"] is None:
+        print("No se ejecuta: no se generó código intermedio (ver --tac).")
+        return
+    from MaquinaVirtual import MaquinaVirtual, ErrorEjecucion
+    maquina = MaquinaVirtual.desdeArchivo(rutaTAC)
+    try:
+        e = maquina.ejecutar()
+    except ErrorEjecucion as error:
+        print(f"ERROR DE EJECUCION: {error}")
+        return
+    print(f"Ejecución: {e['ejecutadas']} instrucciones ejecutadas ({e['instrucciones']} en el programa) en {e['segundos'] * 1000:.1f} ms, "
+          f"{e['opsPorSegundo']:.0f} ops/s, {e['llamadas']} llamadas (profundidad máxima {e['profundidadMaxima']})")
+    for nombre, valor in maquina.valores().items():
+        print(f"    {nombre} = {valor}")
 
 if __name__ == '__main__':
-    main(sys.argv)
\ No newline at end of file
+    sys.exit(main(sys.argv))
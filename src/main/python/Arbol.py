@@ -0,0 +1,296 @@
+"""Árbol sintáctico abstracto (AST) compacto, bajado del árbol de parseo mientras se parsea.
+
+El árbol de ANTLR tiene un contexto por cada nivel de precedencia (opal, expOR, expAND, ...,
+factorSufix, factorCore) aunque la expresión sea un solo número, más los tokens y los nodos vacíos
+de las reglas opcionales. Escucha baja cada regla a un nodo de este módulo al salir de ella:
+- las cadenas de operadores quedan como operaciones binarias asociadas a izquierda, y los niveles
+  con un único operando (y los paréntesis) desaparecen;
+- una expresión cuyo valor se conoce al compilar queda como una Constante;
+- las reglas de listas (instrucciones, argumentos, parámetros) quedan como listas de Python.
+Ya bajado, el contexto de ANTLR suelta sus hijos, así que el árbol de parseo entero nunca está en memoria.
+
+Los nodos usan __slots__ y su clase es un entero (`clase`, un atributo de la clase, no de cada nodo)
+para despachar con una tabla. La posición de cada nodo es el token de ANTLR donde empieza, que ya
+está guardado en el stream de tokens.
+"""
+
+# Clase de cada nodo
+PROGRAMA = 0
+BLOQUE = 1
+DECLARACION = 2
+ASIGNACION = 3
+SI = 4
+MIENTRAS = 5
+PARA = 6
+PROTOTIPO = 7
+FUNCION = 8
+RETORNO = 9
+LLAMADA = 10     # expresión, o instrucción si aparece sola
+CONSTANTE = 11
+NOMBRE = 12
+BINARIA = 13
+NEGACION = 14
+INCREMENTO = 15
+
+CLASES = 16
+
+
+class Nodo:
+    __slots__ = ("token",)
+    clase = None
+
+    def hijos(self) -> list:
+        return []
+
+
+# ------------------------------
+# Instrucciones
+# ------------------------------
+class Programa(Nodo):
+    __slots__ = ("instrucciones",)
+    clase = PROGRAMA
+
+    def __init__(self, instrucciones: list, token=None):
+        self.instrucciones = instrucciones
+        self.token = token
+
+    def hijos(self):
+        return self.instrucciones
+
+
+class Bloque(Nodo):
+    __slots__ = ("instrucciones",)
+    clase = BLOQUE
+
+    def __init__(self, instrucciones: list, token=None):
+        self.instrucciones = instrucciones
+        self.token = token
+
+    def hijos(self):
+        return self.instrucciones
+
+
+class Declaracion(Nodo):
+    """`tipo a = x, b;`: cada declarador es (nombre, token del nombre, inicializador o None)."""
+    __slots__ = ("tipo", "declaradores", "eventos")
+    clase = DECLARACION
+
+    def __init__(self, tipo: str, declaradores: list, token=None):
+        self.tipo = tipo
+        self.declaradores = declaradores
+        self.token = token
+        self.eventos = None # (inicio, fin) en la lista de eventos de Escucha
+
+    def hijos(self):
+        return [valor for _, _, valor in self.declaradores if valor is not None]
+
+
+class Asignacion(Nodo):
+    __slots__ = ("nombre", "valor", "eventos")
+    clase = ASIGNACION
+
+    def __init__(self, nombre: str, valor, token=None):
+        self.nombre = nombre
+        self.valor = valor
+        self.token = token
+        self.eventos = None
+
+    def hijos(self):
+        return [self.valor] if self.valor is not None else []
+
+
+class Si(Nodo):
+    __slots__ = ("condicion", "entonces", "sino", "eventosCondicion")
+    clase = SI
+
+    def __init__(self, condicion, entonces, sino, token=None):
+        self.condicion = condicion
+        self.entonces = entonces
+        self.sino = sino
+        self.token = token
+        self.eventosCondicion = None
+
+    def hijos(self):
+        return [h for h in (self.condicion, self.entonces, self.sino) if h is not None]
+
+
+class Mientras(Nodo):
+    __slots__ = ("condicion", "cuerpo", "eventosCondicion")
+    clase = MIENTRAS
+
+    def __init__(self, condicion, cuerpo, token=None):
+        self.condicion = condicion
+        self.cuerpo = cuerpo
+        self.token = token
+        self.eventosCondicion = None
+
+    def hijos(self):
+        return [h for h in (self.condicion, self.cuerpo) if h is not None]
+
+
+class Para(Nodo):
+    """`for (inicializacion; condicion; pasos) cuerpo`. Sin condición, el ciclo no termina."""
+    __slots__ = ("inicializacion", "condicion", "pasos", "cuerpo", "eventosInicializacion", "eventosCondicion", "eventosPasos")
+    clase = PARA
+
+    def __init__(self, inicializacion: list, condicion, pasos: list, cuerpo, token=None):
+        self.inicializacion = inicializacion
+        self.condicion = condicion
+        self.pasos = pasos
+        self.cuerpo = cuerpo
+        self.token = token
+        self.eventosInicializacion = self.eventosCondicion = self.eventosPasos = None
+
+    def hijos(self):
+        return self.inicializacion + [h for h in (self.condicion, self.cuerpo) if h is not None] + self.pasos
+
+
+class Prototipo(Nodo):
+    __slots__ = ("nombre", "tipo", "tiposParametros")
+    clase = PROTOTIPO
+
+    def __init__(self, nombre: str, tipo: str, tiposParametros: list, token=None):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.tiposParametros = tiposParametros
+        self.token = token
+
+
+class Funcion(Nodo):
+    """Definición de función: cada parámetro es (nombre, tipo, token del nombre)."""
+    __slots__ = ("nombre", "tipo", "parametros", "cuerpo", "eventosParametros")
+    clase = FUNCION
+
+    def __init__(self, nombre: str, tipo: str, parametros: list, cuerpo: list, token=None):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.parametros = parametros
+        self.cuerpo = cuerpo
+        self.token = token
+        self.eventosParametros = None
+
+    def hijos(self):
+        return self.cuerpo
+
+
+class Retorno(Nodo):
+    __slots__ = ("valor", "eventos")
+    clase = RETORNO
+
+    def __init__(self, valor, token=None):
+        self.valor = valor
+        self.token = token
+        self.eventos = None
+
+    def hijos(self):
+        return [self.valor] if self.valor is not None else []
+
+
+# ------------------------------
+# Expresiones: todas tienen `tipoDato` (None si la expresión tiene un error de tipos)
+# ------------------------------
+class Expresion(Nodo):
+    __slots__ = ("tipoDato",)
+
+
+class Llamada(Expresion):
+    __slots__ = ("nombre", "argumentos", "eventos")
+    clase = LLAMADA
+
+    def __init__(self, nombre: str, argumentos: list, tipoDato: str = None, token=None):
+        self.nombre = nombre
+        self.argumentos = argumentos
+        self.tipoDato = tipoDato
+        self.token = token
+        self.eventos = None # solo si la llamada es una instrucción
+
+    def hijos(self):
+        return self.argumentos
+
+
+class Constante(Expresion):
+    """Un número del fuente o una expresión que el semántico resolvió al compilar."""
+    __slots__ = ("valor",)
+    clase = CONSTANTE
+
+    def __init__(self, valor, tipoDato: str, token=None):
+        self.valor = valor
+        self.tipoDato = tipoDato
+        self.token = token
+
+
+class Nombre(Expresion):
+    """Lectura de una variable. `simbolo` es el de la TS (None si no está declarada)."""
+    __slots__ = ("nombre", "simbolo")
+    clase = NOMBRE
+
+    def __init__(self, nombre: str, simbolo=None, tipoDato: str = None, token=None):
+        self.nombre = nombre
+        self.simbolo = simbolo
+        self.tipoDato = tipoDato
+        self.token = token
+
+
+class Binaria(Expresion):
+    __slots__ = ("operador", "izquierda", "derecha")
+    clase = BINARIA
+
+    def __init__(self, operador: str, izquierda, derecha, tipoDato: str = None, token=None):
+        self.operador = operador
+        self.izquierda = izquierda
+        self.derecha = derecha
+        self.tipoDato = tipoDato
+        self.token = token
+
+    def hijos(self):
+        return [self.izquierda, self.derecha]
+
+
+class Negacion(Expresion):
+    """`!x`: vale 1 si x es 0 y 0 si no."""
+    __slots__ = ("operando",)
+    clase = NEGACION
+
+    def __init__(self, operando, tipoDato: str = None, token=None):
+        self.operando = operando
+        self.tipoDato = tipoDato
+        self.token = token
+
+    def hijos(self):
+        return [self.operando]
+
+
+class Incremento(Expresion):
+    """++x, --x, x++ y x--. `asigna` es False cuando el operando no es una variable (por ejemplo, `(x)++`):
+    el valor se calcula igual pero no se guarda en ningún lado."""
+    __slots__ = ("operador", "operando", "prefijo", "asigna")
+    clase = INCREMENTO
+
+    def __init__(self, operador: str, operando, prefijo: bool, asigna: bool, tipoDato: str = None, token=None):
+        self.operador = operador # '+' o '-'
+        self.operando = operando
+        self.prefijo = prefijo
+        self.asigna = asigna
+        self.tipoDato = tipoDato
+        self.token = token
+
+    def hijos(self):
+        return [self.operando]
+
+
+def constante(nodo):
+    """El valor de una expresión si se conoce al compilar, o None."""
+    return nodo.valor if nodo is not None and nodo.clase == CONSTANTE else None
+
+
+def contarNodos(raiz) -> int:
+    """Cuenta los nodos de un AST sin recursión."""
+    if raiz is None:
+        return 0
+    total = 0
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        total += 1
+        pendientes.extend(h for h in nodo.hijos() if h is not None)
+    return total
@@ -0,0 +1,330 @@
+"""Reutilización de temporales: cada función usa la menor cantidad posible de temporales distintos.
+
+Caminante usa un temporal nuevo para cada subexpresión (ver actividades/Codigo de tres direcciones.txt),
+así que un programa con expresiones largas tiene miles de temporales y, en la máquina virtual, el marco
+de cada función (lo que se guarda en cada llamada) tiene un lugar por cada temporal que usa. El pase:
+
+1. Parte el programa en el código global y el de cada función: lo alcanzable desde su etiqueta sin
+   entrar en las funciones que llama, igual que MaquinaVirtual al armar los marcos.
+2. Calcula qué temporales están vivos después de cada instrucción (análisis de vida sobre el grafo
+   de flujo de cada función; una llamada sigue en la etiqueta de retorno).
+3. Colorea el grafo de interferencia: dos temporales interfieren si uno se escribe mientras el otro
+   está vivo (salvo en una copia entre los dos). Cada color es un lugar y toma el nombre del primer
+   temporal que lo ocupa, así los nombres siguen siendo propios de cada función. Las copias que
+   quedan entre un lugar y sí mismo se borran.
+4. Con `maxTemporales`, antes de colorear baja la presión donde hay más temporales vivos que ese
+   máximo: guarda en la pila los temporales que cruzan ese punto (push al escribirlos, pop justo antes
+   de leerlos), empezando por el que se lee más tarde. Solo se derrama un temporal que se escribe y se
+   lee una vez en el mismo bloque básico, si entre las dos instrucciones la pila vuelve a quedar como
+   estaba sin bajar de ahí (ningún otro pop se lleva su valor). Donde no alcanza, el máximo se supera.
+
+Los temporales que aparecen en más de una función (o en código inalcanzable), o que se leen antes
+de escribirse, quedan con su nombre. El programa se carga entero: la vida de un temporal depende de
+toda su función.
+"""
+from CodigoIntermedio import (ETIQUETA, SALTO, SALTO_SI, SALTO_SI_NO, APILAR, DESAPILAR, COPIA,
+                              leer, escribir, leerArchivo, esTemporal, definida, leidas, reemplazarLecturas)
+
+_SALTOS = (SALTO, SALTO_SI, SALTO_SI_NO)
+
+
+class AsignadorTemporales:
+    """Asigna los temporales de cada función a lugares reutilizables (ver el docstring del módulo)."""
+
+    def __init__(self, maxTemporales: int = None):
+        if maxTemporales is not None and maxTemporales < 1:
+            raise ValueError("El máximo de temporales vivos tiene que ser al menos 1")
+        self.maxTemporales = maxTemporales
+        self.estadisticas = {
+            "antes": 0, "despues": 0, # instrucciones
+            "funciones": 0,
+            "temporalesAntes": 0, "temporalesDespues": 0, # temporales distintos en el programa
+            "maxVivosAntes": 0, "maxVivosDespues": 0, # máximo de temporales vivos a la vez, en alguna función
+            "derramados": 0, # temporales guardados en la pila con push/pop
+            "copiasEliminadas": 0,
+        }
+
+    # ------------------------------
+    # Entradas
+    # ------------------------------
+    def asignarArchivo(self, entrada: str, salida: str) -> dict:
+        programa = self.asignar(list(leerArchivo(entrada)))
+        with open(salida, "w") as f:
+            f.write("".join(escribir(instruccion) + "\n" for instruccion in programa))
+        return self.estadisticas
+
+    def asignarLineas(self, lineas: list) -> list:
+        return [escribir(i) for i in self.asignar([i for i in map(leer, lineas) if i is not None])]
+
+    def asignar(self, programa: list) -> list:
+        """Devuelve el programa con los temporales reasignados (y los derrames, si hay un máximo)."""
+        etiquetas = {instruccion[1]: i for i, instruccion in enumerate(programa) if instruccion[0] == ETIQUETA}
+        llamadas = _llamadas(programa, etiquetas)
+        sucesores = [_sucesores(programa, i, etiquetas, llamadas) for i in range(len(programa))]
+        entradas = [0] + [etiquetas[funcion] for funcion in dict.fromkeys(llamadas.values())] if programa else []
+        regiones = [_alcanzables(entrada, sucesores) for entrada in entradas]
+
+        # Un temporal que aparece en más de una región (o en código que no alcanza ninguna) queda fijo
+        regionDe = {}
+        for numero, region in enumerate(regiones):
+            for i in region:
+                regionDe[i] = numero if regionDe.get(i, numero) == numero else -1
+        duenos = {}
+        for i, instruccion in enumerate(programa):
+            for t in _temporales(instruccion):
+                duenos.setdefault(t, set()).add(regionDe.get(i, -1))
+        fijos = {t for t, numeros in duenos.items() if len(numeros) > 1 or -1 in numeros}
+
+        antes, despues = {}, {} # posición -> instrucciones que se agregan antes / después de ella (derrames)
+        maxVivosAntes = 0
+        for region in regiones:
+            vivos = _vivos(programa, region, sucesores)
+            maxVivosAntes = max(maxVivosAntes, _presion(programa, region, vivos))
+            if self.maxTemporales is not None:
+                self._derramar(programa, region, vivos, fijos, antes, despues)
+
+        # El programa con los derrames: cada instrucción original pasa a ser una "unidad" [pops, instrucción, push]
+        codigo = []
+        inicio, fin = [], []
+        for i, instruccion in enumerate(programa):
+            inicio.append(len(codigo))
+            # El que se apiló último se desapila primero
+            codigo.extend(pop for _, pop in sorted(antes.get(i, ()), key=lambda x: -x[0]))
+            codigo.append(instruccion)
+            codigo.extend(despues.get(i, ()))
+            fin.append(len(codigo) - 1)
+        sucesoresCodigo = []
+        for i in range(len(programa)):
+            sucesoresCodigo.extend([p + 1] for p in range(inicio[i], fin[i]))
+            sucesoresCodigo.append([inicio[j] for j in sucesores[i]])
+
+        maxVivosDespues = 0
+        for entrada, region in zip(entradas, regiones):
+            posiciones = [p for i in region for p in range(inicio[i], fin[i] + 1)]
+            vivos = _vivos(codigo, posiciones, sucesoresCodigo)
+            maxVivosDespues = max(maxVivosDespues, _presion(codigo, posiciones, vivos))
+            entrantes = _vivosEntrada(codigo[inicio[entrada]], vivos[inicio[entrada]])
+            asignables = {t for p in posiciones for t in _temporales(codigo[p])} - fijos - entrantes
+            renombre = _colorear(codigo, posiciones, vivos, asignables)
+            for p in posiciones:
+                codigo[p] = _renombrar(codigo[p], renombre)
+
+        resultado = [i for i in codigo if not (i[0] == COPIA and i[1] == i[2])]
+        e = self.estadisticas
+        e["antes"] += len(programa)
+        e["despues"] += len(resultado)
+        e["funciones"] += max(0, len(regiones) - 1)
+        e["temporalesAntes"] += len(duenos)
+        e["temporalesDespues"] += len({t for instruccion in resultado for t in _temporales(instruccion)})
+        e["maxVivosAntes"] = max(e["maxVivosAntes"], maxVivosAntes)
+        e["maxVivosDespues"] = max(e["maxVivosDespues"], maxVivosDespues)
+        e["copiasEliminadas"] += len(codigo) - len(resultado)
+        return resultado
+
+    # ------------------------------
+    # Derrames
+    # ------------------------------
+    def _derramar(self, programa: list, region: list, vivos: dict, fijos: set, antes: dict, despues: dict):
+        """Elige los temporales que se guardan en la pila en cada bloque básico de la región."""
+        escrituras, lecturas = {}, {}
+        for i in region:
+            for t in leidas(programa[i]):
+                if esTemporal(t):
+                    lecturas.setdefault(t, []).append(i)
+            destino = definida(programa[i])
+            if destino is not None and esTemporal(destino):
+                escrituras.setdefault(destino, []).append(i)
+
+        for bloque in _bloques(programa, region):
+            posicion = {i: k for k, i in enumerate(bloque)}
+            # Candidatos: escritos y leídos una sola vez, los dos en el bloque, con algo en el medio
+            intervalos = []
+            for k, i in enumerate(bloque):
+                t = definida(programa[i])
+                if t is None or t in fijos or len(escrituras.get(t, ())) != 1 or len(lecturas.get(t, ())) != 1:
+                    continue
+                uso = posicion.get(lecturas[t][0])
+                if uso is not None and uso - k > 1:
+                    intervalos.append((k, uso, t))
+            if not intervalos:
+                continue
+
+            profundidad = [0] # profundidad de la pila antes de cada instrucción del bloque
+            for i in bloque:
+                profundidad.append(profundidad[-1] + (programa[i][0] == APILAR) - (programa[i][0] == DESAPILAR))
+            def pilaEquilibrada(k0: int, k1: int) -> bool:
+                base = profundidad[k0 + 1]
+                return profundidad[k1] == base and min(profundidad[k0 + 2:k1 + 1], default=base) >= base
+
+            empiezan, terminan = {}, {}
+            for intervalo in intervalos:
+                empiezan.setdefault(intervalo[0] + 1, []).append(intervalo)
+                terminan.setdefault(intervalo[1], []).append(intervalo)
+            activos = set()
+            derramados = []
+            reduccion = 0
+            for k, i in enumerate(bloque):
+                for intervalo in terminan.get(k, ()):
+                    if intervalo in activos:
+                        activos.discard(intervalo)
+                    elif intervalo in derramados:
+                        reduccion -= 1
+                activos.update(empiezan.get(k, ()))
+                presion = len(vivos[i] | _escritos(programa[i]))
+                while presion - reduccion > self.maxTemporales:
+                    elegido = None
+                    for intervalo in sorted(activos, key=lambda x: -x[1]): # primero el que se lee más tarde
+                        k0, k1, _ = intervalo
+                        # Con los ya derramados que se cruzan, los push/pop tienen que quedar anidados
+                        anidado = all(a >= k1 or k0 >= b or (a <= k0 and k1 <= b) or (k0 <= a and b <= k1)
+                                      for a, b, _ in derramados)
+                        if anidado and pilaEquilibrada(k0, k1):
+                            elegido = intervalo
+                            break
+                    if elegido is None:
+                        break
+                    activos.discard(elegido)
+                    derramados.append(elegido)
+                    reduccion += 1
+
+            for k0, k1, t in derramados:
+                despues.setdefault(bloque[k0], []).append((APILAR, t))
+                antes.setdefault(bloque[k1], []).append((k0, (DESAPILAR, t)))
+            self.estadisticas["derramados"] += len(derramados)
+
+
+# ------------------------------
+# Grafo de flujo
+# ------------------------------
+def _llamadas(programa: list, etiquetas: dict) -> dict:
+    """Posición de cada `jmp f` que es una llamada (precedido por `push Lret`) -> f, como en MaquinaVirtual."""
+    return {i: programa[i][1] for i in range(1, len(programa))
+            if programa[i][0] == SALTO and programa[i][1] in etiquetas
+            and programa[i - 1][0] == APILAR and programa[i - 1][1] in etiquetas}
+
+
+def _sucesores(programa: list, i: int, etiquetas: dict, llamadas: dict) -> list:
+    instruccion = programa[i]
+    clase = instruccion[0]
+    if i in llamadas: # la función vuelve a la etiqueta que se apiló antes del salto
+        return [etiquetas[programa[i - 1][1]]]
+    if clase == SALTO: # a una etiqueta, o el retorno de una función (a una dirección guardada en una variable)
+        return [etiquetas[instruccion[1]]] if instruccion[1] in etiquetas else []
+    siguiente = [i + 1] if i + 1 < len(programa) else []
+    if clase in (SALTO_SI, SALTO_SI_NO) and instruccion[2] in etiquetas:
+        return [etiquetas[instruccion[2]]] + siguiente
+    return siguiente
+
+
+def _alcanzables(entrada: int, sucesores: list) -> list:
+    """Posiciones alcanzables desde `entrada`, en orden."""
+    vistos = {entrada}
+    pendientes = [entrada]
+    while pendientes:
+        for siguiente in sucesores[pendientes.pop()]:
+            if siguiente not in vistos:
+                vistos.add(siguiente)
+                pendientes.append(siguiente)
+    return sorted(vistos)
+
+
+def _bloques(programa: list, region: list) -> list:
+    """Bloques básicos de la región: corridas de posiciones consecutivas que cortan las etiquetas y los saltos."""
+    bloques = []
+    for i in region:
+        if not bloques or programa[i][0] == ETIQUETA or bloques[-1][-1] != i - 1 or programa[i - 1][0] in _SALTOS:
+            bloques.append([])
+        bloques[-1].append(i)
+    return bloques
+
+
+# ------------------------------
+# Vida de los temporales
+# ------------------------------
+def _temporales(instruccion: tuple) -> set:
+    return {o for o in leidas(instruccion) + (definida(instruccion),) if o is not None and esTemporal(o)}
+
+
+def _escritos(instruccion: tuple) -> set:
+    destino = definida(instruccion)
+    return {destino} if destino is not None and esTemporal(destino) else set()
+
+
+def _vivosEntrada(instruccion: tuple, salida: set) -> set:
+    return (salida - _escritos(instruccion)) | {o for o in leidas(instruccion) if esTemporal(o)}
+
+
+def _vivos(codigo: list, posiciones: list, sucesores: list) -> dict:
+    """Temporales vivos después de cada posición (análisis hacia atrás hasta el punto fijo)."""
+    entrada = {p: set() for p in posiciones}
+    salida = {}
+    cambio = True
+    while cambio:
+        cambio = False
+        for p in reversed(posiciones):
+            vivos = set()
+            for s in sucesores[p]:
+                vivos |= entrada[s]
+            salida[p] = vivos
+            nueva = _vivosEntrada(codigo[p], vivos)
+            if nueva != entrada[p]:
+                entrada[p] = nueva
+                cambio = True
+    return salida
+
+
+def _presion(codigo: list, posiciones: list, vivos: dict) -> int:
+    """Máximo de temporales vivos a la vez (contando el que escribe cada instrucción)."""
+    return max((len(vivos[p] | _escritos(codigo[p])) for p in posiciones), default=0)
+
+
+# ------------------------------
+# Asignación
+# ------------------------------
+def _colorear(codigo: list, posiciones: list, vivos: dict, asignables: set) -> dict:
+    """Colorea el grafo de interferencia en orden de aparición. Devuelve temporal -> nombre de su lugar."""
+    vecinos = {t: set() for t in asignables}
+    preferido = {} # las dos puntas de una copia prefieren el mismo lugar: la copia desaparece
+    orden = {}
+    for p in posiciones:
+        instruccion = codigo[p]
+        for t in _temporales(instruccion):
+            if t in vecinos:
+                orden.setdefault(t, p)
+        destino = definida(instruccion)
+        if destino not in vecinos:
+            continue
+        origen = instruccion[2] if instruccion[0] == COPIA else None
+        if origen in vecinos:
+            preferido.setdefault(destino, origen)
+            preferido.setdefault(origen, destino)
+        for t in vivos[p]:
+            if t != destino and t != origen and t in vecinos:
+                vecinos[destino].add(t)
+                vecinos[t].add(destino)
+
+    color = {}
+    lugares = [] # color -> nombre del lugar (su primer temporal)
+    for t in sorted(orden, key=orden.get):
+        ocupados = {color[v] for v in vecinos[t] if v in color}
+        c = color.get(preferido.get(t))
+        if c is None or c in ocupados:
+            c = 0
+            while c in ocupados:
+                c += 1
+        color[t] = c
+        if c == len(lugares):
+            lugares.append(t)
+    return {t: lugares[c] for t, c in color.items() if lugares[c] != t}
+
+
+def _renombrar(instruccion: tuple, renombre: dict) -> tuple:
+    if not renombre:
+        return instruccion
+    if instruccion[0] == SALTO: # `jmp t`: el retorno lee la dirección guardada
+        return (SALTO, renombre.get(instruccion[1], instruccion[1]))
+    instruccion = reemplazarLecturas(instruccion, lambda x: renombre.get(x, x))
+    destino = definida(instruccion)
+    if destino in renombre:
+        instruccion = (instruccion[0], renombre[destino]) + instruccion[2:]
+    return instruccion
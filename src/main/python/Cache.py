@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import tempfile
+
+# Formato de las entradas: cambiarlo invalida todo lo guardado por versiones anteriores del caché
+FORMATO = 1
+
+# Lo que define el resultado de una compilación además del fuente: la gramática y el código del compilador
+FUENTES_COMPILADOR = [
+    "compilador.g4",
+    "Compilador.py", "CompileSession.py", "Escucha.py", "EscuchaErroresSintacticos.py", "Diagnosticos.py",
+    "Enumeraciones.py", "Entrada.py", "AnalisisParalelo.py", "Arbol.py", "FlujoDatos.py", "Caminante.py", "CodigoIntermedio.py", "Optimizador.py",
+    "AsignacionTemporales.py",
+    os.path.join("tablaDeSimbolos", "SymbolTable.py"), os.path.join("tablaDeSimbolos", "Context.py"),
+    os.path.join("tablaDeSimbolos", "ID.py"), os.path.join("tablaDeSimbolos", "Variable.py"),
+    os.path.join("tablaDeSimbolos", "Funcion.py"), os.path.join("tablaDeSimbolos", "Exportadores.py"),
+]
+
+_version = None
+
+
+def versionCompilador() -> str:
+    """Hash de la gramática y de los módulos del compilador. Se calcula una sola vez por proceso."""
+    global _version
+    if _version is None:
+        h = hashlib.sha256(f"formato {FORMATO}".encode())
+        base = os.path.dirname(os.path.abspath(__file__))
+        for fuente in FUENTES_COMPILADOR:
+            h.update(fuente.encode())
+            with open(os.path.join(base, fuente), "rb") as f:
+                h.update(f.read())
+        _version = h.hexdigest()
+    return _version
+
+
+class CacheCompilacion:
+    """Caché en disco de compilaciones, indexado por el hash del fuente, la versión del compilador y las opciones.
+
+    Cada entrada es un archivo JSON con lo que la compilación deja afuera: el resultado, la salida de
+    consola, los diagnósticos, el volcado de la TS y el código intermedio. Un acierto lo repone sin
+    tokenizar ni parsear. El directorio se mantiene por debajo de `maxBytes` desalojando las entradas
+    usadas hace más tiempo (cada acierto actualiza la fecha de modificación de su archivo).
+
+    Varios procesos pueden compartir el directorio: las entradas se escriben en un temporal y se
+    renombran, así que nunca se lee una a medio escribir.
+    """
+
+    def __init__(self, directorio: str = ".cacheCompilador", maxBytes: int = 64 * 1024 * 1024):
+        self.directorio = directorio
+        self.maxBytes = maxBytes
+        self.estadisticas = {"aciertos": 0, "fallos": 0, "guardadas": 0, "desalojadas": 0}
+        os.makedirs(directorio, exist_ok=True)
+
+    @staticmethod
+    def clave(fuente: str, opciones: dict) -> str:
+        """Clave de una compilación: el fuente (en UTF-8), la versión del compilador y las opciones que cambian su salida."""
+        h = hashlib.sha256(versionCompilador().encode())
+        h.update(json.dumps(opciones, sort_keys=True).encode())
+        h.update(fuente.encode("utf-8"))
+        return h.hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def buscar(self, clave: str) -> dict:
+        """La entrada guardada con esa clave, o None. Cuenta el acierto o el fallo."""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                entrada = json.load(f)
+            os.utime(ruta) # pasa a ser la usada más recientemente
+        except (OSError, ValueError): # no existe, la desalojó otro proceso o quedó ilegible
+            self.estadisticas["fallos"] += 1
+            return None
+        self.estadisticas["aciertos"] += 1
+        return entrada
+
+    def guardar(self, clave: str, entrada: dict):
+        """Guarda la entrada y desaloja las más viejas si el directorio pasa de `maxBytes`."""
+        datos = json.dumps(entrada, ensure_ascii=False).encode("utf-8")
+        if len(datos) > self.maxBytes:
+            return # no entra ni con el caché vacío
+        descriptor, temporal = tempfile.mkstemp(suffix=".tmp", dir=self.directorio)
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(datos)
+            os.replace(temporal, self._ruta(clave))
+        except OSError:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            return
+        self.estadisticas["guardadas"] += 1
+        self._desalojar()
+
+    def _desalojar(self):
+        """Borra las entradas menos usadas hasta que el directorio quede dentro de `maxBytes`."""
+        entradas = []
+        total = 0
+        for archivo in os.scandir(self.directorio):
+            if not archivo.name.endswith(".json"):
+                continue
+            try:
+                estado = archivo.stat()
+            except OSError:
+                continue
+            entradas.append((estado.st_mtime, estado.st_size, archivo.path))
+            total += estado.st_size
+        entradas.sort()
+        for _, tamano, ruta in entradas:
+            if total <= self.maxBytes:
+                break
+            try:
+                os.remove(ruta)
+                self.estadisticas["desalojadas"] += 1
+            except OSError: # otro proceso ya la borró
+                pass
+            total -= tamano
+
+    def tamano(self) -> int:
+        """Bytes que ocupan las entradas del directorio."""
+        return sum(a.stat().st_size for a in os.scandir(self.directorio) if a.name.endswith(".json"))
+
+    def vaciar(self):
+        for archivo in os.scandir(self.directorio):
+            if archivo.name.endswith(".json"):
+                os.remove(archivo.path)
+
+    def resumen(self) -> str:
+        e = self.estadisticas
+        consultas = e["aciertos"] + e["fallos"]
+        tasa = 100 * e["aciertos"] / consultas if consultas else 0.0
+        return (f"Caché: {e['aciertos']} acierto(s) y {e['fallos']} fallo(s) ({tasa:.0f}%), {e['guardadas']} guardada(s), "
+                f"{e['desalojadas']} desalojada(s), {self.tamano() / 1024:.0f} KiB en {self.directorio}")
@@ -0,0 +1,421 @@
+"""Caché en disco de los DFA de predicción del parser y del lexer.
+
+ANTLR arma los DFA de a poco: la primera vez que el parser (o el lexer) llega a una decisión en un
+proceso, la resuelve simulando el ATN y guarda el resultado como estados del DFA para las próximas
+veces. Por eso el primer parseo de cada proceso es el más lento. CacheDFA guarda esos estados
+después de compilar y los carga antes de la compilación siguiente, así un proceso nuevo arranca con
+el DFA que dejaron los anteriores.
+
+Los estados del DFA apuntan a estados del ATN (que se deserializa al importar el parser) y a
+singletons del runtime (el contexto vacío, el predicado vacío, el estado de error). Al guardar se
+reemplazan por referencias y al cargar se resuelven contra los de este proceso. Varios códigos hash
+del runtime salen de hash() sobre strings, que cambia en cada proceso: se recalculan al cargar.
+
+Cargar no deserializa todo: el DFA crece con cada programa distinto y la mayor parte no se vuelve a
+usar en un proceso dado. De cada estado del parser se carga enseguida lo que hace falta para
+recorrer el DFA (aristas, predicción, si es de aceptación) y sus configuraciones del ATN recién
+cuando se piden (ver _EstadoGuardado y _EstadosGuardados). El DFA del lexer es chico y se carga entero.
+
+El archivo lleva en el nombre una versión: el hash de los ATN serializados del parser y del lexer,
+de los módulos del runtime cuyos objetos se guardan y de FORMATO. Si cambia la gramática o el
+runtime, el archivo viejo ya no se encuentra. Al cargar solo se aceptan clases del runtime de ANTLR.
+"""
+import hashlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+import compiladorLexer
+import compiladorParser
+from antlr4.PredictionContext import PredictionContext, SingletonPredictionContext, calculateHashCode, calculateListsHashCode
+from antlr4.atn.ATNSimulator import ATNSimulator
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.LexerActionExecutor import LexerActionExecutor
+from antlr4.atn.SemanticContext import SemanticContext
+from antlr4.dfa.DFAState import DFAState
+
+# Formato del archivo: cambiarlo invalida todo lo guardado por versiones anteriores
+FORMATO = 1
+
+# Módulos del runtime que definen los objetos que se guardan (los estados del DFA y lo que cuelga de ellos)
+# y de los simuladores que los arman y los recorren
+_MODULOS_RUNTIME = ["antlr4.dfa.DFAState", "antlr4.atn.ATNConfig", "antlr4.atn.ATNConfigSet", "antlr4.PredictionContext",
+                    "antlr4.atn.SemanticContext", "antlr4.atn.LexerActionExecutor", "antlr4.atn.LexerAction",
+                    "antlr4.atn.ParserATNSimulator", "antlr4.atn.LexerATNSimulator"]
+
+_ERROR = -1 # arista al estado de error del simulador (el lexer tiene el suyo)
+
+_version = None
+
+
+def versionDFA() -> str:
+    """Hash de los ATN y del runtime. Se calcula una sola vez por proceso."""
+    global _version
+    if _version is None:
+        h = hashlib.sha256(f"formato {FORMATO}, Python {sys.version_info[:2]}".encode()) # la huella depende del hash de tuplas de Python
+        for modulo in (compiladorParser, compiladorLexer):
+            h.update(repr(modulo.serializedATN()).encode())
+        for nombre in _MODULOS_RUNTIME:
+            __import__(nombre)
+            with open(sys.modules[nombre].__file__, "rb") as f:
+                h.update(f.read())
+        _version = h.hexdigest()
+    return _version
+
+
+def _reconocedores() -> dict:
+    return {"parser": compiladorParser.compiladorParser, "lexer": compiladorLexer.compiladorLexer}
+
+
+def _errores() -> dict:
+    return {"parser": ATNSimulator.ERROR, "lexer": LexerATNSimulator.ERROR}
+
+
+def cantidadEstados() -> int:
+    """Estados que tienen, en este proceso, los DFA del parser y del lexer."""
+    return sum(len(dfa._states) for reconocedor in _reconocedores().values() for dfa in reconocedor.decisionsToDFA)
+
+
+class _Guardador(pickle.Pickler):
+    """Reemplaza los objetos que ya existen en el proceso que carga por una referencia."""
+
+    def persistent_id(self, obj):
+        if isinstance(obj, ATNState):
+            return ("estado", "parser" if obj.atn is compiladorParser.compiladorParser.atn else "lexer", obj.stateNumber)
+        if obj is PredictionContext.EMPTY:
+            return ("contextoVacio",)
+        if obj is SemanticContext.NONE:
+            return ("predicadoVacio",)
+        if obj is ATNSimulator.ERROR:
+            return ("error", "parser")
+        if obj is LexerATNSimulator.ERROR:
+            return ("error", "lexer")
+        return None
+
+
+class _Cargador(pickle.Unpickler):
+    """Resuelve las referencias de _Guardador y solo crea objetos del runtime de ANTLR."""
+
+    def persistent_load(self, pid):
+        if pid[0] == "estado":
+            return _reconocedores()[pid[1]].atn.states[pid[2]]
+        if pid[0] == "contextoVacio":
+            return PredictionContext.EMPTY
+        if pid[0] == "predicadoVacio":
+            return SemanticContext.NONE
+        if pid[0] == "error":
+            return _errores()[pid[1]]
+        raise pickle.UnpicklingError(f"referencia desconocida: {pid!r}")
+
+    def find_class(self, modulo, nombre):
+        if not modulo.startswith("antlr4."):
+            raise pickle.UnpicklingError(f"clase no permitida en el caché de DFA: {modulo}.{nombre}")
+        return super().find_class(modulo, nombre)
+
+
+def _serializar(configs) -> bytes:
+    salida = io.BytesIO()
+    _Guardador(salida, pickle.HIGHEST_PROTOCOL).dump(configs)
+    return salida.getvalue()
+
+
+def _deserializar(datos: bytes):
+    configs = _Cargador(io.BytesIO(datos)).load()
+    _rehacerHashes(configs)
+    return configs
+
+
+def _padresPrimero(configs):
+    """Los contextos de las configuraciones (menos el vacío), cada uno después de sus padres."""
+    vistos = {id(PredictionContext.EMPTY)}
+    for config in configs:
+        pila = [config.context]
+        while pila:
+            contexto = pila[-1]
+            if contexto is None or id(contexto) in vistos:
+                pila.pop()
+                continue
+            padres = [contexto.parentCtx] if isinstance(contexto, SingletonPredictionContext) else contexto.parents
+            pendientes = [p for p in padres if p is not None and id(p) not in vistos]
+            if pendientes:
+                pila.extend(pendientes)
+                continue
+            pila.pop()
+            vistos.add(id(contexto))
+            yield contexto
+
+
+def _huella(configs, memo: dict = None) -> int:
+    """Hash de un conjunto de configuraciones que, a diferencia del del runtime, no cambia entre procesos:
+    solo combina enteros (estados del ATN, alternativas y la forma de los contextos). Dos conjuntos iguales
+    tienen la misma huella."""
+    memo = {} if memo is None else memo
+    return hash(tuple((config.state.stateNumber, config.alt, _huellaContexto(config.context, memo),
+                       0 if config.semanticContext is SemanticContext.NONE else hash(config.semanticContext))
+                      for config in configs))
+
+
+def _huellaContexto(contexto, memo: dict) -> int:
+    """Huella de un contexto y todos sus padres. `memo` guarda, por id, el contexto y su huella: los contextos
+    de los estados nuevos comparten la mayoría de sus padres con los de los estados anteriores."""
+    pila = [contexto]
+    while pila:
+        actual = pila[-1]
+        if _conocida(actual, memo) is not None:
+            pila.pop()
+            continue
+        if isinstance(actual, SingletonPredictionContext):
+            pares = [(actual.parentCtx, actual.returnState)]
+        else:
+            pares = list(zip(actual.parents, actual.returnStates))
+        pendientes = [padre for padre, _ in pares if _conocida(padre, memo) is None]
+        if pendientes:
+            pila.extend(pendientes)
+            continue
+        pila.pop()
+        memo[id(actual)] = (actual, hash(tuple((_conocida(padre, memo), retorno) for padre, retorno in pares)))
+    return _conocida(contexto, memo)
+
+
+def _conocida(contexto, memo: dict):
+    if contexto is None:
+        return -1
+    if contexto is PredictionContext.EMPTY:
+        return 0
+    guardada = memo.get(id(contexto))
+    return guardada[1] if guardada is not None and guardada[0] is contexto else None
+
+
+def _rehashEjecutor(acciones: LexerActionExecutor):
+    acciones.hashCode = hash("".join(str(accion) for accion in acciones.lexerActions))
+
+
+def _rehacerHashes(configs):
+    """Recalcula los hashes guardados en las configuraciones cargadas, que dependían del proceso que las guardó.
+
+    Los contextos se recorren de los padres a los hijos, porque el hash de cada uno depende del de sus padres.
+    """
+    configs.cachedHashCode = -1
+    for config in configs:
+        acciones = getattr(config, "lexerActionExecutor", None)
+        if acciones is not None:
+            _rehashEjecutor(acciones)
+    for contexto in _padresPrimero(configs):
+        if isinstance(contexto, SingletonPredictionContext):
+            contexto.cachedHashCode = calculateHashCode(contexto.parentCtx, contexto.returnState)
+        else:
+            contexto.cachedHashCode = calculateListsHashCode(contexto.parents, contexto.returnStates)
+
+
+_CONFIGS = DFAState.__dict__["configs"] # el slot de DFAState, que la propiedad de _EstadoGuardado tapa
+
+
+class _EstadoGuardado(DFAState):
+    """Estado de un DFA cargado del caché: sus configuraciones se deserializan recién cuando alguien las pide.
+
+    Recorrer el DFA por aristas que ya existen no las necesita; sí calcular una arista nueva desde el
+    estado, compararlo con otro o informar un error de predicción.
+    """
+    __slots__ = ("_guardadas", "huella")
+
+    @property
+    def configs(self):
+        if self._guardadas is not None:
+            _CONFIGS.__set__(self, _deserializar(self._guardadas))
+            self._guardadas = None
+        return _CONFIGS.__get__(self, DFAState)
+
+    @configs.setter
+    def configs(self, configs):
+        self._guardadas = None
+        _CONFIGS.__set__(self, configs)
+
+
+class _EstadosGuardados:
+    """Reemplaza al dict DFA._states de un DFA cargado del caché.
+
+    El runtime busca en ese dict un estado igual a cada estado nuevo, y el hash y la igualdad de un
+    estado salen de sus configuraciones. Para no deserializar las de todos, los estados cargados
+    esperan agrupados por huella y pasan al dict recién cuando se busca un estado con la misma huella.
+    """
+
+    def __init__(self, estados: list):
+        self._dict = {}
+        self._pendientes = {} # huella -> estados cargados que todavía no están en _dict
+        self._huellas = {} # memo de _huellaContexto, mientras quedan pendientes
+        for estado in estados:
+            self._pendientes.setdefault(estado.huella, []).append(estado)
+        self._cantidadPendientes = len(estados)
+
+    def _incorporar(self, estado: DFAState):
+        if not self._pendientes:
+            self._huellas.clear()
+            return
+        pendientes = self._pendientes.pop(_huella(estado.configs, self._huellas), None)
+        if pendientes:
+            self._cantidadPendientes -= len(pendientes)
+            for pendiente in pendientes:
+                self._dict[pendiente] = pendiente
+
+    def get(self, estado: DFAState, defecto=None):
+        self._incorporar(estado)
+        return self._dict.get(estado, defecto)
+
+    def __contains__(self, estado: DFAState) -> bool:
+        self._incorporar(estado)
+        return estado in self._dict
+
+    def __setitem__(self, estado: DFAState, valor: DFAState):
+        self._incorporar(estado)
+        self._dict[estado] = valor
+
+    def __len__(self) -> int:
+        return len(self._dict) + self._cantidadPendientes
+
+    def __iter__(self):
+        yield from self._dict
+        for pendientes in self._pendientes.values():
+            yield from pendientes
+
+    def keys(self) -> list:
+        return list(self)
+
+
+def _aplanar(dfa, error: DFAState) -> tuple:
+    """Un DFA como (s0, estados): cada estado es una tupla con sus campos, las configuraciones serializadas
+    aparte y las aristas como índices en la lista.
+
+    La lista tiene los estados del DFA y los que solo se alcanzan por aristas (el s0 de una decisión con
+    precedencia). Las configuraciones que nunca se deserializaron se vuelven a guardar tal como se cargaron.
+    """
+    estados = list(dfa._states)
+    indices = {id(estado): i for i, estado in enumerate(estados)}
+    enDFA = set(indices)
+    if dfa.s0 is not None and id(dfa.s0) not in indices:
+        indices[id(dfa.s0)] = len(estados)
+        estados.append(dfa.s0)
+    i = 0
+    while i < len(estados):
+        for destino in estados[i].edges or ():
+            if destino is not None and destino is not error and id(destino) not in indices:
+                indices[id(destino)] = len(estados)
+                estados.append(destino)
+        i += 1
+
+    def arista(destino):
+        if destino is None:
+            return None
+        return _ERROR if destino is error else indices[id(destino)]
+
+    planos = []
+    for e in estados:
+        if isinstance(e, _EstadoGuardado) and e._guardadas is not None:
+            guardadas, huella = e._guardadas, e.huella
+        else:
+            guardadas, huella = _serializar(e.configs), _huella(e.configs)
+        planos.append((e.stateNumber, guardadas, huella, e.isAcceptState, e.prediction, e.lexerActionExecutor,
+                       e.requiresFullContext, e.predicates, None if e.edges is None else [arista(d) for d in e.edges],
+                       id(e) in enDFA))
+    return None if dfa.s0 is None else indices[id(dfa.s0)], planos
+
+
+def _reconstruir(planos: list, error: DFAState, perezoso: bool) -> list:
+    """Los estados de un DFA aplanado, con las aristas resueltas. Devuelve [(estado, enDFA)].
+
+    Con `perezoso`, cada estado es un _EstadoGuardado; si no, un DFAState con sus configuraciones ya deserializadas.
+    """
+    estados = []
+    for numero, guardadas, huella, aceptacion, prediccion, acciones, contextoCompleto, predicados, _, _ in planos:
+        if perezoso:
+            estado = _EstadoGuardado.__new__(_EstadoGuardado)
+            estado._guardadas = guardadas
+            estado.huella = huella
+        else:
+            estado = DFAState.__new__(DFAState)
+            estado.configs = _deserializar(guardadas)
+        estado.stateNumber = numero
+        estado.edges = None
+        estado.isAcceptState = aceptacion
+        estado.prediction = prediccion
+        estado.lexerActionExecutor = acciones
+        estado.requiresFullContext = contextoCompleto
+        estado.predicates = predicados
+        if acciones is not None:
+            _rehashEjecutor(acciones)
+        estados.append(estado)
+    for estado, plano in zip(estados, planos):
+        if plano[8] is not None:
+            estado.edges = [None if d is None else error if d == _ERROR else estados[d] for d in plano[8]]
+    return [(estado, plano[9]) for estado, plano in zip(estados, planos)]
+
+
+class CacheDFA:
+    """Los DFA del parser y del lexer guardados en `directorio`, en un archivo por versión.
+
+    Como los DFA son atributos de clase del parser y del lexer, cargar afecta a todas las
+    compilaciones siguientes del proceso. Varios procesos pueden compartir el directorio: el archivo
+    se escribe en un temporal y se renombra, y si dos guardan a la vez queda el último.
+    """
+
+    def __init__(self, directorio: str = ".cacheCompilador"):
+        self.directorio = directorio
+        self.estadisticas = {"cargados": 0, "guardados": 0}
+
+    @property
+    def ruta(self) -> str:
+        return os.path.join(self.directorio, f"dfa-{versionDFA()[:16]}.pickle")
+
+    def cargar(self) -> int:
+        """Carga los DFA guardados si los de este proceso todavía están vacíos. Devuelve la cantidad de estados cargados."""
+        if cantidadEstados():
+            return 0 # ya se parseó algo en este proceso: no se mezclan DFA
+        try:
+            with open(self.ruta, "rb") as f:
+                guardado = _Cargador(f).load()
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, KeyError, TypeError):
+            return 0 # no hay caché de esta versión, o quedó ilegible
+        reconocedores = _reconocedores()
+        if any(len(guardado[nombre]) != len(reconocedores[nombre].decisionsToDFA) for nombre in reconocedores):
+            return 0
+        cargados = 0
+        for nombre, reconocedor in reconocedores.items():
+            for dfa, (s0, planos) in zip(reconocedor.decisionsToDFA, guardado[nombre]):
+                # El lexer compara con == cada estado al que llega, y su DFA es chico: se carga entero
+                estados = _reconstruir(planos, _errores()[nombre], perezoso=nombre == "parser")
+                if nombre == "parser":
+                    dfa._states = _EstadosGuardados([estado for estado, enDFA in estados if enDFA])
+                else:
+                    dfa._states = {estado: estado for estado, enDFA in estados if enDFA}
+                if s0 is not None:
+                    dfa.s0 = estados[s0][0]
+                cargados += len(dfa._states)
+        self.estadisticas["cargados"] = cargados
+        return cargados
+
+    def guardar(self) -> bool:
+        """Guarda los DFA de este proceso si crecieron desde que se cargaron. Devuelve si se escribió el archivo."""
+        estados = cantidadEstados()
+        if estados <= self.estadisticas["cargados"]:
+            return False
+        errores = _errores()
+        guardado = {nombre: [_aplanar(dfa, errores[nombre]) for dfa in reconocedor.decisionsToDFA]
+                    for nombre, reconocedor in _reconocedores().items()}
+        os.makedirs(self.directorio, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(suffix=".tmp", dir=self.directorio)
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                _Guardador(f, pickle.HIGHEST_PROTOCOL).dump(guardado)
+            os.replace(temporal, self.ruta)
+        except OSError:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            return False
+        self.estadisticas["guardados"] = estados
+        return True
+
+    def resumen(self) -> str:
+        e = self.estadisticas
+        return (f"Caché de DFA: {e['cargados']} estado(s) cargado(s), "
+                + (f"{e['guardados']} guardado(s)" if e["guardados"] else "sin cambios que guardar") + f" en {self.ruta}")
@@ -1,7 +1,359 @@
-from compiladorVisitor import compiladorVisitor
-from compiladorParser import compiladorParser
+import re
+import Arbol
+from CodigoIntermedio import esConstante, valorConstante, formatearConstante, calcular
 
-class Caminante (compiladorVisitor) :
-    def visitPrograma (self, ctx:compiladorParser.ProgramaContext):
-        print("Programa procesado")
-        return ctx
\ No newline at end of file
+# Nombres que el generador usa para sus temporales y etiquetas: una variable del programa con esta forma se renombra
+_RESERVADO = re.compile(r"[tL]\d+$")
+
+
+class Caminante:
+    """Generador de código de tres direcciones (ver actividades/Codigo de tres direcciones.txt).
+
+    Recorre el AST ya validado (ver Arbol) y escribe cada instrucción en `salida` apenas la genera, sin
+    guardar la lista completa: el tamaño del programa no cambia la memoria que usa.
+
+    Convenciones del código generado:
+    - Cada declaración tiene un nombre único en el código: si el nombre ya se usó (otra variable,
+      una función, un temporal), se le agrega un sufijo `.N`, que no puede aparecer en el fuente.
+    - Las funciones se generan donde aparecen, precedidas por un salto que las saltea. Se llaman con
+      `push args; push Lret; jmp f; label Lret; pop resultado` y devuelven con `push valor; jmp dirRetorno`.
+    - Las variables globales sin inicializador arrancan en 0. Si hay una función `main`, se llama al final
+      (salvo con `llamarMain=False`: en un módulo que se compila por separado la llama el enlazador).
+    - Un valor int que se guarda en un double se convierte con `x = (double) y`.
+    - Las expresiones que el semántico resolvió como constantes (Arbol.Constante) se emiten como su
+      valor, y un if/while/for con condición constante solo genera la rama que se ejecuta.
+    """
+
+    def __init__(self, salida, llamarMain: bool = True):
+        self.salida = salida # cualquier objeto con write(): el archivo de salida o la siguiente etapa
+        self.llamarMain = llamarMain
+        self.instrucciones = 0
+        self._temporales = 0
+        self._etiquetas = 0
+        self._contextos = [{}] # pila de contextos: nombre en el fuente -> (nombre en el código, tipo)
+        self._usados = set() # nombres ya tomados en el código generado
+        self._sufijos = {}
+        self._funciones = {} # nombre en el fuente -> (etiqueta, tipo de retorno, tipos de los parámetros)
+        # Para el archivo objeto (ver Objeto): firmas de las funciones definidas y de los prototipos, y funciones llamadas
+        self.definidas = {} # nombre -> (tipo de retorno, tipos de los parámetros)
+        self.prototipos = {} # nombre -> (tipo de retorno, tipos de los parámetros, línea del prototipo)
+        self.llamadas = set()
+        self._funcionActual = None # (tipo de retorno, temporal con la dirección de retorno)
+        self._finPrograma = None # etiqueta de salida, solo si hay un return fuera de las funciones
+        self._visitas = [None] * Arbol.CLASES # clase de nodo -> método que lo genera
+        for clase, metodo in ((Arbol.PROGRAMA, self.visitPrograma), (Arbol.BLOQUE, self.visitBloque),
+                              (Arbol.DECLARACION, self.visitDeclaracion), (Arbol.ASIGNACION, self.visitAsignacion),
+                              (Arbol.SI, self.visitSi), (Arbol.MIENTRAS, self.visitMientras), (Arbol.PARA, self.visitPara),
+                              (Arbol.PROTOTIPO, self.visitPrototipo), (Arbol.FUNCION, self.visitFuncion),
+                              (Arbol.RETORNO, self.visitRetorno), (Arbol.LLAMADA, self.visitLlamada),
+                              (Arbol.CONSTANTE, self.visitConstante), (Arbol.NOMBRE, self.visitNombre),
+                              (Arbol.BINARIA, self.visitBinaria), (Arbol.NEGACION, self.visitNegacion),
+                              (Arbol.INCREMENTO, self.visitIncremento)):
+            self._visitas[clase] = metodo
+
+    def visit(self, nodo):
+        return self._visitas[nodo.clase](nodo)
+
+    # ------------------------------
+    # Emisión y nombres
+    # ------------------------------
+    def emitir(self, instruccion: str):
+        self.salida.write(instruccion + "\n")
+        self.instrucciones += 1
+
+    def nuevoTemporal(self) -> str:
+        t = f"t{self._temporales}"
+        self._temporales += 1
+        return t
+
+    def nuevaEtiqueta(self) -> str:
+        etiqueta = f"L{self._etiquetas}"
+        self._etiquetas += 1
+        return etiqueta
+
+    def _nombreUnico(self, nombre: str) -> str:
+        if nombre in self._usados or _RESERVADO.match(nombre):
+            self._sufijos[nombre] = self._sufijos.get(nombre, 0) + 1
+            nombre = f"{nombre}.{self._sufijos[nombre]}"
+        self._usados.add(nombre)
+        return nombre
+
+    def _declarar(self, nombre: str, tipo: str) -> str:
+        codigo = self._nombreUnico(nombre)
+        self._contextos[-1][nombre] = (codigo, tipo)
+        return codigo
+
+    def _resolver(self, nombre: str) -> tuple:
+        for contexto in reversed(self._contextos):
+            if nombre in contexto:
+                return contexto[nombre]
+        return (nombre, None) # no declarada: el semántico ya lo reportó
+
+    def _convertir(self, direccion: str, origen: str, destino: str) -> str:
+        """Promueve un valor int a double cuando el destino es double."""
+        if destino != 'double' or origen != 'int':
+            return direccion
+        if esConstante(direccion):
+            constante = formatearConstante(float(valorConstante(direccion)))
+            if constante is not None:
+                return constante
+        t = self.nuevoTemporal()
+        self.emitir(f"{t} = (double) {direccion}")
+        return t
+
+    # ------------------------------
+    # Programa e instrucciones
+    # ------------------------------
+    def visitPrograma(self, nodo: Arbol.Programa):
+        self.visitInstrucciones(nodo.instrucciones)
+
+        main = self._funciones.get("main")
+        if self.llamarMain and main is not None and not main[2]:
+            self._llamar(main[0], main[1])
+        if self._finPrograma is not None:
+            self.emitir(f"label {self._finPrograma}")
+        return self.instrucciones
+
+    def visitInstrucciones(self, instrucciones: list):
+        # una llamada como instrucción deja su resultado (si lo hay) en un temporal que nadie lee
+        for instruccion in instrucciones:
+            self.visit(instruccion)
+
+    def visitBloque(self, nodo: Arbol.Bloque):
+        self._contextos.append({})
+        self.visitInstrucciones(nodo.instrucciones)
+        self._contextos.pop()
+
+    def _visitInstruccion(self, nodo):
+        """El cuerpo de un if, while o for: una sola instrucción (que puede faltar, como en `for (...) ;`)."""
+        if nodo is not None:
+            self.visit(nodo)
+
+    # ------------------------------
+    # Declaraciones y asignaciones
+    # ------------------------------
+    def visitDeclaracion(self, nodo: Arbol.Declaracion):
+        tipo = nodo.tipo
+        for nombre, _, inicializador in nodo.declaradores:
+            # el inicializador se evalúa antes de declarar: en `int x = x;` la x de la derecha es la de afuera
+            valor = self._convertir(self.visit(inicializador), inicializador.tipoDato, tipo) if inicializador is not None else None
+            codigo = self._declarar(nombre, tipo)
+            if valor is not None:
+                self.emitir(f"{codigo} = {valor}")
+            elif len(self._contextos) == 1 and self._funcionActual is None:
+                self.emitir(f"{codigo} = {'0.0' if tipo == 'double' else '0'}") # las globales arrancan en cero
+
+    def visitAsignacion(self, nodo: Arbol.Asignacion):
+        nombre, tipo = self._resolver(nodo.nombre)
+        valor = self._convertir(self.visit(nodo.valor), nodo.valor.tipoDato, tipo)
+        self.emitir(f"{nombre} = {valor}")
+
+    # ------------------------------
+    # Control de flujo
+    # ------------------------------
+    def _condicionConstante(self, condicion):
+        """True o False si la condición se conoce al compilar, None si hay que evaluarla."""
+        valor = Arbol.constante(condicion)
+        return None if valor is None else bool(valor)
+
+    def visitSi(self, nodo: Arbol.Si):
+        constante = self._condicionConstante(nodo.condicion)
+        if constante is not None:
+            self._visitInstruccion(nodo.entonces if constante else nodo.sino)
+            return
+
+        condicion = self.visit(nodo.condicion)
+        if nodo.sino is None:
+            fin = self.nuevaEtiqueta()
+            self.emitir(f"ifnot {condicion} jmp {fin}")
+            self._visitInstruccion(nodo.entonces)
+            self.emitir(f"label {fin}")
+            return
+
+        verdadero, fin = self.nuevaEtiqueta(), self.nuevaEtiqueta()
+        self.emitir(f"if {condicion} jmp {verdadero}")
+        self._visitInstruccion(nodo.sino)
+        self.emitir(f"jmp {fin}")
+        self.emitir(f"label {verdadero}")
+        self._visitInstruccion(nodo.entonces)
+        self.emitir(f"label {fin}")
+
+    def visitMientras(self, nodo: Arbol.Mientras):
+        constante = self._condicionConstante(nodo.condicion)
+        if constante is False:
+            return
+        inicio, fin = self.nuevaEtiqueta(), self.nuevaEtiqueta()
+        self.emitir(f"label {inicio}")
+        if constante is None:
+            condicion = self.visit(nodo.condicion)
+            self.emitir(f"ifnot {condicion} jmp {fin}")
+        self._visitInstruccion(nodo.cuerpo)
+        self.emitir(f"jmp {inicio}")
+        self.emitir(f"label {fin}")
+
+    def visitPara(self, nodo: Arbol.Para):
+        self._contextos.append({}) # la variable declarada en el for vive solo en el for
+        for inicializacion in nodo.inicializacion:
+            self.visit(inicializacion)
+
+        constante = self._condicionConstante(nodo.condicion)
+        if constante is False: # el cuerpo y el paso nunca se ejecutan
+            self._contextos.pop()
+            return
+        inicio, fin = self.nuevaEtiqueta(), self.nuevaEtiqueta()
+        self.emitir(f"label {inicio}")
+        if nodo.condicion is not None and constante is None:
+            condicion = self.visit(nodo.condicion)
+            self.emitir(f"ifnot {condicion} jmp {fin}")
+        self._visitInstruccion(nodo.cuerpo)
+        for paso in nodo.pasos:
+            self.visit(paso)
+        self.emitir(f"jmp {inicio}")
+        self.emitir(f"label {fin}")
+        self._contextos.pop()
+
+    # ------------------------------
+    # Funciones
+    # ------------------------------
+    def _registrarFuncion(self, nombre: str, tipo: str, tiposParams: list) -> str:
+        if nombre not in self._funciones:
+            self._funciones[nombre] = (self._nombreUnico(nombre), tipo, tiposParams)
+        return self._funciones[nombre][0]
+
+    def etiquetas(self) -> dict:
+        """Etiqueta en el código de cada función definida o prototipada."""
+        return {nombre: funcion[0] for nombre, funcion in self._funciones.items()}
+
+    def visitPrototipo(self, nodo: Arbol.Prototipo):
+        self._registrarFuncion(nodo.nombre, nodo.tipo, nodo.tiposParametros)
+        self.prototipos.setdefault(nodo.nombre, (nodo.tipo, nodo.tiposParametros, nodo.token.line if nodo.token is not None else None))
+
+    def visitFuncion(self, nodo: Arbol.Funcion):
+        tipo = nodo.tipo
+        tiposParams = [tipoParam for _, tipoParam, _ in nodo.parametros]
+        etiqueta = self._registrarFuncion(nodo.nombre, tipo, tiposParams)
+        self.definidas.setdefault(nodo.nombre, (tipo, tiposParams))
+
+        salto = self.nuevaEtiqueta()
+        self.emitir(f"jmp {salto}") # el flujo del nivel global no entra a la función
+        self.emitir(f"label {etiqueta}")
+        retorno = self.nuevoTemporal()
+        self.emitir(f"pop {retorno}") # dirección de retorno
+
+        anterior = self._funcionActual
+        self._funcionActual = (tipo, retorno)
+        self._contextos.append({})
+        nombres = [self._declarar(nombre, tipoParam) for nombre, tipoParam, _ in nodo.parametros]
+        for nombre in reversed(nombres): # los argumentos se apilaron en orden
+            self.emitir(f"pop {nombre}")
+        self.visitInstrucciones(nodo.cuerpo) # el cuerpo comparte el contexto de los parámetros
+        self._contextos.pop()
+        self._funcionActual = anterior
+
+        # si el cuerpo termina sin return, se vuelve igual (con 0 como resultado si no es void)
+        if tipo != 'void':
+            self.emitir("push 0")
+        self.emitir(f"jmp {retorno}")
+        self.emitir(f"label {salto}")
+
+    def visitRetorno(self, nodo: Arbol.Retorno):
+        if self._funcionActual is None:
+            # return en el nivel global: termina el programa
+            if nodo.valor is not None:
+                self.visit(nodo.valor)
+            if self._finPrograma is None:
+                self._finPrograma = self.nuevaEtiqueta()
+            self.emitir(f"jmp {self._finPrograma}")
+            return
+
+        tipo, retorno = self._funcionActual
+        if nodo.valor is not None:
+            valor = self._convertir(self.visit(nodo.valor), nodo.valor.tipoDato, tipo)
+            if tipo != 'void':
+                self.emitir(f"push {valor}")
+        elif tipo != 'void':
+            self.emitir("push 0")
+        self.emitir(f"jmp {retorno}")
+
+    def visitLlamada(self, nodo: Arbol.Llamada):
+        etiqueta, tipo, tiposParams = self._funciones.get(nodo.nombre, (nodo.nombre, None, []))
+        self.llamadas.add(nodo.nombre)
+        # primero se evalúan todos los argumentos (pueden tener llamadas anidadas) y después se apilan
+        valores = []
+        for pos, arg in enumerate(nodo.argumentos):
+            destino = tiposParams[pos] if pos < len(tiposParams) else None
+            valores.append(self._convertir(self.visit(arg), arg.tipoDato, destino))
+        for valor in valores:
+            self.emitir(f"push {valor}")
+        return self._llamar(etiqueta, tipo)
+
+    def _llamar(self, etiqueta: str, tipo: str) -> str:
+        vuelta = self.nuevaEtiqueta()
+        self.emitir(f"push {vuelta}")
+        self.emitir(f"jmp {etiqueta}")
+        self.emitir(f"label {vuelta}")
+        if tipo == 'void':
+            return None
+        resultado = self.nuevoTemporal()
+        self.emitir(f"pop {resultado}")
+        return resultado
+
+    # ------------------------------
+    # Expresiones: cada visita devuelve la dirección (variable, constante o temporal) con el resultado
+    # ------------------------------
+    def visitConstante(self, nodo: Arbol.Constante):
+        return formatearConstante(nodo.valor)
+
+    def visitNombre(self, nodo: Arbol.Nombre):
+        return self._resolver(nodo.nombre)[0]
+
+    def _operarConstantes(self, izquierda: str, operador: str, derecha: str) -> str:
+        if not (esConstante(izquierda) and esConstante(derecha)):
+            return None
+        try:
+            return formatearConstante(calcular(operador, valorConstante(izquierda), valorConstante(derecha)))
+        except ZeroDivisionError:
+            return None # el semántico ya lo reportó; se genera igual y falla al ejecutarse
+
+    def visitBinaria(self, nodo: Arbol.Binaria):
+        """Operandos asociados a izquierda: t0 = a op b, t1 = t0 op c, ...
+
+        La rama izquierda de una cadena larga se recorre con un ciclo, no con recursión, así que el
+        largo de la expresión no cambia la profundidad de la pila.
+        """
+        cadena = []
+        while nodo.clase == Arbol.BINARIA:
+            cadena.append(nodo)
+            nodo = nodo.izquierda
+        izquierda = self.visit(nodo)
+        for binaria in reversed(cadena):
+            derecha = self.visit(binaria.derecha)
+            constante = self._operarConstantes(izquierda, binaria.operador, derecha)
+            if constante is not None: # con errores de tipos el semántico no pliega; acá se pliega igual
+                izquierda = constante
+                continue
+            t = self.nuevoTemporal()
+            self.emitir(f"{t} = {izquierda} {binaria.operador} {derecha}")
+            izquierda = t
+        return izquierda
+
+    def visitNegacion(self, nodo: Arbol.Negacion):
+        valor = self.visit(nodo.operando)
+        t = self.nuevoTemporal()
+        self.emitir(f"{t} = {valor} == 0")
+        return t
+
+    def visitIncremento(self, nodo: Arbol.Incremento):
+        valor = self.visit(nodo.operando)
+        if nodo.prefijo:
+            # ++x / --x: primero se modifica la variable y el valor es el nuevo
+            destino = valor if nodo.asigna else self.nuevoTemporal()
+            self.emitir(f"{destino} = {valor} {nodo.operador} 1")
+            return destino
+
+        # x++ / x--: el valor es el anterior a modificar la variable
+        anterior = self.nuevoTemporal()
+        self.emitir(f"{anterior} = {valor}")
+        if nodo.asigna:
+            self.emitir(f"{valor} = {valor} {nodo.operador} 1")
+        return anterior
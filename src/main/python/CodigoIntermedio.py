@@ -0,0 +1,167 @@
+"""Representación del código de tres direcciones que genera Caminante.
+
+Cada línea del archivo es una instrucción; acá se convierten en tuplas (y de vuelta a texto)
+para que el optimizador y la máquina virtual no tengan que volver a partir cadenas.
+"""
+import math
+import re
+
+# Clase de instrucción (primer elemento de la tupla) y forma del resto de la tupla
+ETIQUETA = 0     # (ETIQUETA, L)              label L
+SALTO = 1        # (SALTO, L)                 jmp L (L también puede ser una variable con una dirección)
+SALTO_SI = 2     # (SALTO_SI, x, L)           if x jmp L
+SALTO_SI_NO = 3  # (SALTO_SI_NO, x, L)        ifnot x jmp L
+APILAR = 4       # (APILAR, x)                push x
+DESAPILAR = 5    # (DESAPILAR, x)             pop x
+COPIA = 6        # (COPIA, x, y)              x = y
+CONVERSION = 7   # (CONVERSION, x, y)         x = (double) y
+OPERACION = 8    # (OPERACION, x, a, op, b)   x = a op b
+
+OPERADORES = ("+", "-", "*", "/", "%", "==", "!=", "<", ">", "<=", ">=", "&&", "||")
+CONMUTATIVOS = frozenset(("+", "*", "==", "!=", "&&", "||"))
+
+_TEMPORAL = re.compile(r"t\d+$")
+_CONSTANTE = re.compile(r"-?\d+(\.\d+)?$")
+
+
+def leer(linea: str) -> tuple:
+    """Convierte una línea de código en su tupla. Devuelve None para las líneas vacías."""
+    partes = linea.split()
+    if not partes:
+        return None
+    if len(partes) == 2:
+        clase = {"label": ETIQUETA, "jmp": SALTO, "push": APILAR, "pop": DESAPILAR}.get(partes[0])
+        if clase is not None:
+            return (clase, partes[1])
+    elif len(partes) == 4 and partes[0] in ("if", "ifnot") and partes[2] == "jmp":
+        return (SALTO_SI if partes[0] == "if" else SALTO_SI_NO, partes[1], partes[3])
+    elif len(partes) == 3 and partes[1] == "=":
+        return (COPIA, partes[0], partes[2])
+    elif len(partes) == 4 and partes[1] == "=" and partes[2] == "(double)":
+        return (CONVERSION, partes[0], partes[3])
+    elif len(partes) == 5 and partes[1] == "=" and partes[3] in OPERADORES:
+        return (OPERACION, partes[0], partes[2], partes[3], partes[4])
+    raise ValueError(f"Instrucción de tres direcciones inválida: '{linea.strip()}'")
+
+
+def escribir(instruccion: tuple) -> str:
+    clase = instruccion[0]
+    if clase == ETIQUETA:
+        return f"label {instruccion[1]}"
+    if clase == SALTO:
+        return f"jmp {instruccion[1]}"
+    if clase == SALTO_SI:
+        return f"if {instruccion[1]} jmp {instruccion[2]}"
+    if clase == SALTO_SI_NO:
+        return f"ifnot {instruccion[1]} jmp {instruccion[2]}"
+    if clase == APILAR:
+        return f"push {instruccion[1]}"
+    if clase == DESAPILAR:
+        return f"pop {instruccion[1]}"
+    if clase == COPIA:
+        return f"{instruccion[1]} = {instruccion[2]}"
+    if clase == CONVERSION:
+        return f"{instruccion[1]} = (double) {instruccion[2]}"
+    return f"{instruccion[1]} = {instruccion[2]} {instruccion[3]} {instruccion[4]}"
+
+
+def leerArchivo(ruta: str):
+    """Generador de las instrucciones de un archivo, de a una (no carga el archivo entero)."""
+    with open(ruta) as f:
+        for linea in f:
+            instruccion = leer(linea)
+            if instruccion is not None:
+                yield instruccion
+
+
+# ------------------------------
+# Operandos
+# ------------------------------
+def esTemporal(operando: str) -> bool:
+    return _TEMPORAL.match(operando) is not None
+
+def esConstante(operando: str) -> bool:
+    return _CONSTANTE.match(operando) is not None
+
+def valorConstante(operando: str):
+    return float(operando) if "." in operando else int(operando)
+
+def formatearConstante(valor) -> str:
+    """Texto de una constante calculada, o None si no se puede escribir como constante (1e+300, inf, nan)."""
+    texto = repr(valor) if isinstance(valor, float) else str(valor)
+    return texto if _CONSTANTE.match(texto) else None
+
+
+def definida(instruccion: tuple) -> str:
+    """Variable que escribe la instrucción (o None)."""
+    if instruccion[0] in (COPIA, CONVERSION, OPERACION, DESAPILAR):
+        return instruccion[1]
+    return None
+
+
+def leidas(instruccion: tuple) -> tuple:
+    """Operandos que lee la instrucción (variables, temporales, constantes o etiquetas usadas como valor)."""
+    clase = instruccion[0]
+    if clase == OPERACION:
+        return (instruccion[2], instruccion[4])
+    if clase in (COPIA, CONVERSION):
+        return (instruccion[2],)
+    if clase in (SALTO_SI, SALTO_SI_NO, APILAR, SALTO):
+        return (instruccion[1],)
+    return ()
+
+
+def reemplazarLecturas(instruccion: tuple, reemplazo) -> tuple:
+    """Devuelve la instrucción con cada operando leído x cambiado por reemplazo(x)."""
+    clase = instruccion[0]
+    if clase == OPERACION:
+        return (OPERACION, instruccion[1], reemplazo(instruccion[2]), instruccion[3], reemplazo(instruccion[4]))
+    if clase in (COPIA, CONVERSION):
+        return (clase, instruccion[1], reemplazo(instruccion[2]))
+    if clase in (SALTO_SI, SALTO_SI_NO):
+        return (clase, reemplazo(instruccion[1]), instruccion[2])
+    if clase == APILAR:
+        return (APILAR, reemplazo(instruccion[1]))
+    return instruccion
+
+
+# ------------------------------
+# Aritmética con la semántica de C
+# ------------------------------
+def calcular(op: str, a, b):
+    """Aplica un operador binario. Entre enteros, / y % truncan hacia cero como en C. Lanza ZeroDivisionError."""
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if op in ("/", "%") and b == 0:
+        raise ZeroDivisionError(f"{a} {op} 0")
+    if op == "/":
+        if isinstance(a, int) and isinstance(b, int):
+            cociente = abs(a) // abs(b)
+            return cociente if (a >= 0) == (b >= 0) else -cociente
+        return a / b
+    if op == "%":
+        if isinstance(a, int) and isinstance(b, int):
+            resto = abs(a) % abs(b)
+            return resto if a >= 0 else -resto
+        return math.fmod(a, b)
+    if op == "==":
+        return int(a == b)
+    if op == "!=":
+        return int(a != b)
+    if op == "<":
+        return int(a < b)
+    if op == ">":
+        return int(a > b)
+    if op == "<=":
+        return int(a <= b)
+    if op == ">=":
+        return int(a >= b)
+    if op == "&&":
+        return int(bool(a) and bool(b))
+    if op == "||":
+        return int(bool(a) or bool(b))
+    raise ValueError(f"Operador desconocido: '{op}'")
@@ -0,0 +1,365 @@
+import base64
+import os
+import time
+from antlr4 import FileStream, InputStream
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from compiladorLexer  import compiladorLexer
+from compiladorParser import compiladorParser
+from Escucha import Escucha
+from EscuchaErroresSintacticos import EscuchaErroresSintacticos
+from CompileSession import CompileSession
+from Diagnosticos import LimiteDeErrores
+from Enumeraciones import TipoError
+from Entrada import FlujoMapeado, FlujoTokensAcotado, flujoDeTokens
+# Lo que solo hace falta para generar código, objetos o perfiles (Caminante, Optimizador, Objeto,
+# Perfilador) se importa recién al usarlo: compilar un archivo chico no paga esos imports.
+
+# Cuántas compilaciones de este proceso resolvió la etapa SLL y cuántas tuvieron que repetirse con LL completo
+# (y, de las de SLL, cuántas analizaron sus funciones en paralelo)
+estadisticasParseo = {"sll": 0, "fallbackLL": 0, "paralelo": 0}
+
+
+class _CorteAlLimite:
+    """Corta el parseo en el próximo punto de sincronización una vez que la sesión llegó al máximo de errores.
+
+    El corte no puede hacerse desde los listeners: ANTLR los llama dentro del `finally` de cada regla.
+    """
+
+    def __init__(self, sesion: CompileSession):
+        super().__init__()
+        self.sesion = sesion
+
+    def sync(self, recognizer):
+        if self.sesion.diagnosticos.detenido:
+            raise LimiteDeErrores()
+        super().sync(recognizer)
+
+
+class _BailConLimite(_CorteAlLimite, BailErrorStrategy):
+    pass
+
+
+class _RecuperacionConLimite(_CorteAlLimite, DefaultErrorStrategy):
+    pass
+
+
+def compilar(archivo: str, sesion: CompileSession = None, dosEtapas: bool = True, mapeado: bool = False) -> dict:
+    """Compila un archivo fuente completo (léxico, sintáctico y semántico) y devuelve un resumen del resultado.
+
+    Todo el estado de la compilación vive en `sesion`, así que se puede llamar varias veces en el mismo proceso.
+    Con `mapeado`, o si el archivo es "-" (la entrada estándar), el fuente se lee con un FlujoMapeado:
+    ni el texto ni los tokens quedan enteros en memoria (ver Entrada).
+    """
+    if sesion is None:
+        sesion = CompileSession(archivo)
+    if mapeado or archivo == "-":
+        with FlujoMapeado.desdeStdin() if archivo == "-" else FlujoMapeado(archivo) as entrada:
+            return compilarEntrada(entrada, sesion, dosEtapas)
+    return compilarEntrada(FileStream(archivo), sesion, dosEtapas)
+
+
+def compilarEntrada(input: InputStream, sesion: CompileSession, dosEtapas: bool = True) -> dict:
+    """Compila un stream de caracteres ya abierto (archivo, texto generado, etc.) dentro de la sesión dada.
+
+    Con `dosEtapas` se parsea primero en modo SLL, que es mucho más barato, abortando ante el primer error.
+    Solo si esa etapa falla se vuelve a parsear desde cero con LL completo y el listener de errores sintácticos,
+    así que los diagnósticos son los mismos que con una única pasada LL.
+
+    Si la sesión tiene un caché y ya se compiló el mismo fuente con las mismas opciones, se reponen
+    la salida, los diagnósticos, la TS y el código intermedio guardados sin crear el lexer ni el parser.
+    """
+    inicio = time.perf_counter()
+    perfilador = sesion.perfilador
+    if perfilador is not None:
+        perfilador.iniciar()
+
+    try:
+        with sesion.medir("total"):
+            resultado = None
+            usarCache = sesion.cache is not None and sesion.rutaObjeto is None # el objeto ya es la unidad que se reutiliza (ver Enlazador)
+            usarCache = usarCache and hasattr(input, "strdata") # un FlujoMapeado no tiene el fuente entero en memoria
+            if usarCache:
+                with sesion.medir("cache"):
+                    clave = sesion.cache.clave(input.strdata, _opcionesCache(sesion, dosEtapas))
+                    entrada = sesion.cache.buscar(clave)
+                    if entrada is not None:
+                        resultado = _reponer(entrada, sesion)
+            if resultado is None:
+                resultado = _compilarEntrada(input, sesion, dosEtapas)
+                if usarCache:
+                    with sesion.medir("cache"):
+                        sesion.cache.guardar(clave, _entradaCache(resultado, sesion))
+    finally:
+        if perfilador is not None:
+            perfilador.detener()
+        if sesion.eco:
+            sesion.volcar() # toda la salida de la compilación en una sola escritura
+
+    if perfilador is not None:
+        # El semántico corre como parse listener: se separa del parseo y, a su vez, de las fases finales que contiene
+        perfilador.derivar("sintactico", ["parseoSLL", "parseoLL"], ["semantico"])
+        perfilador.descontar("semantico", "flujoDatos", "exportTS")
+        resultado["perfil"] = perfilador.aDict()
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def _compilarEntrada(input: InputStream, sesion: CompileSession, dosEtapas: bool) -> dict:
+    perfilador = sesion.perfilador
+    if perfilador is not None:
+        from Perfilador import ListenerCronometrado
+    lexer = compiladorLexer(input)
+    stream = flujoDeTokens(lexer)
+    acotado = isinstance(stream, FlujoTokensAcotado) # la entrada es un FlujoMapeado: solo se guardan los últimos tokens
+    parser = compiladorParser(stream)
+
+    if perfilador is not None and not acotado:
+        # Con el perfilador se tokeniza todo antes de parsear, para medir el léxico por separado
+        with sesion.medir("lexico"):
+            stream.fill()
+
+    # Eliminación del ErrorListener por defecto
+    parser.removeErrorListeners()
+    escuchaErroresSintacticos = EscuchaErroresSintacticos(sesion)
+
+    def nuevaEscucha():
+        escucha = Escucha(sesion)
+        parser.addParseListener(escucha if perfilador is None else ListenerCronometrado(escucha, perfilador, "semantico"))
+        return escucha
+
+    tree = None
+    fallbackLL = False
+    detenido = False # se llegó al máximo de errores de la sesión
+    if not acotado and _enParalelo(sesion, dosEtapas):
+        from AnalisisParalelo import parsearEnParalelo
+        envolver = None if perfilador is None else (lambda escucha: ListenerCronometrado(escucha, perfilador, "semantico"))
+        with sesion.medir("parseoSLL"):
+            tree = parsearEnParalelo(stream, sesion, envolver)
+        if tree is None: # no se pudo repartir: se compila en serie desde cero
+            sesion.reiniciar()
+        else:
+            estadisticasParseo["sll"] += 1
+            estadisticasParseo["paralelo"] += 1
+
+    if dosEtapas and tree is None:
+        # Primera etapa: SLL sin recuperación de errores. Si falla, se descarta la salida acumulada en el intento
+        parser._interp.predictionMode = PredictionMode.SLL
+        parser._errHandler = _BailConLimite(sesion)
+        nuevaEscucha()
+        try:
+            with sesion.medir("parseoSLL"):
+                tree = parser.programa()
+            estadisticasParseo["sll"] += 1
+        except LimiteDeErrores:
+            # Todos los errores hasta acá son semánticos y anteriores al primer error sintáctico: valen igual que con LL
+            detenido = True
+            estadisticasParseo["sll"] += 1
+        except ParseCancellationException:
+            # Hay un error sintáctico (o SLL no alcanza): se descarta todo lo hecho en el intento
+            sesion.reiniciar()
+            parser.removeParseListeners()
+            if acotado: # los tokens leídos ya se descartaron: se vuelve a tokenizar desde el principio
+                lexer.reset()
+                stream = flujoDeTokens(lexer)
+                parser.setTokenStream(stream)
+            else:
+                parser.reset() # vuelve al primer token; los tokens ya leídos quedan en el stream
+            fallbackLL = True
+            estadisticasParseo["fallbackLL"] += 1
+
+    if tree is None and not detenido:
+        # Pasada LL completa, con recuperación y reporte de errores sintácticos
+        parser._interp.predictionMode = PredictionMode.LL
+        parser._errHandler = _RecuperacionConLimite(sesion)
+        parser.addErrorListener(escuchaErroresSintacticos)
+        nuevaEscucha()
+        try:
+            with sesion.medir("parseoLL"):
+                tree = parser.programa()
+        except LimiteDeErrores:
+            detenido = True
+
+    # Del árbol de ANTLR solo queda la raíz, sin hijos: Escucha lo fue bajando al AST mientras se parseaba
+    arbol = tree.nodo if tree is not None else None
+
+    if perfilador is not None:
+        from Arbol import contarNodos
+        perfilador.contar("tokens", len(stream.tokens))
+        perfilador.contar("nodosAST", contarNodos(arbol))
+        perfilador.contar("simbolos", sum(len(contexto.simbolos) for contexto in sesion.TS.historialCTX))
+        perfilador.contar("contextos", len(sesion.TS.historialCTX))
+
+    objeto = None
+    if sesion.rutaObjeto is not None:
+        if arbol is None or sesion.diagnosticos.hayErrores():
+            sesion.informar("No se genera el archivo objeto: la compilación tuvo errores.")
+        else:
+            with sesion.medir("objeto"):
+                instrucciones = _generarObjeto(arbol, sesion, str(input))
+            objeto = sesion.rutaObjeto
+            sesion.informar(f"Objeto: {instrucciones} instrucciones en {objeto}")
+
+    codigoIntermedio = None
+    if sesion.rutaTAC is not None:
+        if arbol is None or sesion.diagnosticos.hayErrores(TipoError.SINTACTICO):
+            _informarCodigo(None, sesion)
+        else:
+            with sesion.medir("codigoIntermedio"):
+                codigoIntermedio = _generarCodigo(arbol, sesion)
+            _informarCodigo(codigoIntermedio, sesion)
+
+    # print(escucha)
+
+    lineas = input.lineas() if acotado else input.strdata.count("\n") + 1
+    return _resultado(sesion, lineas, len(stream.tokens), fallbackLL, detenido, codigoIntermedio, objeto)
+
+
+def _enParalelo(sesion: CompileSession, dosEtapas: bool) -> bool:
+    """Si las funciones globales se pueden analizar aparte (en paralelo o reutilizando las de la compilación
+    anterior): esa etapa es SLL, no arma el AST de las funciones (no hay código que generar) y no sabe
+    cortar al máximo de errores."""
+    repartir = sesion.incremental is not None or (sesion.procesosSemantico is not None and sesion.procesosSemantico > 1)
+    return (repartir and dosEtapas
+            and sesion.diagnosticos.maxErrores is None and sesion.rutaTAC is None and sesion.rutaObjeto is None)
+
+
+def _resultado(sesion: CompileSession, lineas: int, tokens: int, fallbackLL: bool, detenido: bool, codigoIntermedio: dict,
+               objeto: str = None, desdeCache: bool = False) -> dict:
+    return {
+        "archivo": sesion.archivo,
+        "erroresSintacticos": sesion.diagnosticos.cantidad(TipoError.SINTACTICO),
+        "huboErrores": sesion.diagnosticos.hayErrores(),
+        "lineas": lineas,
+        "tokens": tokens,
+        "fallbackLL": fallbackLL,
+        "detenido": detenido,
+        "codigoIntermedio": codigoIntermedio,
+        "objeto": objeto,
+        "desdeCache": desdeCache,
+        "diagnosticos": sesion.diagnosticos.textos(),
+        "registros": [d.aDict() for d in sesion.diagnosticos.registros],
+    }
+
+
+def _informarCodigo(codigoIntermedio: dict, sesion: CompileSession):
+    """El aviso del código intermedio, siempre el último mensaje de la compilación (ver _entradaCache)."""
+    if codigoIntermedio is None:
+        sesion.informar("No se genera el código intermedio: el árbol tiene errores sintácticos o quedó incompleto.")
+        return
+    mensaje = f"Código intermedio: {codigoIntermedio['despues']} instrucciones en {sesion.rutaTAC}"
+    if sesion.pasesTAC is not None:
+        mensaje += f" ({codigoIntermedio['antes']} antes de optimizar)"
+    temporales = codigoIntermedio.get("temporales")
+    if temporales is not None:
+        mensaje += (f"; {temporales['temporalesDespues']} temporales ({temporales['temporalesAntes']} antes de reutilizarlos),"
+                    f" hasta {temporales['maxVivosDespues']} vivos a la vez ({temporales['maxVivosAntes']} antes)")
+        if temporales["derramados"]:
+            mensaje += f", {temporales['derramados']} guardados en la pila"
+    sesion.informar(mensaje)
+
+
+# ------------------------------
+# Caché
+# ------------------------------
+def _opcionesCache(sesion: CompileSession, dosEtapas: bool) -> dict:
+    """Las opciones de la sesión que cambian el resultado (las rutas de salida no: sus contenidos se guardan aparte)."""
+    return {
+        "dosEtapas": dosEtapas,
+        "maxErrores": sesion.diagnosticos.maxErrores,
+        "ts": sesion.exportadorTS.formato if sesion.rutaTS is not None else None,
+        "tac": sesion.rutaTAC is not None,
+        "pasesTAC": list(sesion.pasesTAC) if sesion.pasesTAC is not None else None,
+        "temporales": [sesion.reusarTemporales, sesion.maxTemporales],
+    }
+
+
+def _leer(ruta: str) -> str:
+    if ruta is None or not os.path.exists(ruta):
+        return None
+    with open(ruta) as f:
+        return f.read()
+
+
+def _contenidoTS(sesion: CompileSession) -> str:
+    """Lo que la compilación escribió como TS, como texto (el caché es JSON: el formato binario va en base64)."""
+    if sesion.contenidoTS is None or not sesion.exportadorTS.binario:
+        return sesion.contenidoTS
+    return base64.b64encode(sesion.contenidoTS).decode("ascii")
+
+
+def _entradaCache(resultado: dict, sesion: CompileSession) -> dict:
+    salida = sesion.salida()
+    if sesion.rutaTAC is not None:
+        salida = salida[:-1] # el aviso del código intermedio nombra la ruta: se rearma al reponer
+    return {
+        "lineas": resultado["lineas"],
+        "tokens": resultado["tokens"],
+        "fallbackLL": resultado["fallbackLL"],
+        "detenido": resultado["detenido"],
+        "codigoIntermedio": resultado["codigoIntermedio"],
+        "salida": salida,
+        "diagnosticos": sesion.diagnosticos.aDict(),
+        "ts": _contenidoTS(sesion),
+        "tac": _leer(sesion.rutaTAC) if resultado["codigoIntermedio"] is not None else None,
+    }
+
+
+def _reponer(entrada: dict, sesion: CompileSession) -> dict:
+    """Deja la sesión y los archivos de salida como los habría dejado compilar el mismo fuente."""
+    for mensaje in entrada["salida"]:
+        sesion.informar(mensaje)
+    sesion.diagnosticos.cargar(entrada["diagnosticos"])
+    if sesion.rutaTS is not None and entrada["ts"] is not None:
+        sesion.escribirTS(base64.b64decode(entrada["ts"]) if sesion.exportadorTS.binario else entrada["ts"])
+    if sesion.rutaTAC is not None and entrada["tac"] is not None:
+        with open(sesion.rutaTAC, "w") as f:
+            f.write(entrada["tac"])
+    if sesion.rutaTAC is not None:
+        _informarCodigo(entrada["codigoIntermedio"], sesion)
+    return _resultado(sesion, entrada["lineas"], entrada["tokens"], entrada["fallbackLL"], entrada["detenido"],
+                      entrada["codigoIntermedio"], desdeCache=True)
+
+
+def _generarCodigo(arbol, sesion: CompileSession) -> dict:
+    """Escribe el código de tres direcciones en sesion.rutaTAC, pasándolo por el optimizador y por la
+    reasignación de temporales si la sesión lo pide.
+
+    El código se escribe a medida que se genera, así que nunca está entero en memoria. Para optimizarlo
+    se genera primero en un archivo temporal al lado del destino, que el optimizador lee de a bloques.
+    La reasignación de temporales sí carga el programa entero y reescribe sesion.rutaTAC.
+    """
+    from Caminante import Caminante
+    if sesion.pasesTAC is None:
+        with open(sesion.rutaTAC, "w") as salida:
+            instrucciones = Caminante(salida).visit(arbol)
+        estadisticas = {"antes": instrucciones, "despues": instrucciones}
+    else:
+        import tempfile
+        from Optimizador import Optimizador
+        descriptor, crudo = tempfile.mkstemp(suffix=".tac", dir=os.path.dirname(os.path.abspath(sesion.rutaTAC)))
+        try:
+            with os.fdopen(descriptor, "w") as salida:
+                Caminante(salida).visit(arbol)
+            estadisticas = Optimizador(sesion.pasesTAC).optimizarArchivo(crudo, sesion.rutaTAC)
+        finally:
+            os.remove(crudo)
+
+    if sesion.reusarTemporales:
+        from AsignacionTemporales import AsignadorTemporales
+        temporales = AsignadorTemporales(sesion.maxTemporales).asignarArchivo(sesion.rutaTAC, sesion.rutaTAC)
+        estadisticas = dict(estadisticas, despues=temporales["despues"],
+                            temporales={clave: valor for clave, valor in temporales.items() if clave not in ("antes", "despues")})
+    return estadisticas
+
+
+def _generarObjeto(arbol, sesion: CompileSession, fuente: str) -> int:
+    """Escribe el archivo objeto del módulo en sesion.rutaObjeto: su código, sin llamar a main, y sus firmas."""
+    from Caminante import Caminante
+    from Objeto import Objeto, Instrucciones
+    codigo = Instrucciones()
+    caminante = Caminante(codigo, llamarMain=False)
+    caminante.visit(arbol)
+    Objeto.desdeCaminante(sesion.archivo or sesion.rutaObjeto, caminante, codigo, fuente).guardar(sesion.rutaObjeto)
+    return len(codigo)
@@ -0,0 +1,93 @@
+import sys
+from contextlib import nullcontext
+from tablaDeSimbolos.SymbolTable import TS
+from tablaDeSimbolos.Exportadores import exportadorTS
+from Diagnosticos import ColectorDiagnosticos, Diagnostico
+from Enumeraciones import TipoError, CodigoError
+
+# Lo que se exporta en lugar de la TS cuando la compilación tuvo errores
+TS_CON_ERRORES = "Imposible generar la TS: Se encontraron errores durante el parsing."
+
+
+class CompileSession:
+    """Estado propio de una compilación: tabla de símbolos, diagnósticos y rutas de salida.
+
+    Cada compilación trabaja sobre su propia sesión, así un mismo proceso puede compilar
+    varios archivos seguidos (o en paralelo, en distintos hilos) sin compartir símbolos.
+    """
+
+    def __init__(self, archivo: str = None, rutaTS: str = "ContenidoTS.txt", eco: bool = True, perfilador=None,
+                 maxErrores: int = None, formato: str = "texto", rutaTAC: str = None, pasesTAC=None, cache=None,
+                 rutaObjeto: str = None, procesosSemantico: int = None, incremental=None, formatoTS: str = "texto",
+                 reusarTemporales: bool = False, maxTemporales: int = None):
+        self.archivo = archivo
+        self.TS = TS() # Tabla de símbolos exclusiva de esta compilación
+        self.diagnosticos = ColectorDiagnosticos(maxErrores) # Errores detectados, en orden y sin cascadas
+        self.rutaTS = rutaTS # Archivo donde se vuelca la TS. None = no generar el archivo
+        self.exportadorTS = exportadorTS(formatoTS) # Formato del archivo de la TS: texto, json o binario (ver tablaDeSimbolos.Exportadores)
+        self.contenidoTS = None # Lo que se escribió en rutaTS (str o bytes), para guardarlo en el caché sin releer el archivo
+        self.rutaTAC = rutaTAC # Archivo del código de tres direcciones. None = no se genera
+        self.rutaObjeto = rutaObjeto # Archivo objeto del módulo, para enlazarlo con otros (ver Enlazador). None = no se genera
+        self.pasesTAC = pasesTAC # Pases del optimizador que se aplican al código (ver Optimizador.PASES). None = sin optimizar
+        self.reusarTemporales = reusarTemporales # Reasigna los temporales de cada función a lugares reutilizables (ver AsignacionTemporales)
+        self.maxTemporales = maxTemporales # Máximo de temporales vivos a la vez al reasignarlos; el resto va a la pila. None = sin máximo
+        self.eco = eco # Si es True, la salida se imprime de una vez al terminar la compilación (ver volcar())
+        self.formato = formato # "texto" (lo de siempre) o "json" (solo los diagnósticos, con posición y código)
+        self._salida = [] # Mensajes informativos y diagnósticos en texto, en el orden en que ocurrieron
+        self.perfilador = perfilador # Perfilador de fases (--profile). None = no se instrumenta
+        self.cache = cache # CacheCompilacion donde se buscan y guardan los resultados. None = siempre se compila
+        self.procesosSemantico = procesosSemantico # Procesos para analizar las funciones globales en paralelo (ver AnalisisParalelo). None = en serie
+        self.incremental = incremental # AnalisisIncremental con las funciones de la compilación anterior del mismo archivo (ver Demonio)
+
+    def reportar(self, tipo: TipoError, codigo: CodigoError, mensaje: str, linea: int = None, columna: int = None):
+        """Registra un diagnóstico de la compilación. Las repeticiones y lo que llega después del máximo se descartan."""
+        diagnostico = Diagnostico(tipo, codigo, mensaje, linea, columna)
+        if not self.diagnosticos.registrar(diagnostico):
+            return
+        self._salida.append(diagnostico.texto())
+        if self.diagnosticos.detenido:
+            self._salida.append(f"Se alcanzó el máximo de {self.diagnosticos.maxErrores} errores: la compilación se detiene.")
+
+    def informar(self, mensaje: str):
+        """Agrega un mensaje informativo (no es un diagnóstico) a la salida de la compilación."""
+        self._salida.append(mensaje)
+
+    def salida(self) -> list:
+        """Copia de la salida acumulada que todavía no se volcó."""
+        return list(self._salida)
+
+    def volcar(self, destino=None):
+        """Escribe toda la salida acumulada en una única escritura, en el formato de la sesión, y la vacía."""
+        destino = destino or sys.stdout
+        if self.formato == "json":
+            self.diagnosticos.volcarJSON(self.archivo, destino)
+        else:
+            if self.diagnosticos.suprimidos:
+                self._salida.append(f"({self.diagnosticos.suprimidos} diagnóstico(s) repetido(s) omitido(s))")
+            if self._salida:
+                destino.write("\n".join(self._salida) + "\n")
+        self._salida = []
+
+    def medir(self, fase: str):
+        """Context manager que mide una fase en el perfilador de la sesión (no hace nada si no hay perfilador)."""
+        if self.perfilador is None:
+            return nullcontext()
+        return self.perfilador.fase(fase)
+
+    def exportarTS(self, ts: TS = None):
+        """Arma la TS (o, sin `ts`, el aviso de que hubo errores) en memoria y la escribe de una vez en rutaTS."""
+        if self.rutaTS is None:
+            return
+        self.escribirTS(self.exportadorTS.exportar(ts) if ts is not None else self.exportadorTS.exportarError(TS_CON_ERRORES))
+
+    def escribirTS(self, contenido):
+        """Escribe en rutaTS un contenido ya exportado en el formato de la sesión."""
+        self.exportadorTS.escribir(contenido, self.rutaTS)
+        self.contenidoTS = contenido
+
+    def reiniciar(self):
+        """Descarta un intento de compilación: tabla de símbolos nueva, sin diagnósticos y sin la salida acumulada."""
+        self.TS = TS()
+        self.diagnosticos = ColectorDiagnosticos(self.diagnosticos.maxErrores)
+        self._salida = []
+        self.contenidoTS = None
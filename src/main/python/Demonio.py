@@ -0,0 +1,364 @@
+"""Demonio de compilación: un proceso que deja cargados el lexer y el parser (con el ATN ya
+deserializado y el DFA de predicción armado) y compila a pedido, sin pagar en cada compilación el
+arranque de Python ni la carga de antlr4.
+
+Habla JSON-RPC 2.0, un mensaje JSON por línea, por la entrada y la salida estándar (--stdio) o por
+un socket Unix (--socket). Métodos:
+
+- compilar {archivo, texto?, ts?, tac?, formato?, formatoTS?, pases?, reusarTemporales?, maxTemporales?,
+  maxErrores?, ll?}: compila el archivo (o `texto`, con ese nombre) y devuelve la salida de consola y los
+  diagnósticos. `ts` y `tac` son rutas donde escribir la TS (en texto, json o binario, según `formatoTS`)
+  y el código de tres direcciones; el resto son las opciones de App del mismo nombre (`pases`, los del
+  optimizador que se aplican; `ll`, parsear directamente con LL).
+- vigilar {archivo}: lo compila y, desde ahí, lo revisa cada `intervalo` segundos; cuando cambia lo
+  vuelve a compilar y le manda al cliente la notificación `diagnosticos` con el mismo resultado.
+- olvidar {archivo}: el cliente deja de vigilarlo.
+- estado {}: archivos vigilados, compilaciones hechas y funciones reutilizadas.
+- terminar {}: cierra el demonio.
+
+Cada archivo tiene su AnalisisIncremental: al recompilarlo se vuelve a tokenizar y a parsear el
+código global, pero las funciones globales que no cambiaron (ni cambió lo que ven del nivel
+global) no se vuelven a analizar: se reutilizan sus símbolos y diagnósticos (ver AnalisisParalelo).
+
+Uso (desde src/main/python):
+    python Demonio.py --socket /tmp/dhs.sock [--intervalo 0.5]
+    python Demonio.py --stdio
+    python Demonio.py --vigilar input/entradaCorrecta.txt   (muestra los diagnósticos por consola en cada cambio)
+"""
+import os
+import sys
+import argparse
+import inspect
+import io
+import json
+import socket
+import socketserver
+import stat
+import threading
+import time
+
+# El compilador se importa al crear el demonio: el cliente (pedir) no necesita cargar el parser
+InputStream = AnalisisIncremental = compilarEntrada = CompileSession = None
+
+# Códigos de error de JSON-RPC
+JSON_INVALIDO = -32700
+PEDIDO_INVALIDO = -32600
+METODO_DESCONOCIDO = -32601
+PARAMETROS_INVALIDOS = -32602
+ERROR_INTERNO = -32603
+ARCHIVO_ILEGIBLE = -32000
+
+
+class ErrorPedido(Exception):
+    """Un pedido que el demonio no pudo atender, con su código de JSON-RPC."""
+
+    def __init__(self, codigo: int, mensaje: str):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+class Cliente:
+    """Un extremo conectado al demonio: recibe las respuestas y las notificaciones, un JSON por línea."""
+
+    def __init__(self, salida):
+        self._salida = salida
+        self._lock = threading.Lock() # el vigilante notifica desde otro hilo
+        self.activo = True
+
+    def enviar(self, mensaje: dict):
+        texto = json.dumps(mensaje, ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                self._salida.write(texto)
+                self._salida.flush()
+            except (OSError, ValueError): # se desconectó
+                self.activo = False
+
+
+class ClienteConsola:
+    """Cliente del modo --vigilar: muestra la salida de cada compilación como la mostraría App."""
+    activo = True
+
+    def enviar(self, mensaje: dict):
+        resultado = mensaje.get("params") or mensaje.get("result")
+        print(f"===== {resultado['archivo']} ({time.strftime('%H:%M:%S')}, {resultado['segundos'] * 1000:.0f} ms, "
+              f"{resultado['funcionesReutilizadas']} función(es) reutilizada(s)) =====")
+        sys.stdout.write(resultado["salida"])
+        sys.stdout.flush()
+
+
+def _firma(archivo: str) -> tuple:
+    """Lo que cambia cuando se guarda el archivo. None si no existe (un editor puede estar reemplazándolo)."""
+    try:
+        estado = os.stat(archivo)
+    except OSError:
+        return None
+    return (estado.st_mtime_ns, estado.st_size)
+
+
+class Demonio:
+    """Atiende los pedidos de todos los clientes y vigila los archivos que le pidieron.
+
+    Las compilaciones se hacen de a una (el parser y su DFA se comparten entre todas).
+    """
+
+    def __init__(self, intervalo: float = 0.5):
+        global InputStream, AnalisisIncremental, compilarEntrada, CompileSession
+        from antlr4 import InputStream
+        from AnalisisParalelo import AnalisisIncremental
+        from Compilador import compilarEntrada
+        from CompileSession import CompileSession
+        self.intervalo = intervalo
+        self.compilaciones = 0
+        self.terminado = threading.Event()
+        self._lock = threading.RLock()
+        self._incrementales = {} # archivo -> AnalisisIncremental
+        self._vigilados = {} # archivo -> {"firma": ..., "clientes": [Cliente]}
+        self._vigilante = None
+        self._metodos = {"compilar": self.compilar, "vigilar": self.vigilar, "olvidar": self.olvidar,
+                         "estado": self.estado, "terminar": self.terminar}
+
+    # ------------------------------
+    # JSON-RPC
+    # ------------------------------
+    def atender(self, linea: str, cliente) -> dict:
+        """Atiende un mensaje del cliente y devuelve la respuesta (None si era una notificación)."""
+        try:
+            pedido = json.loads(linea)
+        except ValueError as error:
+            return _error(None, JSON_INVALIDO, f"JSON inválido: {error}")
+        if not isinstance(pedido, dict) or not isinstance(pedido.get("method"), str):
+            return _error(pedido.get("id") if isinstance(pedido, dict) else None, PEDIDO_INVALIDO, "Falta el método del pedido.")
+
+        identificador = pedido.get("id")
+        try:
+            metodo = self._metodos.get(pedido["method"])
+            if metodo is None:
+                raise ErrorPedido(METODO_DESCONOCIDO, f"Método desconocido '{pedido['method']}'.")
+            params = pedido.get("params") or {}
+            if not isinstance(params, dict):
+                raise ErrorPedido(PARAMETROS_INVALIDOS, "Los parámetros tienen que ir por nombre.")
+            try:
+                inspect.signature(metodo).bind(cliente, **params)
+            except TypeError as error:
+                raise ErrorPedido(PARAMETROS_INVALIDOS, str(error)) from None
+            try:
+                resultado = metodo(cliente, **params)
+            except (OSError, UnicodeDecodeError) as error: # UnicodeDecodeError: el archivo no está en UTF-8
+                raise ErrorPedido(ARCHIVO_ILEGIBLE, str(error)) from None
+            except ErrorPedido:
+                raise
+            except Exception as error: # un error del compilador no puede cortar la conexión con el cliente
+                raise ErrorPedido(ERROR_INTERNO, f"Error interno: {error!r}") from None
+        except ErrorPedido as error:
+            return _error(identificador, error.codigo, str(error))
+        if identificador is None:
+            return None
+        return {"jsonrpc": "2.0", "id": identificador, "result": resultado}
+
+    # ------------------------------
+    # Métodos
+    # ------------------------------
+    def compilar(self, cliente, archivo: str, texto: str = None, ts: str = None, tac: str = None, formato: str = "texto",
+                 formatoTS: str = "texto", pases: list = None, reusarTemporales: bool = False, maxTemporales: int = None,
+                 maxErrores: int = None, ll: bool = False) -> dict:
+        from tablaDeSimbolos.Exportadores import EXPORTADORES
+        from Optimizador import PASES
+        if formatoTS not in EXPORTADORES:
+            raise ErrorPedido(PARAMETROS_INVALIDOS, f"Formato de TS desconocido '{formatoTS}'.")
+        if pases is not None and not set(pases) <= set(PASES):
+            raise ErrorPedido(PARAMETROS_INVALIDOS, f"Pases desconocidos: {', '.join(sorted(set(pases) - set(PASES)))}.")
+        if maxTemporales is not None and maxTemporales < 1:
+            raise ErrorPedido(PARAMETROS_INVALIDOS, "maxTemporales tiene que ser al menos 1.")
+        if texto is None:
+            with open(archivo, encoding="utf-8") as f:
+                texto = f.read()
+        with self._lock:
+            incremental = self._incrementales.setdefault(archivo, AnalisisIncremental())
+            reutilizadas = incremental.estadisticas["reutilizadas"]
+            sesion = CompileSession(archivo, rutaTS=ts, eco=False, formato=formato, rutaTAC=tac, incremental=incremental,
+                                    formatoTS=formatoTS, pasesTAC=pases, maxErrores=maxErrores,
+                                    reusarTemporales=reusarTemporales or maxTemporales is not None, maxTemporales=maxTemporales)
+            resultado = compilarEntrada(InputStream(texto), sesion, dosEtapas=not ll)
+            self.compilaciones += 1
+        salida = io.StringIO()
+        sesion.volcar(salida)
+        return {
+            "archivo": archivo,
+            "salida": salida.getvalue(),
+            "registros": resultado["registros"],
+            "huboErrores": resultado["huboErrores"],
+            "segundos": resultado["segundos"],
+            "funcionesReutilizadas": incremental.estadisticas["reutilizadas"] - reutilizadas,
+        }
+
+    def vigilar(self, cliente, archivo: str) -> dict:
+        firma = _firma(archivo) # antes de compilar: un cambio durante la compilación se ve en la próxima revisión
+        resultado = self.compilar(cliente, archivo)
+        with self._lock:
+            vigilado = self._vigilados.setdefault(archivo, {"firma": firma, "clientes": []})
+            if cliente not in vigilado["clientes"]:
+                vigilado["clientes"].append(cliente)
+            if self._vigilante is None:
+                self._vigilante = threading.Thread(target=self._vigilar, name="vigilante", daemon=True)
+                self._vigilante.start()
+        return resultado
+
+    def olvidar(self, cliente, archivo: str) -> dict:
+        with self._lock:
+            vigilado = self._vigilados.get(archivo)
+            if vigilado is not None and cliente in vigilado["clientes"]:
+                vigilado["clientes"].remove(cliente)
+                if not vigilado["clientes"]:
+                    del self._vigilados[archivo]
+            return {"vigilados": sorted(self._vigilados)}
+
+    def desconectar(self, cliente):
+        """El cliente cerró la conexión: deja de vigilar sus archivos."""
+        with self._lock:
+            for archivo in list(self._vigilados):
+                self.olvidar(cliente, archivo)
+
+    def estado(self, cliente) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "compilaciones": self.compilaciones,
+                "vigilados": sorted(self._vigilados),
+                "funcionesReutilizadas": sum(i.estadisticas["reutilizadas"] for i in self._incrementales.values()),
+                "funcionesAnalizadas": sum(i.estadisticas["analizadas"] for i in self._incrementales.values()),
+            }
+
+    def terminar(self, cliente) -> dict:
+        self.terminado.set()
+        return {"terminado": True}
+
+    # ------------------------------
+    # Vigilancia
+    # ------------------------------
+    def _vigilar(self):
+        while not self.terminado.wait(self.intervalo):
+            with self._lock:
+                vigilados = list(self._vigilados.items())
+            for archivo, vigilado in vigilados:
+                firma = _firma(archivo)
+                if firma is None or firma == vigilado["firma"]:
+                    continue
+                vigilado["firma"] = firma
+                try:
+                    resultado = self.compilar(None, archivo)
+                except Exception: # ilegible o con un error del compilador: se reintenta cuando vuelva a cambiar
+                    continue
+                self._notificar(archivo, vigilado, resultado)
+
+    def _notificar(self, archivo: str, vigilado: dict, resultado: dict):
+        for cliente in list(vigilado["clientes"]):
+            cliente.enviar({"jsonrpc": "2.0", "method": "diagnosticos", "params": resultado})
+            if not cliente.activo:
+                self.olvidar(cliente, archivo)
+
+
+def _error(identificador, codigo: int, mensaje: str) -> dict:
+    return {"jsonrpc": "2.0", "id": identificador, "error": {"code": codigo, "message": mensaje}}
+
+
+# ------------------------------
+# Transportes
+# ------------------------------
+def servirStdio(demonio: Demonio, entrada=None, salida=None):
+    """Atiende a un único cliente por la entrada y la salida estándar, hasta el fin de la entrada o `terminar`."""
+    cliente = Cliente(salida or sys.stdout)
+    for linea in entrada or sys.stdin:
+        if not linea.strip():
+            continue
+        respuesta = demonio.atender(linea, cliente)
+        if respuesta is not None:
+            cliente.enviar(respuesta)
+        if demonio.terminado.is_set():
+            break
+    demonio.terminado.set()
+
+
+class _Conexion(socketserver.BaseRequestHandler):
+    def handle(self):
+        demonio = self.server.demonio
+        cliente = Cliente(self.request.makefile("w", encoding="utf-8"))
+        try:
+            for linea in self.request.makefile("r", encoding="utf-8"):
+                if not linea.strip():
+                    continue
+                respuesta = demonio.atender(linea, cliente)
+                if respuesta is not None:
+                    cliente.enviar(respuesta)
+                if demonio.terminado.is_set():
+                    threading.Thread(target=self.server.shutdown).start() # shutdown() espera a serve_forever: no desde este hilo
+                    break
+        finally:
+            demonio.desconectar(cliente)
+
+
+class _Servidor(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def servirSocket(demonio: Demonio, ruta: str):
+    """Atiende clientes en el socket Unix `ruta` (un hilo por conexión) hasta que alguno pida `terminar`."""
+    if os.path.exists(ruta):
+        if not stat.S_ISSOCK(os.stat(ruta).st_mode):
+            raise FileExistsError(f"'{ruta}' existe y no es un socket")
+        os.remove(ruta) # quedó de un demonio anterior
+    with _Servidor(ruta, _Conexion) as servidor:
+        servidor.demonio = demonio
+        try:
+            servidor.serve_forever()
+        finally:
+            demonio.terminado.set()
+            os.remove(ruta)
+
+
+def pedir(ruta: str, metodo: str, params: dict = None) -> dict:
+    """Manda un pedido al demonio del socket `ruta` y devuelve el resultado. Levanta ErrorPedido si respondió con un error."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexion:
+        conexion.connect(ruta)
+        with conexion.makefile("rw", encoding="utf-8") as canal:
+            canal.write(json.dumps({"jsonrpc": "2.0", "id": 1, "method": metodo, "params": params or {}}, ensure_ascii=False) + "\n")
+            canal.flush()
+            for linea in canal:
+                mensaje = json.loads(linea)
+                if mensaje.get("id") == 1:
+                    break
+            else:
+                raise ConnectionError("El demonio cerró la conexión sin responder.")
+    if "error" in mensaje:
+        raise ErrorPedido(mensaje["error"]["code"], mensaje["error"]["message"])
+    return mensaje["result"]
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Demonio de compilación DHS2025")
+    modo = argumentos.add_mutually_exclusive_group(required=True)
+    modo.add_argument("--socket", metavar="RUTA", help="atiende pedidos JSON-RPC en un socket Unix")
+    modo.add_argument("--stdio", action="store_true", help="atiende pedidos JSON-RPC por la entrada y la salida estándar")
+    modo.add_argument("--vigilar", nargs="+", metavar="ARCHIVO", help="vigila los archivos y muestra sus diagnósticos en cada cambio")
+    argumentos.add_argument("--intervalo", type=float, default=0.5, help="segundos entre revisiones de los archivos vigilados")
+    args = argumentos.parse_args(argv[1:])
+
+    demonio = Demonio(args.intervalo)
+    try:
+        if args.stdio:
+            servirStdio(demonio)
+        elif args.socket:
+            servirSocket(demonio, args.socket)
+        else:
+            consola = ClienteConsola()
+            for archivo in args.vigilar:
+                consola.enviar({"result": demonio.vigilar(consola, archivo)})
+            demonio.terminado.wait()
+    except KeyboardInterrupt:
+        pass
+    demonio.terminado.set()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
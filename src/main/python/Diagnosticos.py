@@ -0,0 +1,103 @@
+import json
+import sys
+from Enumeraciones import TipoError, CodigoError
+
+
+class LimiteDeErrores(Exception):
+    """Se alcanzó el máximo de errores de la sesión: el parseo se corta en el próximo punto de sincronización."""
+
+
+class Diagnostico:
+    """Un error detectado durante la compilación, con su posición (si se conoce) y un código estable."""
+    __slots__ = ("tipo", "codigo", "mensaje", "linea", "columna")
+
+    def __init__(self, tipo: TipoError, codigo: CodigoError, mensaje: str, linea: int = None, columna: int = None):
+        self.tipo = tipo
+        self.codigo = codigo
+        self.mensaje = mensaje
+        self.linea = linea
+        self.columna = columna
+
+    def texto(self) -> str:
+        """El formato de consola de siempre: los semánticos sin posición, los sintácticos con su línea."""
+        if self.tipo is TipoError.SEMANTICO or self.linea is None:
+            return f"ERROR {self.tipo}: {self.mensaje}"
+        if self.codigo is CodigoError.SINTAXIS:
+            return f"ERROR {self.tipo} (línea {self.linea}, columna {self.columna}): {self.mensaje}"
+        return f"ERROR {self.tipo}: {self.mensaje} (línea {self.linea})"
+
+    def aDict(self) -> dict:
+        return {"tipo": str(self.tipo), "codigo": str(self.codigo), "linea": self.linea, "columna": self.columna, "mensaje": self.mensaje}
+
+    @classmethod
+    def desdeDict(cls, datos: dict) -> "Diagnostico":
+        return cls(TipoError[datos["tipo"]], CodigoError[datos["codigo"]], datos["mensaje"], datos["linea"], datos["columna"])
+
+
+class ColectorDiagnosticos:
+    """Acumula los diagnósticos de una compilación en lugar de imprimirlos uno por uno.
+
+    Descarta las cascadas (el mismo error repetido en la misma posición, o varios errores
+    sintácticos sobre el mismo token) y, con `maxErrores`, deja de aceptar diagnósticos al
+    llegar al máximo y marca la compilación como detenida.
+    """
+
+    def __init__(self, maxErrores: int = None):
+        self.maxErrores = maxErrores
+        self.registros = [] # Diagnósticos aceptados, en el orden en que se detectaron
+        self.suprimidos = 0 # Repeticiones descartadas por ser parte de una cascada
+        self.detenido = False
+        self._vistos = set()
+        self._ultimaPosicionSintactica = None
+
+    def registrar(self, diagnostico: Diagnostico) -> bool:
+        """Agrega el diagnóstico si no es una repetición. Devuelve True si fue aceptado."""
+        if self.detenido:
+            return False
+
+        if diagnostico.linea is not None: # sin posición no hay forma de saber si es el mismo error
+            clave = (diagnostico.tipo, diagnostico.codigo, diagnostico.linea, diagnostico.columna, diagnostico.mensaje)
+            posicion = (diagnostico.linea, diagnostico.columna)
+            if clave in self._vistos or (diagnostico.tipo is TipoError.SINTACTICO and posicion == self._ultimaPosicionSintactica):
+                self.suprimidos += 1
+                return False
+            self._vistos.add(clave)
+            if diagnostico.tipo is TipoError.SINTACTICO:
+                self._ultimaPosicionSintactica = posicion
+
+        self.registros.append(diagnostico)
+        if self.maxErrores is not None and len(self.registros) >= self.maxErrores:
+            self.detenido = True
+        return True
+
+    def hayErrores(self, tipo: TipoError = None) -> bool:
+        if tipo is None:
+            return bool(self.registros)
+        return any(d.tipo is tipo for d in self.registros)
+
+    def cantidad(self, tipo: TipoError = None) -> int:
+        if tipo is None:
+            return len(self.registros)
+        return sum(1 for d in self.registros if d.tipo is tipo)
+
+    def textos(self) -> list:
+        return [d.texto() for d in self.registros]
+
+    def aDict(self) -> dict:
+        return {
+            "diagnosticos": [d.aDict() for d in self.registros],
+            "suprimidos": self.suprimidos,
+            "detenido": self.detenido,
+        }
+
+    def cargar(self, datos: dict):
+        """Repone los diagnósticos de una compilación anterior (lo que devolvió aDict())."""
+        for d in datos["diagnosticos"]:
+            self.registros.append(Diagnostico.desdeDict(d))
+        self.suprimidos += datos["suprimidos"]
+        self.detenido = self.detenido or datos["detenido"]
+
+    def volcarJSON(self, archivo: str = None, destino=None):
+        """Escribe todos los diagnósticos de una vez como un documento JSON."""
+        destino = destino or sys.stdout
+        destino.write(json.dumps({"archivo": archivo, **self.aDict()}, indent=2, ensure_ascii=False) + "\n")
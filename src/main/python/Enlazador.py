@@ -0,0 +1,189 @@
+"""Compilación por separado: cada módulo fuente se compila a un archivo objeto (ver Objeto) y el
+enlazador junta los objetos en un único programa de tres direcciones.
+
+El enlazador:
+- resuelve cada prototipo contra la función con ese nombre que define algún módulo, y verifica que
+  coincidan el tipo de retorno y la lista de parámetros;
+- informa las funciones definidas en más de un módulo y las llamadas a prototipos que nadie define;
+- renombra lo que es propio de cada módulo para que no choque con los demás: temporales y etiquetas
+  se renumeran, y una variable que ya usó otro módulo (o que se llama como una función) pasa a
+  `nombre.mK`, con K el número del módulo. Las variables globales son privadas de su módulo;
+- escribe el código de cada módulo en el orden dado y, al final, la llamada a `main` si algún
+  módulo la define sin parámetros. Un `return` en el nivel global termina el código de su módulo.
+"""
+import os
+import re
+import tempfile
+from Diagnosticos import ColectorDiagnosticos, Diagnostico
+from Enumeraciones import TipoError, CodigoError
+from CodigoIntermedio import OPERACION, esConstante, escribir
+from Objeto import Objeto, EXTENSION
+from Optimizador import Optimizador
+
+_GENERADO = re.compile(r"([tL])(\d+)$") # temporales y etiquetas de Caminante
+
+
+def _firma(nombre: str, tipo: str, parametros: list) -> str:
+    return f"{tipo} {nombre}({', '.join(parametros)})"
+
+
+def _nombreGlobal(nombre: str) -> str:
+    """Nombre de una función en el programa enlazado: el del fuente, salvo que tenga la forma de un temporal o una etiqueta."""
+    return f"{nombre}.0" if _GENERADO.match(nombre) else nombre
+
+
+class Enlazador:
+    """Junta los objetos de un programa. Los errores quedan en `diagnosticos` y, si hay alguno, no se escribe nada."""
+
+    def __init__(self, objetos: list):
+        self.objetos = objetos
+        self.diagnosticos = ColectorDiagnosticos()
+        self._definiciones = {} # nombre -> objeto que la define
+
+    def _error(self, codigo: CodigoError, mensaje: str):
+        self.diagnosticos.registrar(Diagnostico(TipoError.ENLACE, codigo, mensaje))
+
+    # ------------------------------
+    # Resolución de símbolos
+    # ------------------------------
+    def resolver(self) -> bool:
+        """Verifica definiciones, prototipos y llamadas. Devuelve True si el programa se puede enlazar."""
+        for objeto in self.objetos:
+            for nombre in objeto.definidas:
+                anterior = self._definiciones.setdefault(nombre, objeto)
+                if anterior is not objeto:
+                    self._error(CodigoError.SIMBOLO_DUPLICADO, f"'{nombre}' está definida en '{anterior.modulo}' y en '{objeto.modulo}'.")
+
+        for objeto in self.objetos:
+            for nombre, (tipo, parametros, linea) in objeto.prototipos.items():
+                definidor = self._definiciones.get(nombre)
+                if definidor is None:
+                    if nombre in objeto.llamadas:
+                        self._error(CodigoError.SIMBOLO_INDEFINIDO,
+                                    f"'{nombre}' se usa en '{objeto.modulo}' pero ningún módulo la define.")
+                    continue
+                tipoDef, parametrosDef = definidor.definidas[nombre]
+                if tipo != tipoDef or parametros != parametrosDef:
+                    self._error(CodigoError.FIRMA_INCOMPATIBLE,
+                                f"El prototipo '{_firma(nombre, tipo, parametros)}' de '{objeto.modulo}' (línea {linea}) "
+                                f"no coincide con la definición '{_firma(nombre, tipoDef, parametrosDef)}' de '{definidor.modulo}'.")
+        return not self.diagnosticos.hayErrores()
+
+    # ------------------------------
+    # Combinación
+    # ------------------------------
+    def enlazar(self, salida) -> int:
+        """Escribe el programa enlazado en `salida` (cualquier objeto con write()). Devuelve la cantidad de instrucciones."""
+        tomados = {_nombreGlobal(nombre) for nombre in self._definiciones}
+        temporales = etiquetas = 0
+        instrucciones = 0
+        for k, objeto in enumerate(self.objetos):
+            mapa = {}
+            for nombre, etiqueta in objeto.etiquetas.items():
+                if nombre in self._definiciones:
+                    mapa[etiqueta] = _nombreGlobal(nombre)
+
+            maxTemporal = maxEtiqueta = -1
+            def renombrar(operando):
+                nonlocal maxTemporal, maxEtiqueta
+                nuevo = mapa.get(operando)
+                if nuevo is not None:
+                    return nuevo
+                if esConstante(operando):
+                    return operando
+                generado = _GENERADO.match(operando)
+                if generado is not None:
+                    numero = int(generado.group(2))
+                    if generado.group(1) == "t":
+                        maxTemporal = max(maxTemporal, numero)
+                        nuevo = f"t{numero + temporales}"
+                    else:
+                        maxEtiqueta = max(maxEtiqueta, numero)
+                        nuevo = f"L{numero + etiquetas}"
+                else:
+                    nuevo = f"{operando}.m{k}" if operando in tomados else operando
+                    tomados.add(nuevo)
+                mapa[operando] = nuevo
+                return nuevo
+
+            for instruccion in objeto.codigo:
+                salida.write(escribir(self._renombrar(instruccion, renombrar)) + "\n")
+                instrucciones += 1
+            temporales += maxTemporal + 1
+            etiquetas += maxEtiqueta + 1
+
+        main = self._definiciones.get("main")
+        if main is not None and not main.definidas["main"][1]:
+            vuelta = f"L{etiquetas}"
+            llamada = [f"push {vuelta}", f"jmp {_nombreGlobal('main')}", f"label {vuelta}"]
+            if main.definidas["main"][0] != 'void':
+                llamada.append(f"pop t{temporales}")
+            for linea in llamada:
+                salida.write(linea + "\n")
+            instrucciones += len(llamada)
+        return instrucciones
+
+    @staticmethod
+    def _renombrar(instruccion: tuple, renombrar) -> tuple:
+        if instruccion[0] == OPERACION: # el operador no es un nombre
+            return (OPERACION, renombrar(instruccion[1]), renombrar(instruccion[2]), instruccion[3], renombrar(instruccion[4]))
+        return (instruccion[0], *map(renombrar, instruccion[1:]))
+
+
+def rutaObjeto(fuente: str, directorio: str) -> str:
+    """Ruta del objeto de un módulo. Se aplana la ruta del fuente para que no choquen módulos homónimos."""
+    nombre = os.path.splitext(os.path.normpath(fuente))[0].replace(os.sep, "__").lstrip(".")
+    return os.path.join(directorio, nombre + EXTENSION)
+
+
+def construir(entradas: list, directorio: str, rutaSalida: str, pasesTAC=None, maxErrores: int = None, dosEtapas: bool = True) -> dict:
+    """Compila a objeto los módulos fuente que cambiaron desde la última vez, enlaza todos y escribe el programa en `rutaSalida`.
+
+    Las entradas son fuentes o archivos objeto ya compilados. El objeto de un fuente se reutiliza si
+    su cabecera indica que salió del mismo contenido con la misma versión del compilador. Con
+    `pasesTAC`, el programa enlazado pasa por el optimizador (ver Optimizador.PASES).
+    """
+    from Compilador import compilar
+    from CompileSession import CompileSession
+    os.makedirs(directorio, exist_ok=True)
+
+    compilados = [] # resultado de cada módulo que se volvió a compilar
+    objetos = []
+    reutilizados = 0
+    for entrada in entradas:
+        if entrada.endswith(EXTENSION):
+            objetos.append(Objeto.cargar(entrada))
+            continue
+        ruta = rutaObjeto(entrada, directorio)
+        with open(entrada, encoding="utf-8") as f:
+            fuente = f.read()
+        if Objeto.vigente(ruta, fuente):
+            reutilizados += 1
+        else:
+            resultado = compilar(entrada, CompileSession(entrada, rutaTS=None, eco=False, maxErrores=maxErrores, rutaObjeto=ruta), dosEtapas)
+            compilados.append(resultado)
+            if resultado["objeto"] is None:
+                continue
+        objetos.append(Objeto.cargar(ruta))
+
+    enlazador = Enlazador(objetos)
+    instrucciones = None
+    if all(r["objeto"] is not None for r in compilados) and enlazador.resolver():
+        if pasesTAC is None:
+            with open(rutaSalida, "w") as salida:
+                instrucciones = enlazador.enlazar(salida)
+        else:
+            descriptor, crudo = tempfile.mkstemp(suffix=".tac", dir=os.path.dirname(os.path.abspath(rutaSalida)))
+            try:
+                with os.fdopen(descriptor, "w") as salida:
+                    enlazador.enlazar(salida)
+                instrucciones = Optimizador(pasesTAC).optimizarArchivo(crudo, rutaSalida)["despues"]
+            finally:
+                os.remove(crudo)
+    return {
+        "compilados": compilados,
+        "reutilizados": reutilizados,
+        "modulos": len(entradas),
+        "enlace": enlazador.diagnosticos,
+        "instrucciones": instrucciones, # None si no se pudo enlazar
+    }
@@ -0,0 +1,234 @@
+"""Entrada de fuentes muy grandes sin cargarlas enteras en memoria.
+
+FileStream lee y decodifica todo el archivo en un string (y además lo guarda como una lista de
+enteros), y CommonTokenStream conserva todos los tokens. Para fuentes generados de cientos de MB:
+
+- FlujoMapeado mapea el archivo con mmap y lo decodifica de a bloques con un decodificador
+  incremental. Solo guarda los caracteres desde el comienzo del token que está leyendo el lexer
+  (la marca más vieja). La entrada estándar se copia primero a un temporal anónimo y se mapea igual.
+- FlujoTokensAcotado es un CommonTokenStream que descarta los tokens que quedaron a más de
+  `ventana` tokens por detrás del parser (o de la marca de la decisión que está prediciendo). Los
+  índices siguen siendo los absolutos, así que `tokens[i]` sigue sirviendo para mirar los tokens
+  anteriores al actual (ver EscuchaErroresSintacticos).
+
+Como los caracteres se descartan, el texto de cada token se copia al crearlo.
+"""
+import codecs
+import mmap
+import os
+import sys
+from antlr4 import CommonTokenStream, Token
+from antlr4.CommonTokenFactory import CommonTokenFactory
+
+BLOQUE = 1 << 16 # bytes que se decodifican por vez
+
+
+class FlujoMapeado:
+    """Stream de caracteres para ANTLR sobre un archivo mapeado en memoria, decodificado a medida que se lee.
+
+    Volver a una posición ya descartada (lo que hace `lexer.reset()`) vuelve a decodificar desde el principio.
+    """
+
+    def __init__(self, ruta: str = None, encoding: str = "utf-8", archivo=None):
+        self.name = ruta
+        self.encoding = encoding
+        self._archivo = archivo if archivo is not None else open(ruta, "rb")
+        tamano = os.fstat(self._archivo.fileno()).st_size
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ) if tamano else b""
+        self._lineas = None
+        self._reiniciar()
+
+    @classmethod
+    def desdeStdin(cls, encoding: str = "utf-8") -> "FlujoMapeado":
+        """Copia la entrada estándar (de a bloques) a un temporal que se borra al cerrarlo, y lo mapea."""
+        import shutil
+        import tempfile
+        temporal = tempfile.TemporaryFile()
+        shutil.copyfileobj(sys.stdin.buffer, temporal, BLOQUE)
+        temporal.flush()
+        return cls("<stdin>", encoding, temporal)
+
+    def _reiniciar(self):
+        self._decodificador = codecs.getincrementaldecoder(self.encoding)()
+        self._leidos = 0 # bytes ya decodificados
+        self._base = 0 # índice del primer caracter de _texto
+        self._texto = ""
+        self._terminado = False
+        self._index = 0
+        self._marcas = []
+
+    def _cargar(self, posicion: int):
+        """Decodifica bloques hasta tener el caracter `posicion` (o hasta el final), descartando lo que ya no hace falta."""
+        while posicion >= self._base + len(self._texto) and not self._terminado:
+            bloque = self._mapa[self._leidos:self._leidos + BLOQUE]
+            self._leidos += len(bloque)
+            self._terminado = self._leidos >= len(self._mapa)
+            nuevo = self._decodificador.decode(bloque, final=self._terminado)
+            inicio = min(self._marcas, default=self._index)
+            descartar = max(0, inicio - self._base)
+            self._texto = self._texto[descartar:] + nuevo
+            self._base += descartar
+
+    # ------------------------------
+    # Interfaz de CharStream (la de InputStream)
+    # ------------------------------
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def size(self) -> int:
+        """Cantidad de caracteres. Solo se conoce al llegar al final: antes es 'infinito'."""
+        return self._base + len(self._texto) if self._terminado else sys.maxsize
+
+    def reset(self):
+        self.seek(0)
+
+    def consume(self):
+        if self.LA(1) == Token.EOF:
+            raise Exception("cannot consume EOF")
+        self._index += 1
+
+    def LA(self, offset: int) -> int:
+        if offset == 1: # el caso del lexer, casi siempre ya decodificado
+            i = self._index - self._base
+            if i < len(self._texto):
+                return ord(self._texto[i])
+        if offset == 0:
+            return 0 # sin definir
+        if offset < 0:
+            offset += 1 # LA(-1) es el caracter anterior
+        posicion = self._index + offset - 1
+        if posicion < 0:
+            return Token.EOF
+        if posicion < self._base:
+            raise self._descartado(posicion)
+        if posicion >= self._base + len(self._texto):
+            self._cargar(posicion)
+            if posicion >= self._base + len(self._texto):
+                return Token.EOF
+        return ord(self._texto[posicion - self._base])
+
+    def LT(self, offset: int) -> int:
+        return self.LA(offset)
+
+    def mark(self) -> int:
+        self._marcas.append(self._index)
+        return len(self._marcas)
+
+    def release(self, marca: int):
+        del self._marcas[marca - 1:]
+
+    def seek(self, index: int):
+        if index < self._base:
+            self._reiniciar()
+        self._index = index
+
+    def getText(self, start: int, stop: int) -> str:
+        if start > stop:
+            return ""
+        if start < self._base:
+            raise self._descartado(start)
+        self._cargar(stop)
+        return self._texto[start - self._base:stop - self._base + 1]
+
+    def _descartado(self, posicion: int) -> IndexError:
+        return IndexError(f"el caracter {posicion} ya se descartó del flujo (la ventana empieza en el {self._base})")
+
+    def __str__(self) -> str:
+        """El fuente completo (lo decodifica entero: solo para lo que de verdad lo necesita, como la huella de un objeto)."""
+        return codecs.decode(self._mapa[:], self.encoding) if self._mapa else ""
+
+    # ------------------------------
+    # Recursos
+    # ------------------------------
+    def lineas(self) -> int:
+        """Líneas del fuente, contando los saltos de línea de a bloques sobre el mapa."""
+        if self._lineas is None:
+            saltos = sum(self._mapa[i:i + BLOQUE].count(b"\n") for i in range(0, len(self._mapa), BLOQUE))
+            self._lineas = saltos + 1
+        return self._lineas
+
+    def cerrar(self):
+        if isinstance(self._mapa, mmap.mmap):
+            self._mapa.close()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class VentanaTokens:
+    """Los tokens de FlujoTokensAcotado: se indexan por tokenIndex, pero solo se guardan desde `base`."""
+    __slots__ = ("base", "_tokens")
+
+    def __init__(self):
+        self.base = 0
+        self._tokens = []
+
+    def __len__(self) -> int:
+        return self.base + len(self._tokens)
+
+    def __getitem__(self, i: int):
+        if i < self.base:
+            raise IndexError(f"el token {i} ya se descartó (la ventana empieza en el {self.base})")
+        return self._tokens[i - self.base]
+
+    def append(self, token):
+        self._tokens.append(token)
+
+    def descartar(self, hasta: int):
+        """Descarta los tokens anteriores a `hasta`."""
+        if hasta > self.base:
+            del self._tokens[:hasta - self.base]
+            self.base = hasta
+
+
+class _FabricaConTexto(CommonTokenFactory):
+    """Copia el texto de cada token al crearlo, porque el flujo de caracteres lo va a descartar.
+
+    El EOF queda sin texto, como con InputStream, para que los mensajes de error lo muestren como '<EOF>'.
+    """
+
+    def create(self, source, type: int, text: str, channel: int, start: int, stop: int, line: int, column: int):
+        if text is None and type != Token.EOF:
+            text = source[1].getText(start, stop)
+        return super().create(source, type, text, channel, start, stop, line, column)
+
+
+class FlujoTokensAcotado(CommonTokenStream):
+    """CommonTokenStream que solo guarda los últimos `ventana` tokens anteriores al parser (y los de adelante que ya leyó)."""
+
+    def __init__(self, lexer, ventana: int = 256):
+        super().__init__(lexer)
+        lexer._factory = _FabricaConTexto()
+        self.tokens = VentanaTokens()
+        self.ventana = ventana
+        self._marcas = [] # índices donde empezó cada predicción en curso: el parser puede volver ahí
+
+    def setTokenSource(self, tokenSource):
+        super().setTokenSource(tokenSource)
+        self.tokens = VentanaTokens()
+
+    def mark(self) -> int:
+        self._marcas.append(self.index)
+        return len(self._marcas)
+
+    def release(self, marca: int):
+        del self._marcas[marca - 1:]
+
+    def consume(self):
+        super().consume()
+        limite = min(self._marcas, default=self.index) - self.ventana
+        if limite - self.tokens.base >= self.ventana: # de a tandas, para no mover la lista en cada token
+            self.tokens.descartar(limite)
+
+
+def flujoDeTokens(lexer) -> CommonTokenStream:
+    """El stream de tokens que corresponde a la entrada del lexer: acotado si la entrada es un FlujoMapeado."""
+    if isinstance(lexer.inputStream, FlujoMapeado):
+        return FlujoTokensAcotado(lexer)
+    return CommonTokenStream(lexer)
@@ -5,6 +5,44 @@ class TipoError(Enum):
     
     SINTACTICO = auto()
     SEMANTICO = auto()
+    ENLACE = auto()
 
     def __str__(self): # Sobreescribimos para que imprima solo el nombre
         return self.name
+
+
+class CodigoError(Enum):
+    """Código estable de cada clase de diagnóstico (para filtrar, deduplicar y exportar en JSON)."""
+
+    # Sintácticos
+    FALTA_PARENTESIS_CIERRE = auto()
+    FALTA_PARENTESIS_APERTURA = auto()
+    FALTA_PUNTO_Y_COMA = auto()
+    DECLARACION_MAL_FORMADA = auto()
+    BLOQUE_MAL_CERRADO = auto()
+    SINTAXIS = auto() # cualquier otro mensaje de ANTLR
+
+    # Semánticos
+    NO_DECLARADO = auto()
+    YA_DECLARADO = auto()
+    NO_ES_FUNCION = auto()
+    CANTIDAD_ARGUMENTOS = auto()
+    TIPO_ARGUMENTO = auto()
+    RETORNO_FALTANTE = auto()
+    RETORNO_EN_VOID = auto()
+    TIPO_RETORNO = auto()
+    CONDICION_VOID = auto()
+    TIPO_INICIALIZADOR = auto()
+    TIPO_ASIGNACION = auto()
+    SIN_INICIALIZAR = auto()
+    TIPOS_INCOMPATIBLES = auto()
+    DIVISION_POR_CERO = auto()
+    NO_UTILIZADA = auto()
+
+    # Enlace
+    SIMBOLO_INDEFINIDO = auto()
+    SIMBOLO_DUPLICADO = auto()
+    FIRMA_INCOMPATIBLE = auto()
+
+    def __str__(self):
+        return self.name
@@ -1,287 +1,546 @@
 from compiladorParser import compiladorParser
 from compiladorListener import compiladorListener
-from tablaDeSimbolos.SymbolTable import TS
+from CompileSession import CompileSession
 from tablaDeSimbolos.Variable import Variable
 from tablaDeSimbolos.Funcion import Funcion
-from Enumeraciones import TipoError
-from antlr4 import ErrorNode
+from Enumeraciones import TipoError, CodigoError
+from CodigoIntermedio import calcular, formatearConstante
+from FlujoDatos import GrafoFlujo, DECLARACION, ASIGNACION, LECTURA, LLAMADA
+import Arbol
+from antlr4 import ErrorNode, TerminalNode, Token
+
+# Instrucciones simples: su nodo recuerda el tramo de eventos que generó (ver FlujoDatos)
+_SIMPLES = (Arbol.DECLARACION, Arbol.ASIGNACION, Arbol.RETORNO, Arbol.LLAMADA)
 
 
 class Escucha(compiladorListener):
-    def __init__(self):
+    """Análisis semántico y bajada al AST (ver Arbol), mientras se parsea.
+
+    Al salir de cada regla se arma su nodo en `ctx.nodo` a partir de los nodos de sus hijos, y los
+    chequeos de esa regla se hacen sobre esos nodos. Después el contexto suelta sus hijos
+    (exitEveryRule), así que del árbol de ANTLR solo queda vivo el camino que se está parseando.
+    """
+
+    def __init__(self, sesion: CompileSession = None):
         super().__init__()
-        self.TS = TS.getTS()
-        self.huboErrores = False
-        # bandera que indica que estamos procesando una declaracion
-        # para evitar reportar usos sin inicializar durante su propio parsing
-        self.leyendoDeclaracion = False
+        self.sesion = sesion if sesion is not None else CompileSession()
+        self.TS = self.sesion.TS
+        # tipo de la declaración de variables que se está leyendo (lo fija exitTipo)
+        self.tipoDeclaracion = None
+        # (nombre, tipo de retorno) de la definición de función que se está recorriendo (para validar sus return)
+        self.funcionActual = None
+        # eventos de las variables en orden de evaluación, para el análisis de flujo de datos (ver FlujoDatos)
+        self.eventos = []
+        # por función (su símbolo): (variables de afuera que asigna por todos los caminos, variables de afuera que lee,
+        # funciones que llama por todos los caminos, funciones que llama)
+        self._efectosDeFunciones = {}
+        self._localesDeFunciones = set() # variables ya analizadas con el grafo de su función
 
     # ------------------------------
     # Utilidades
     # ------------------------------
-    def registrarError(self, tipo: TipoError, msj: str):
-        # mantenemos la salida estilo CODIGOMAL
-        self.huboErrores = True
-        # imprime con la etiqueta semántica como antes
-        print(f"ERROR SEMANTICO: {msj}")
+    @property
+    def huboErrores(self) -> bool:
+        return self.sesion.diagnosticos.hayErrores(TipoError.SEMANTICO)
+
+    def registrarError(self, tipo: TipoError, codigo: CodigoError, msj: str, nodo=None):
+        """Reporta el error en la sesión, con la posición del nodo (token, regla o nodo del AST) donde se detectó."""
+        self.sesion.reportar(tipo, codigo, msj, *self.posicion(nodo))
+
+    @staticmethod
+    def posicion(nodo) -> tuple:
+        """(línea, columna) de un token, regla o nodo del AST; (None, None) si no hay nodo."""
+        if nodo is None or isinstance(nodo, Token):
+            token = nodo
+        elif isinstance(nodo, TerminalNode):
+            token = nodo.getSymbol()
+        elif isinstance(nodo, Arbol.Nodo):
+            token = nodo.token
+        else:
+            token = nodo.start
+        return (token.line, token.column) if token else (None, None)
+
+    @staticmethod
+    def _nodo(ctx):
+        """El nodo del AST de un contexto hijo (None si el hijo falta)."""
+        return getattr(ctx, "nodo", None)
+
+    @staticmethod
+    def _conErrores(ctx) -> bool:
+        return any(isinstance(h, ErrorNode) for h in ctx.getChildren())
+
+    def exitEveryRule(self, ctx):
+        # El nodo ya está armado (y el padre solo usa ese nodo): el contexto suelta sus hijos
+        ctx.children = None
 
     # ------------------------------
     # Inicio / fin
     # ------------------------------
     def enterPrograma(self, ctx: compiladorParser.ProgramaContext):
-        with open("ContenidoTS.txt", "w") as f:
-            pass
-        print(" ------ Comienza el parsing ------ ")
+        self.sesion.informar(" ------ Comienza el parsing ------ ")
 
     def exitPrograma(self, ctx: compiladorParser.ProgramaContext):
-        # Al terminar, revisar variables no usadas
-        self.buscarVariablesNoUsadas()
+        ctx.nodo = Arbol.Programa(self._nodo(ctx.instrucciones()) or [], ctx.start)
+
+        # Al terminar, el código global: usos sin inicializar y variables no usadas
+        with self.sesion.medir("flujoDatos"):
+            self.analizarFlujo(GrafoFlujo.dePrograma(self.eventos, ctx.nodo), 0, len(self.eventos), programa=True)
 
-        if self.huboErrores:
-            with open("ContenidoTS.txt", "w") as f:
-                f.write("Imposible generar la TS: Se encontraron errores durante el parsing.\n")
+        if self.sesion.rutaTS is None:
+            pass # La sesión no pidió el archivo de la TS
+        elif self.huboErrores:
+            self.sesion.exportarTS()
         else:
-            # imprimir tabla si no hubo errores
-            self.TS.imprimirTS()
-        print(" ------ Termina el parsing ------ ")
+            # exportar la tabla si no hubo errores
+            with self.sesion.medir("exportTS"):
+                self.sesion.exportarTS(self.TS)
+        self.sesion.informar(" ------ Termina el parsing ------ ")
+
+    # ------------------------------
+    # Instrucciones
+    # ------------------------------
+    def exitInstrucciones(self, ctx: compiladorParser.InstruccionesContext):
+        ctx.nodo = [nodo for nodo in map(self._nodo, ctx.instruccion()) if nodo is not None]
+
+    def exitInstruccion(self, ctx: compiladorParser.InstruccionContext):
+        hijo = ctx.getChild(0) if ctx.getChildCount() else None
+        ctx.nodo = None if isinstance(hijo, TerminalNode) else self._nodo(hijo)
+        if ctx.nodo is not None and ctx.nodo.clase in _SIMPLES:
+            ctx.nodo.eventos = (ctx.inicioEventos, len(self.eventos))
 
     # ------------------------------
     # Contextos (bloques y for)
     # ------------------------------
     def enterBloque(self, ctx):
+        # El bloque de una definición de función abre el contexto de sus parámetros
+        if isinstance(ctx.parentCtx, compiladorParser.FuncionContext):
+            self.declararFuncion(ctx.parentCtx)
+            return
         self.TS.addContexto()
 
     def exitBloque(self, ctx):
         self.TS.delContexto()
+        ctx.nodo = Arbol.Bloque(self._nodo(ctx.instrucciones()) or [], ctx.start)
 
     def enterIfor(self, ctx):
         self.TS.addContexto()
 
-    def exitIfor(self, ctx):
+    def exitIfor(self, ctx: compiladorParser.IforContext):
         self.TS.delContexto()
+        ctx.nodo = Arbol.Para(self._nodo(ctx.initialize()) or [], self._nodo(ctx.test()), self._nodo(ctx.step()) or [],
+                              self._nodo(ctx.instruccion()), ctx.start)
+        ctx.nodo.eventosInicializacion = self._tramo(ctx.initialize())
+        ctx.nodo.eventosCondicion = self._tramo(ctx.test())
+        ctx.nodo.eventosPasos = self._tramo(ctx.step())
+
+    def exitInitialize(self, ctx: compiladorParser.InitializeContext):
+        ctx.finEventos = len(self.eventos)
+        if ctx.expDEC() is not None:
+            ctx.nodo = [self._nodo(ctx.expDEC())]
+        else:
+            ctx.nodo = [self._nodo(asignacion) for asignacion in ctx.expASIG()]
+
+    def exitStep(self, ctx: compiladorParser.StepContext):
+        ctx.finEventos = len(self.eventos)
+        ctx.nodo = [self._nodo(paso) for paso in ctx.exp()]
 
     # ------------------------------
-    # Declaraciones
+    # Funciones (prototipos, definiciones, llamadas y return)
     # ------------------------------
-    def enterDeclaracion(self, ctx: compiladorParser.DeclaracionContext):
-        # activamos la bandera para no considerar como uso sin inicializar
-        # las referencias que formen parte de los inicializadores en la misma linea
-        self.leyendoDeclaracion = True
+    def exitParametroProt(self, ctx: compiladorParser.ParametroProtContext):
+        # en los prototipos el nombre del parámetro es opcional
+        ctx.nodo = (ctx.ID().getText() if ctx.ID() is not None else "", self._nodo(ctx.tipo()))
 
-    def exitDeclaracion(self, ctx: compiladorParser.DeclaracionContext):
-        # si hubo error de parseo en descendencia, salimos
-        if any(isinstance(h, ErrorNode) for h in ctx.getChildren()):
-            self.leyendoDeclaracion = False
+    def exitListParamsProt(self, ctx: compiladorParser.ListParamsProtContext):
+        ctx.nodo = [self._nodo(param) for param in ctx.parametroProt()]
+
+    def exitPrototipo(self, ctx: compiladorParser.PrototipoContext):
+        ctx.nodo = None
+        if self._conErrores(ctx):
             return
 
-        # extraer tipo y lista textual (similar a CODIGOMAL original)
-        tipo = ctx.expDEC().tipo().getText()
-        raw = ctx.expDEC().getText()
-        rest = raw[len(tipo):].strip()
-        parts = [p.strip() for p in rest.split(',') if p.strip()]
-
-        # recolectar variables en orden izquierdo->derecho
-        vars_list = []  # tuplas: (nombre, tiene_inic, inic_text_or_ctx)
-        for part in parts:
-            if '=' in part:
-                nombre, valor = [t.strip() for t in part.split('=', 1)]
-                vars_list.append((nombre, True, valor))
-            else:
-                vars_list.append((part, False, None))
+        nombre = ctx.ID().getText()
+        tipo = self._nodo(ctx.tipo())
+        params = self._nodo(ctx.listParamsProt()) or []
+        ctx.nodo = Arbol.Prototipo(nombre, tipo, [tipoParam for _, tipoParam in params], ctx.start)
+        if self.TS.buscarSimboloContexto(nombre):
+            self.registrarError(TipoError.SEMANTICO, CodigoError.YA_DECLARADO, f"'{nombre}' ya existe en el contexto.", ctx.ID())
+            return
+        self.TS.addSimbolo(Funcion(nombre, tipo, [Variable(nombreParam, tipoParam) for nombreParam, tipoParam in params]))
+
+    def exitParametroDef(self, ctx: compiladorParser.ParametroDefContext):
+        # (nombre, tipo, token del nombre, token donde empieza el parámetro)
+        identificador = ctx.ID()
+        ctx.nodo = None if identificador is None else (identificador.getText(), self._nodo(ctx.tipo()), identificador.getSymbol(), ctx.start)
+
+    def exitListParamsDef(self, ctx: compiladorParser.ListParamsDefContext):
+        ctx.nodo = [nodo for nodo in map(self._nodo, ctx.parametroDef()) if nodo is not None]
+
+    def enterFuncion(self, ctx: compiladorParser.FuncionContext):
+        ctx.inicioEventos = len(self.eventos)
+
+    def exitFuncion(self, ctx: compiladorParser.FuncionContext):
+        self.funcionActual = None
+        params = self._nodo(ctx.listParamsDef()) or []
+        cuerpo = self._nodo(ctx.bloque())
+        ctx.nodo = Arbol.Funcion(ctx.ID().getText() if ctx.ID() is not None else None, self._nodo(ctx.tipo()),
+                                 [(nombre, tipo, token) for nombre, tipo, token, _ in params],
+                                 cuerpo.instrucciones if cuerpo is not None else [], ctx.start)
+        ctx.nodo.eventosParametros = getattr(ctx, "eventosParametros", None)
+        funcion = self.TS.buscarSimboloContexto(ctx.nodo.nombre) if ctx.nodo.nombre is not None else None
+        with self.sesion.medir("flujoDatos"):
+            self.analizarFlujo(GrafoFlujo.deFuncion(self.eventos, ctx.nodo), ctx.inicioEventos, len(self.eventos),
+                               funcion=funcion if isinstance(funcion, Funcion) else None)
+
+    def declararFuncion(self, ctx: compiladorParser.FuncionContext):
+        """Registra la función en el contexto actual y abre el contexto de su cuerpo con los parámetros ya inicializados."""
+        nombre = ctx.ID().getText()
+        tipo = self._nodo(ctx.tipo())
+        params = self._nodo(ctx.listParamsDef()) or []
+        args = [Variable(nombreParam, tipoParam) for nombreParam, tipoParam, _, _ in params]
+        self.funcionActual = (nombre, tipo)
+
+        existente = self.TS.buscarSimboloContexto(nombre)
+        if existente is None:
+            self.TS.addSimbolo(Funcion(nombre, tipo, args, inicializado=True))
+        elif isinstance(existente, Funcion) and not existente.getInicializado():
+            existente.setInicializado() # definición de una función prototipada
+        else:
+            self.registrarError(TipoError.SEMANTICO, CodigoError.YA_DECLARADO, f"'{nombre}' ya existe en el contexto.", ctx.ID())
 
-        # primero: agregar todas las variables al contexto en orden
-        nuevas = []
-        for nombre, tiene_inic, inic in vars_list:
-            if self.TS.buscarSimboloContexto(nombre):
-                self.registrarError(TipoError.SEMANTICO, f"'{nombre}' ya existe en el contexto.")
+        self.TS.addContexto()
+        inicio = len(self.eventos)
+        for arg, (_, _, token, inicioParam) in zip(args, params):
+            if self.TS.buscarSimboloContexto(arg.getNombre()):
+                self.registrarError(TipoError.SEMANTICO, CodigoError.YA_DECLARADO, f"'{arg.getNombre()}' ya existe en el contexto.", inicioParam)
                 continue
-            nueva = Variable(nombre, tipo)
-            # NO marcar inicializada aun; se hará despues de validar el inicializador
-            self.TS.addSimbolo(nueva)
-            nuevas.append((nueva, tiene_inic, inic))
-
-
-        self.leyendoDeclaracion = False
-        for var, tiene_inic, inic in nuevas:
-            if tiene_inic and inic is not None:
-                tipo_val = self._tipoExpFromTextOrCtx(inic)
-                tipo_dest = var.getTipoDato()
-                if tipo_val and not self._compatible(tipo_dest, tipo_val):
-                    self.registrarError(TipoError.SEMANTICO,
-                                        f"Tipo incompatible en inicializador de '{var.getNombre()}': se esperaba '{tipo_dest}', se obtuvo '{tipo_val}'.")
-                else:
-                    var.setInicializado()
-
-    def enterInitialize(self, ctx: compiladorParser.InitializeContext):
-        
-        self.leyendoDeclaracion = True
+            param = Variable(arg.getNombre(), arg.getTipoDato())
+            param.setInicializado() # los parámetros llegan con el valor del argumento
+            self.TS.addSimbolo(param)
+            self.eventos.append((DECLARACION, param, token))
+            self.eventos.append((ASIGNACION, param, token))
+        ctx.eventosParametros = (inicio, len(self.eventos))
+
+    def exitListArgs(self, ctx: compiladorParser.ListArgsContext):
+        ctx.nodo = [self._nodo(argumento) for argumento in ctx.opal()]
+
+    def exitLlamadaFunc(self, ctx: compiladorParser.LlamadaFuncContext):
+        argumentos = self._nodo(ctx.listArgs()) or []
+        ctx.nodo = llamada = Arbol.Llamada(ctx.ID().getText() if ctx.ID() is not None else None, argumentos, None, ctx.start)
+        if self._conErrores(ctx):
+            return
 
-    def exitInitialize(self, ctx: compiladorParser.InitializeContext):
-        if ctx.expDEC() is None:
-            self.leyendoDeclaracion = False
+        nombre = llamada.nombre
+        funcion = self.TS.buscarSimbolo(nombre)
+        if funcion is None:
+            self.registrarError(TipoError.SEMANTICO, CodigoError.NO_DECLARADO, f"Uso de identificador no declarado '{nombre}'.", ctx.ID())
             return
-        if any(isinstance(h, ErrorNode) for h in ctx.getChildren()):
-            self.leyendoDeclaracion = False
+        if not isinstance(funcion, Funcion):
+            self.registrarError(TipoError.SEMANTICO, CodigoError.NO_ES_FUNCION, f"'{nombre}' no es una función.", ctx.ID())
+            return
+        funcion.setUsado()
+        self.eventos.append((LLAMADA, funcion, ctx.ID().getSymbol()))
+
+        # los argumentos ya llegan tipados
+        esperados = funcion.getListaArgs()
+        if len(argumentos) != len(esperados):
+            self.registrarError(TipoError.SEMANTICO, CodigoError.CANTIDAD_ARGUMENTOS,
+                                f"Cantidad de argumentos incorrecta en la llamada a '{nombre}': se esperaban {len(esperados)}, se recibieron {len(argumentos)}.", ctx)
+        else:
+            for pos, (arg, param) in enumerate(zip(argumentos, esperados), start=1):
+                tipo_val = self.tipoExp(arg)
+                if tipo_val and not self._compatible(param.getTipoDato(), tipo_val):
+                    self.registrarError(TipoError.SEMANTICO, CodigoError.TIPO_ARGUMENTO,
+                                        f"Tipo incompatible en el argumento {pos} de '{nombre}': se esperaba '{param.getTipoDato()}', se obtuvo '{tipo_val}'.", arg)
+        llamada.tipoDato = funcion.getTipoDato()
+
+    def exitIreturn(self, ctx: compiladorParser.IreturnContext):
+        ctx.nodo = Arbol.Retorno(self._nodo(ctx.opal()), ctx.start)
+        if self.funcionActual is None or self._conErrores(ctx):
             return
 
-        expdec = ctx.expDEC()
-        tipo = expdec.tipo().getText()
-        raw = expdec.getText()
-        rest = raw[len(tipo):].strip()
-        parts = [p.strip() for p in rest.split(',') if p.strip()]
-
-        vars_list = []
-        for part in parts:
-            if '=' in part:
-                nombre, valor = [t.strip() for t in part.split('=', 1)]
-                vars_list.append((nombre, True, valor))
-            else:
-                vars_list.append((part, False, None))
+        nombre, tipo_dest = self.funcionActual
+        if ctx.opal() is None:
+            if tipo_dest != 'void':
+                self.registrarError(TipoError.SEMANTICO, CodigoError.RETORNO_FALTANTE,
+                                    f"La función '{nombre}' debe devolver un valor de tipo '{tipo_dest}'.", ctx)
+            return
 
-        # agregar todos y despues evaluar inicializadores como en exitDeclaracion
-        nuevas = []
-        for nombre, tiene_inic, inic in vars_list:
-            if self.TS.buscarSimboloContexto(nombre):
-                self.registrarError(TipoError.SEMANTICO, f"'{nombre}' ya existe en el contexto.")
-                continue
-            nueva = Variable(nombre, tipo)
-            self.TS.addSimbolo(nueva)
-            nuevas.append((nueva, tiene_inic, inic))
-
-        
-        self.leyendoDeclaracion = False
-        for var, tiene_inic, inic in nuevas:
-            if tiene_inic and inic is not None:
-                tipo_val = self._tipoExpFromTextOrCtx(inic)
-                tipo_dest = var.getTipoDato()
-                if tipo_val and not self._compatible(tipo_dest, tipo_val):
-                    self.registrarError(TipoError.SEMANTICO,
-                                        f"Tipo incompatible en inicializador de '{var.getNombre()}': se esperaba '{tipo_dest}', se obtuvo '{tipo_val}'.")
-                else:
-                    var.setInicializado()
+        tipo_val = self.tipoExp(ctx.nodo.valor)
+        if tipo_dest == 'void':
+            self.registrarError(TipoError.SEMANTICO, CodigoError.RETORNO_EN_VOID, f"La función '{nombre}' es void y no puede devolver un valor.", ctx)
+        elif tipo_val and not self._compatible(tipo_dest, tipo_val):
+            self.registrarError(TipoError.SEMANTICO, CodigoError.TIPO_RETORNO,
+                                f"Tipo incompatible en return de '{nombre}': se esperaba '{tipo_dest}', se obtuvo '{tipo_val}'.", ctx)
+
+    # ------------------------------
+    # Condiciones
+    # ------------------------------
+    def _condicion(self, opal):
+        """El nodo de una condición, validando que no sea void."""
+        condicion = self._nodo(opal)
+        if self.tipoExp(condicion) == 'void':
+            self.registrarError(TipoError.SEMANTICO, CodigoError.CONDICION_VOID, "Una condición no puede ser de tipo 'void'.", condicion)
+        return condicion
+
+    def exitIif(self, ctx: compiladorParser.IifContext):
+        ctx.nodo = Arbol.Si(self._condicion(ctx.opal()), self._nodo(ctx.instruccion()), self._nodo(ctx.ielse()), ctx.start)
+        ctx.nodo.eventosCondicion = self._tramo(ctx.opal())
+
+    def exitIelse(self, ctx: compiladorParser.IelseContext):
+        ctx.nodo = self._nodo(ctx.instruccion())
+
+    def exitIwhile(self, ctx: compiladorParser.IwhileContext):
+        ctx.nodo = Arbol.Mientras(self._condicion(ctx.opal()), self._nodo(ctx.instruccion()), ctx.start)
+        ctx.nodo.eventosCondicion = self._tramo(ctx.opal())
+
+    def exitTest(self, ctx: compiladorParser.TestContext):
+        ctx.finEventos = len(self.eventos)
+        ctx.nodo = self._condicion(ctx.opal())
+
+    # ------------------------------
+    # Declaraciones
+    # ------------------------------
+    # Las declaraciones se procesan sobre el árbol, variable por variable: cuando el listener sale
+    # de cada `inic` ya tiene el ID del declarador y el inicializador tipado. Así cada variable
+    # queda declarada antes de leer la siguiente (int x = 0, y = x;) sin volver a recorrer nada.
+    def exitTipo(self, ctx: compiladorParser.TipoContext):
+        ctx.nodo = ctx.getText()
+        if isinstance(ctx.parentCtx, compiladorParser.ExpDECContext):
+            self.tipoDeclaracion = ctx.nodo
+
+    def exitInic(self, ctx: compiladorParser.InicContext):
+        ctx.nodo = self._nodo(ctx.opal())
+        # el padre es el declarador (ID inic) de la variable
+        identificador = ctx.parentCtx.ID()
+        if identificador is None or isinstance(identificador, ErrorNode):
+            return
+
+        nombre = identificador.getText()
+        if self.TS.buscarSimboloContexto(nombre):
+            self.registrarError(TipoError.SEMANTICO, CodigoError.YA_DECLARADO, f"'{nombre}' ya existe en el contexto.", identificador)
+            return
+        var = Variable(nombre, self.tipoDeclaracion)
+        self.TS.addSimbolo(var)
+        self.eventos.append((DECLARACION, var, identificador.getSymbol()))
+
+        if ctx.opal() is None or self._conErrores(ctx):
+            return
+        self.eventos.append((ASIGNACION, var, identificador.getSymbol())) # aunque el tipo no sea compatible: la variable tiene un valor
+        tipo_val = self.tipoExp(ctx.nodo)
+        tipo_dest = var.getTipoDato()
+        if tipo_val and not self._compatible(tipo_dest, tipo_val):
+            self.registrarError(TipoError.SEMANTICO, CodigoError.TIPO_INICIALIZADOR,
+                                f"Tipo incompatible en inicializador de '{nombre}': se esperaba '{tipo_dest}', se obtuvo '{tipo_val}'.", ctx.nodo)
+        else:
+            var.setInicializado()
+
+    def exitDeclarador(self, ctx: compiladorParser.DeclaradorContext):
+        identificador = ctx.ID()
+        if identificador is None or isinstance(identificador, ErrorNode):
+            ctx.nodo = None
+        else:
+            ctx.nodo = (identificador.getText(), identificador.getSymbol(), self._nodo(ctx.inic()))
+
+    def exitExpDEC(self, ctx: compiladorParser.ExpDECContext):
+        declaradores = [nodo for nodo in map(self._nodo, ctx.declarador()) if nodo is not None]
+        ctx.nodo = Arbol.Declaracion(self._nodo(ctx.tipo()), declaradores, ctx.start)
+
+    def exitDeclaracion(self, ctx: compiladorParser.DeclaracionContext):
+        ctx.nodo = self._nodo(ctx.expDEC())
 
     # ------------------------------
     # Asignaciones fuera de declaracion
     # ------------------------------
     def exitExpASIG(self, ctx: compiladorParser.ExpASIGContext):
-        if any(isinstance(hijo, ErrorNode) for hijo in ctx.getChildren()):
+        identificador = ctx.ID()
+        ctx.nodo = Arbol.Asignacion(identificador.getText() if identificador is not None else None, self._nodo(ctx.opal()), ctx.start)
+        if self._conErrores(ctx):
             return
 
-        nombre = ctx.ID().getText()
-
-        # Si estamos dentro de una declaracion manejada arriba, no usar este path
+        nombre = ctx.nodo.nombre
         simbolo = self.TS.buscarSimbolo(nombre)
         if simbolo is None:
-            self.registrarError(TipoError.SEMANTICO, f"Uso de identificador no declarado '{nombre}'.")
+            self.registrarError(TipoError.SEMANTICO, CodigoError.NO_DECLARADO, f"Uso de identificador no declarado '{nombre}'.", identificador)
             return
 
+        self.eventos.append((ASIGNACION, simbolo, identificador.getSymbol())) # después de las lecturas de la expresión
         tipo_dest = simbolo.getTipoDato()
-        tipo_val = self.tipoExp(ctx.opal())
+        tipo_val = self.tipoExp(ctx.nodo.valor) # ya calculado al salir de opal
 
         if tipo_val and not self._compatible(tipo_dest, tipo_val):
-            self.registrarError(TipoError.SEMANTICO,
-                                f"Tipo incompatible en asignación a '{nombre}': se esperaba '{tipo_dest}', pero se obtuvo '{tipo_val}'.")
+            self.registrarError(TipoError.SEMANTICO, CodigoError.TIPO_ASIGNACION,
+                                f"Tipo incompatible en asignación a '{nombre}': se esperaba '{tipo_dest}', pero se obtuvo '{tipo_val}'.", ctx.nodo.valor)
             return
 
         simbolo.setInicializado()
 
-        # Evaluar opal para marcar usos internos (si los hay)
-        try:
-            self.eval_opal(ctx.opal())
-        except Exception:
-            pass
+    def exitAsignacion(self, ctx: compiladorParser.AsignacionContext):
+        ctx.nodo = self._nodo(ctx.expASIG())
 
     # ------------------------------
-    # Uso de IDs en expresiones
+    # Tipado, plegado y bajada de expresiones (de abajo hacia arriba)
     # ------------------------------
+    # Cada nodo de expresión recibe su tipo en `tipoDato` una única vez, al salir de su regla, y si su
+    # valor se conoce al compilar queda directamente como Arbol.Constante. Como el listener se ejecuta
+    # mientras se parsea, los hijos ya están resueltos cuando sale el padre, así que nadie necesita
+    # volver a recorrer el subárbol.
     def exitFactorCore(self, ctx: compiladorParser.FactorCoreContext):
-        if any(isinstance(hijo, ErrorNode) for hijo in ctx.getChildren()):
+        ctx.nodo = None
+        ctx.variable = False # si es un ID solo: `x++` y `++x` guardan el resultado en la variable
+        if self._conErrores(ctx):
             return
 
-        if getattr(ctx, 'ID', None) and ctx.ID():
+        if ctx.NUMERO() is not None:
+            ctx.nodo = Arbol.Constante(int(ctx.NUMERO().getText()), 'int', ctx.start)
+
+        elif ctx.ID() is not None:
             nombre = ctx.ID().getText()
+            ctx.variable = True
             simbolo = self.TS.buscarSimbolo(nombre)
-            # Si estamos dentro de una declaración múltiple y todavía no se agregó
-            # el símbolo, NO reportamos 'no declarado' ahora, se valida luego.
             if simbolo is None:
-                if self.leyendoDeclaracion:
-                    return
-                else:
-                    self.registrarError(TipoError.SEMANTICO, f"Uso de identificador no declarado '{nombre}'.")
-                    return
-            # marcar usado
+                self.registrarError(TipoError.SEMANTICO, CodigoError.NO_DECLARADO, f"Uso de identificador no declarado '{nombre}'.", ctx.ID())
+                ctx.nodo = Arbol.Nombre(nombre, None, None, ctx.start)
+                return
+            # marcar usado (para la TS); si puede no estar inicializada lo decide el análisis de flujo
             simbolo.setUsado()
-            # si no esta inicializada y NO estamos analizando inicializadores de su propia declaracion
-            if not simbolo.getInicializado() and not self.leyendoDeclaracion:
-                self.registrarError(TipoError.SEMANTICO, f"Variable '{nombre}' usada sin inicializar.")
+            self.eventos.append((LECTURA, simbolo, ctx.start))
+            ctx.nodo = Arbol.Nombre(nombre, simbolo, simbolo.getTipoDato(), ctx.start)
 
-    # ------------------------------
-    # Tipos en expresiones
-    # ------------------------------
-    def tipoExp(self, ctx):
-        if ctx is None:
-            return None
+        elif ctx.exp() is not None: # los paréntesis desaparecen: queda la expresión, desde el '('
+            ctx.nodo = self._nodo(ctx.exp())
+            if ctx.nodo is not None:
+                ctx.nodo.token = ctx.start
 
-        # casos hoja
-        if getattr(ctx, 'NUMERO', None) and ctx.NUMERO():
-            return 'int'
+        else:
+            ctx.nodo = self._nodo(ctx.llamadaFunc())
+
+    def exitFactorSufix(self, ctx: compiladorParser.FactorSufixContext):
+        core = ctx.factorCore()
+        operando = self._nodo(core)
+        ctx.variable = False
+        if ctx.INC() is None and ctx.DEC() is None:
+            ctx.nodo = self._sinErrores(ctx, operando)
+            ctx.variable = ctx.getChildCount() == 1 and core is not None and core.variable
+            return
 
-        if getattr(ctx, 'ID', None) and ctx.ID():
-            nombre = ctx.ID().getText()
-            simbolo = self.TS.buscarSimbolo(nombre)
-            # Mismo comportamiento defensivo: si estamos dentro de una declaración,
-            # y el símbolo aún no existe, no reportamos 'no declarado' aquí.
-            if simbolo is None:
-                return None
-            simbolo.setUsado()
-            if not simbolo.getInicializado() and not self.leyendoDeclaracion:
-                self.registrarError(TipoError.SEMANTICO, f"Variable '{nombre}' usada sin inicializar.")
-            return simbolo.getTipoDato()
-
-        # recursivo: combinar hijos
-        tipos = set()
-        for i in range(ctx.getChildCount()):
-            try:
-                t = self.tipoExp(ctx.getChild(i))
-            except Exception:
-                t = None
-            if t:
-                tipos.add(t)
-
-        if len(tipos) == 1:
-            return tipos.pop()
-        elif len(tipos) > 1:
-            # permitir int + double -> double
-            if tipos == {'int', 'double'}:
-                return 'double'
-            self.registrarError(TipoError.SEMANTICO, "Tipos incompatibles en la expresión.")
-            return None
+        # x++ / x--: lee la variable (la lectura ya se anotó al salir de factorCore) y después la asigna
+        asigna = core is not None and core.variable
+        ctx.nodo = Arbol.Incremento("+" if ctx.INC() is not None else "-", operando, False, asigna, self.tipoExp(operando), ctx.start)
+        self._incremento(operando, asigna)
+
+    def exitFactor(self, ctx: compiladorParser.FactorContext):
+        sufijo = ctx.factorSufix()
+        operando = self._nodo(sufijo)
+        tipo = self.tipoExp(operando)
+        if ctx.NOT() is not None:
+            valor = Arbol.constante(operando)
+            if valor is not None and tipo is not None and not self._conErrores(ctx):
+                ctx.nodo = Arbol.Constante(int(valor == 0), tipo, ctx.start)
+            else:
+                ctx.nodo = Arbol.Negacion(operando, tipo, ctx.start)
+        elif ctx.INC() is not None or ctx.DEC() is not None:
+            # ++x / --x: primero se modifica la variable y el valor es el nuevo
+            asigna = sufijo is not None and sufijo.variable
+            ctx.nodo = Arbol.Incremento("+" if ctx.INC() is not None else "-", operando, True, asigna, tipo, ctx.start)
+            self._incremento(operando, asigna)
         else:
-            return None
+            ctx.nodo = self._sinErrores(ctx, operando)
+
+    def _incremento(self, operando, asigna: bool):
+        if asigna and getattr(operando, "simbolo", None) is not None:
+            self.eventos.append((ASIGNACION, operando.simbolo, operando.token))
+
+    # Cada nivel de precedencia es una lista plana de operandos separados por operadores
+    def exitTerm(self, ctx): self._cadena(ctx)
+    def exitExp(self, ctx): self._cadena(ctx)
+    def exitExpCOMP(self, ctx): self._cadena(ctx)
+    def exitExpIGUALDAD(self, ctx): self._cadena(ctx)
+    def exitExpAND(self, ctx): self._cadena(ctx)
+    def exitExpOR(self, ctx): self._cadena(ctx)
+    def exitOpal(self, ctx):
+        self._cadena(ctx)
+        ctx.finEventos = len(self.eventos)
+
+    def _cadena(self, ctx):
+        """Baja `a op b op c ...` a operaciones binarias asociadas a izquierda, tipándola y plegando sus constantes.
+
+        Un nivel con un solo operando no agrega nodos. Un prefijo constante (3 + 1 en 3 + 1 + x) queda como
+        una constante. Sigue las reglas de _compatible: int con double da double, y entre enteros / y %
+        truncan como en C. Un divisor constante 0 se reporta acá, aunque el dividendo no sea constante.
+        """
+        hijos = ctx.children or ()
+        operandos = [self._nodo(h) for h in hijos if not isinstance(h, TerminalNode)]
+        tipo = self._tipar(ctx, operandos)
+        if self._conErrores(ctx) or len(hijos) != 2 * len(operandos) - 1:
+            ctx.nodo = self._incompleta(ctx, tipo)
+            return
 
-    def _tipoExpFromTextOrCtx(self, inic):
-        # si nos pasan un ctx (ANTLR node) tratamos como antes
-        # detectamos si 'inic' tiene atributos parecidos a ctx
-        try:
-            if hasattr(inic, 'getText') and hasattr(inic, 'getChildCount'):
-                return self.tipoExp(inic)
-        except Exception:
-            pass
-
-        # si es string, analizamos
-        if isinstance(inic, str):
-            txt = inic
-            # numero con punto -> double
-            if txt.replace('.', '', 1).isdigit():
-                return 'double' if '.' in txt else 'int'
-            # si es un identificador simple, buscar simbolo
-            simbolo = self.TS.buscarSimbolo(txt)
-            if simbolo:
-                simbolo.setUsado()
-                if not simbolo.getInicializado() and not self.leyendoDeclaracion:
-                    self.registrarError(TipoError.SEMANTICO, f"Variable '{txt}' usada sin inicializar.")
-                return simbolo.getTipoDato()
-        return None
+        nodo = operandos[0]
+        valor = Arbol.constante(nodo)
+        parcial = self.tipoExp(nodo)
+        for i in range(1, len(hijos), 2):
+            operador = hijos[i].getText()
+            derecho = operandos[(i + 1) // 2]
+            valorDerecho = Arbol.constante(derecho)
+            parcial = self._combinar(parcial, self.tipoExp(derecho))
+            if operador in ('/', '%') and valorDerecho == 0:
+                self.registrarError(TipoError.SEMANTICO, CodigoError.DIVISION_POR_CERO, "División por cero: el divisor es la constante 0.", hijos[i + 1])
+                valor = None
+            elif valor is not None and valorDerecho is not None:
+                valor = calcular(operador, valor, valorDerecho)
+            else:
+                valor = None
+
+            if valor is not None and tipo is not None and formatearConstante(valor) is not None:
+                nodo = Arbol.Constante(valor, parcial, ctx.start)
+            else:
+                nodo = Arbol.Binaria(operador, nodo, derecho, parcial, ctx.start)
+        if nodo is not None:
+            nodo.tipoDato = tipo
+        ctx.nodo = nodo
+
+    def _tipar(self, ctx, operandos: list):
+        """Combina los tipos ya calculados de los operandos: iguales se mantienen, int con double da double, el resto es error."""
+        tipo = None
+        for operando in operandos:
+            t = self.tipoExp(operando) # los operandos sin tipo (por un error anterior) no aportan
+            if t is None or t == tipo:
+                continue
+            if tipo is None:
+                tipo = t
+            elif {tipo, t} == {'int', 'double'}:
+                tipo = 'double'
+            else:
+                self.registrarError(TipoError.SEMANTICO, CodigoError.TIPOS_INCOMPATIBLES, "Tipos incompatibles en la expresión.", ctx)
+                return None
+        return tipo
+
+    @staticmethod
+    def _combinar(tipo, otro):
+        """Tipo de una operación parcial de la cadena (sin reportar: el error lo reporta _tipar una sola vez)."""
+        if otro is None or otro == tipo:
+            return tipo
+        if tipo is None:
+            return otro
+        return 'double' if {tipo, otro} == {'int', 'double'} else None
+
+    def _sinErrores(self, ctx, nodo):
+        """El nodo de un nivel que no agrega nada, salvo que tenga errores sintácticos: entonces deja de ser constante."""
+        if self._conErrores(ctx) and Arbol.constante(nodo) is not None:
+            return self._incompleta(ctx, nodo.tipoDato)
+        return nodo
+
+    @staticmethod
+    def _incompleta(ctx, tipo):
+        """Expresión con errores sintácticos: solo conserva el tipo, porque con errores sintácticos no se genera código."""
+        return Arbol.Binaria(None, None, None, tipo, ctx.start)
+
+    def tipoExp(self, nodo):
+        """Devuelve el tipo de un nodo de expresión, calculado cuando el listener salió de su regla."""
+        if nodo is None:
+            return None
+        return nodo.tipoDato
 
     # ------------------------------
     # Reglas de compatibilidad de tipos
@@ -297,42 +556,99 @@ class Escucha(compiladorListener):
         return False
 
     # ------------------------------
-    # Evaluación liviana para valores constantes
+    # Flujo de datos: usos sin inicializar y variables no usadas
     # ------------------------------
-    def eval_opal(self, ctx):
-        try:
-            if getattr(ctx, 'NUMERO', None) and ctx.NUMERO():
-                return int(ctx.NUMERO().getText())
-
-            if getattr(ctx, 'ID', None) and ctx.ID():
-                return None
-
-            import re
-            text = ctx.getText()
-            if re.fullmatch(r"[0-9+\-*/%()\.\s]+", text):
-                return eval(text)
-            return None
-        except Exception:
+    # Cada instrucción y cada condición recuerda qué tramo de `eventos` generó; con eso FlujoDatos
+    # arma el grafo de una función sin volver a recorrer sus expresiones.
+    def enterInstruccion(self, ctx): ctx.inicioEventos = len(self.eventos)
+    def enterOpal(self, ctx): ctx.inicioEventos = len(self.eventos)
+    def enterInitialize(self, ctx): ctx.inicioEventos = len(self.eventos)
+    def enterTest(self, ctx): ctx.inicioEventos = len(self.eventos)
+    def enterStep(self, ctx): ctx.inicioEventos = len(self.eventos)
+
+    @staticmethod
+    def _tramo(ctx):
+        """(inicio, fin) de los eventos de un contexto que ya salió, o None si falta."""
+        if ctx is None or not hasattr(ctx, "finEventos"):
             return None
-
-    # ------------------------------
-    # Variables no usadas
-    # ------------------------------
-    def buscarVariablesNoUsadas(self):
-        # si el TS tiene historial de contextos, lo usamos (igual que CODIGOMAL)
-        if not hasattr(self.TS, 'historialCTX'):
-            return
-        for contexto in self.TS.historialCTX:
-            for nombre, simbolo in list(contexto.simbolos.items()):
-                if not simbolo.getUsado():
-                    self.registrarError(TipoError.SEMANTICO, f"Variable '{nombre}' declarada pero no utilizada.")
-
-    def buscarExistenciaVariable(self, nombre):
+        return (ctx.inicioEventos, ctx.finEventos)
+
+    def analizarFlujo(self, grafo: GrafoFlujo, inicio: int, fin: int, programa: bool = False, funcion: Funcion = None):
+        """Analiza el grafo de una función (o del código global) y reporta sus lecturas sin inicializar y sus variables no usadas.
+
+        Las variables de una función son las que se declaran en su tramo de eventos. Las de afuera (las
+        globales) no se siguen adentro de las funciones, pero se anota cuáles lee `funcion`, cuáles asigna
+        por todos los caminos y a quiénes llama. En el código global, cada llamada cuenta como lectura y
+        asignación de esas variables (sumando las de las funciones que llama la función llamada).
+        """
+        bits = {}
+        declaraciones = []
+        for clase, simbolo, token in self.eventos[inicio:fin]:
+            if clase == DECLARACION and simbolo not in bits and simbolo not in self._localesDeFunciones:
+                bits[simbolo] = len(bits)
+                declaraciones.append((simbolo, token))
+        locales = len(bits)
+
+        efectos = None
+        if programa:
+            efectos = {llamada: (sum(1 << bits[s] for s in escritas if s in bits), sum(1 << bits[s] for s in leidas if s in bits))
+                       for llamada, (escritas, leidas) in self._efectosTransitivos().items()}
+        else:
+            self._localesDeFunciones.update(bits)
+            leidas, llamadas = set(), set()
+            if funcion is not None:
+                # Las globales que asigna y las funciones que llama también llevan un bit, para saber con la asignación
+                # definida cuáles quedan asignadas (y llamadas) por todos los caminos que llegan a la salida
+                for clase, simbolo, _ in self.eventos[inicio:fin]:
+                    if simbolo in bits and bits[simbolo] < locales:
+                        continue
+                    if clase == LECTURA:
+                        leidas.add(simbolo)
+                    elif clase in (ASIGNACION, LLAMADA):
+                        bits.setdefault(simbolo, len(bits))
+                        if clase == LLAMADA:
+                            llamadas.add(simbolo)
+                efectos = {llamada: (1 << bits[llamada], 0) for llamada in llamadas} # una llamada "asigna" su propio bit
+        resultado = grafo.analizar(bits, efectos)
+
+        if funcion is not None:
+            alSalir = grafo.entradaAsignadas[grafo.salida.indice]
+            seguras = {simbolo for simbolo, bit in bits.items() if bit >= locales and alSalir >> bit & 1}
+            self._efectosDeFunciones[funcion] = (seguras - llamadas, leidas, seguras & llamadas, llamadas)
+
+        for _, simbolo, token in resultado["sinInicializar"]:
+            if bits[simbolo] < locales:
+                self.registrarError(TipoError.SEMANTICO, CodigoError.SIN_INICIALIZAR, f"Variable '{simbolo.getNombre()}' usada sin inicializar.", token)
+        for simbolo, token in declaraciones:
+            if not resultado["vivas"] >> bits[simbolo] & 1:
+                self.registrarError(TipoError.SEMANTICO, CodigoError.NO_UTILIZADA, f"Variable '{simbolo.getNombre()}' declarada pero no utilizada.", token)
+
+    def _efectosTransitivos(self) -> dict:
+        """Por función, (variables de afuera que asigna por todos los caminos, que lee), sumando las de las funciones que llama.
+
+        Lo que lee una función llamada se suma siempre; lo que asigna, solo si se la llama por todos los caminos.
+        """
+        efectos = {funcion: (set(escritas), set(leidas)) for funcion, (escritas, leidas, _, _) in self._efectosDeFunciones.items()}
+        cambio = True
+        while cambio: # las llamadas pueden ser recursivas: se suma hasta que no cambie nada
+            cambio = False
+            for funcion, (_, _, llamadasSeguras, llamadas) in self._efectosDeFunciones.items():
+                escritas, leidas = efectos[funcion]
+                antes = len(escritas) + len(leidas)
+                for llamada in llamadas:
+                    if llamada in efectos and llamada is not funcion:
+                        if llamada in llamadasSeguras:
+                            escritas |= efectos[llamada][0]
+                        leidas |= efectos[llamada][1]
+                cambio |= len(escritas) + len(leidas) != antes
+        return efectos
+
+    def buscarExistenciaVariable(self, nombre, nodo=None):
         simbolo = self.TS.buscarSimbolo(nombre)
         if simbolo is None:
-            self.registrarError(TipoError.SEMANTICO, f"Uso de identificador no declarado '{nombre}'.")
+            self.registrarError(TipoError.SEMANTICO, CodigoError.NO_DECLARADO, f"Uso de identificador no declarado '{nombre}'.", nodo)
             return None
         return simbolo
 
     def __str__(self):
-        return "Escucha (fase semántica)"
\ No newline at end of file
+        return "Escucha (fase semántica)"
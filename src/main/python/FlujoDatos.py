@@ -0,0 +1,284 @@
+"""Grafo de flujo de control y análisis de flujo de datos sobre el AST.
+
+Mientras se parsea, Escucha anota en una lista los eventos de cada variable en el orden en que se
+evalúan (declaración, asignación, lectura, llamada) y marca en los nodos de instrucciones y
+condiciones qué tramo de esa lista les corresponde. Al terminar una función (o el programa), el
+grafo se arma recorriendo solo las instrucciones: los bloques guardan tramos de la lista, no copias.
+
+Sobre el grafo se resuelven dos análisis con conjuntos de bits (un entero de Python, un bit por
+variable de la función):
+- asignación definida (hacia adelante, intersección): una lectura de una variable que no está
+  asignada por todos los caminos que llegan a ella es un uso sin inicializar.
+- vida (hacia atrás, unión): una variable que no está viva en ningún punto nunca se lee.
+
+Con código estructurado (sin saltos arbitrarios) los dos análisis se estabilizan en dos o tres
+vueltas, así que el costo es lineal en el tamaño de la función.
+"""
+import Arbol
+from Arbol import constante
+
+# Clase de cada evento (primer elemento de la tupla (clase, símbolo, token))
+DECLARACION = 0 # la variable empieza a existir (sin valor, salvo que después venga una ASIGNACION)
+ASIGNACION = 1
+LECTURA = 2
+LLAMADA = 3     # el símbolo es la función; puede leer y escribir variables globales
+
+
+class Bloque:
+    """Bloque básico: tramos de la lista de eventos que se ejecutan seguidos."""
+    __slots__ = ("indice", "tramos", "sucesores", "predecesores")
+
+    def __init__(self, indice: int):
+        self.indice = indice
+        self.tramos = [] # (inicio, fin) en la lista de eventos
+        self.sucesores = []
+        self.predecesores = []
+
+
+class GrafoFlujo:
+    """Grafo de flujo de control de una función (o del código global del programa).
+
+    `entrada` es el bloque por donde empieza y `salida` un bloque vacío al que llegan los return y el
+    final del cuerpo. Las instrucciones después de un return quedan en bloques sin predecesores.
+    """
+
+    def __init__(self, eventos: list):
+        self.eventos = eventos
+        self.bloques = []
+        self.entrada = self._nuevo()
+        self.salida = Bloque(-1) # se agrega al final, para que quede último en el orden de los bloques
+
+    @classmethod
+    def deFuncion(cls, eventos: list, funcion: Arbol.Funcion) -> "GrafoFlujo":
+        grafo = cls(eventos)
+        grafo._tramo(grafo.entrada, funcion.eventosParametros)
+        return grafo.cerrar(grafo.instrucciones(funcion.cuerpo, grafo.entrada))
+
+    @classmethod
+    def dePrograma(cls, eventos: list, programa: Arbol.Programa) -> "GrafoFlujo":
+        grafo = cls(eventos)
+        return grafo.cerrar(grafo.instrucciones(programa.instrucciones, grafo.entrada))
+
+    # ------------------------------
+    # Construcción
+    # ------------------------------
+    def _nuevo(self, *predecesores) -> Bloque:
+        bloque = Bloque(len(self.bloques))
+        self.bloques.append(bloque)
+        for predecesor in predecesores:
+            self._unir(predecesor, bloque)
+        return bloque
+
+    def _unir(self, origen: Bloque, destino: Bloque):
+        if origen is not None:
+            origen.sucesores.append(destino)
+            destino.predecesores.append(origen)
+
+    def _tramo(self, bloque: Bloque, tramo: tuple):
+        """Agrega al bloque los eventos de un nodo (una instrucción simple o una condición)."""
+        if tramo is not None:
+            bloque.tramos.append(tramo)
+
+    def cerrar(self, fin: Bloque) -> "GrafoFlujo":
+        self._unir(fin, self.salida)
+        self.salida.indice = len(self.bloques)
+        self.bloques.append(self.salida)
+        return self
+
+    def instrucciones(self, nodos: list, actual: Bloque) -> Bloque:
+        """Agrega una lista de instrucciones a partir de `actual`. Devuelve el bloque donde sigue el flujo (None si no sigue)."""
+        for nodo in nodos:
+            actual = self.instruccion(nodo, actual)
+        return actual
+
+    def instruccion(self, nodo, actual: Bloque) -> Bloque:
+        if nodo is None:
+            return actual
+        clase = nodo.clase
+        if clase in (Arbol.FUNCION, Arbol.PROTOTIPO):
+            return actual # una definición no se ejecuta donde aparece: tiene su propio grafo
+        if actual is None:
+            actual = self._nuevo() # código inalcanzable (después de un return)
+
+        if clase == Arbol.BLOQUE:
+            return self.instrucciones(nodo.instrucciones, actual)
+        if clase == Arbol.SI:
+            return self._si(nodo, actual)
+        if clase == Arbol.MIENTRAS:
+            return self._ciclo(actual, nodo.eventosCondicion, constante(nodo.condicion), nodo.cuerpo, None)
+        if clase == Arbol.PARA:
+            self._tramo(actual, nodo.eventosInicializacion)
+            condicion = 1 if nodo.condicion is None else constante(nodo.condicion) # un for sin condición no termina
+            return self._ciclo(actual, nodo.eventosCondicion, condicion, nodo.cuerpo, nodo.eventosPasos)
+
+        self._tramo(actual, nodo.eventos) # asignación, declaración, llamada o return
+        if clase == Arbol.RETORNO:
+            self._unir(actual, self.salida)
+            return None
+        return actual
+
+    def _si(self, nodo: Arbol.Si, actual: Bloque) -> Bloque:
+        self._tramo(actual, nodo.eventosCondicion)
+        valor = constante(nodo.condicion)
+
+        # con una condición constante, la rama que no se toma queda sin predecesores
+        entonces = self._nuevo(actual if valor is None or valor else None)
+        finEntonces = self.instruccion(nodo.entonces, entonces)
+        sino = self._nuevo(actual if valor is None or not valor else None)
+        finSino = self.instruccion(nodo.sino, sino)
+        return self._nuevo(finEntonces, finSino)
+
+    def _ciclo(self, actual: Bloque, condicion: tuple, valor, cuerpo, pasos: tuple) -> Bloque:
+        """while y for: la condición (su tramo y su valor, si es constante) se evalúa en su propio bloque, al que vuelven el cuerpo y los pasos."""
+        cabecera = self._nuevo(actual)
+        self._tramo(cabecera, condicion)
+        inicio = self._nuevo(cabecera if valor is None or valor else None)
+        fin = self.instruccion(cuerpo, inicio)
+        if pasos is not None:
+            if fin is None:
+                fin = self._nuevo()
+            self._tramo(fin, pasos)
+        self._unir(fin, cabecera)
+        return self._nuevo(cabecera if valor is None or not valor else None)
+
+    # ------------------------------
+    # Análisis
+    # ------------------------------
+    def _ordenInverso(self) -> list:
+        """Bloques en orden posterior inverso desde la entrada, seguidos de los inalcanzables."""
+        visitados = set()
+        orden = []
+        pila = [(self.entrada, iter(self.entrada.sucesores))]
+        visitados.add(self.entrada.indice)
+        while pila:
+            bloque, sucesores = pila[-1]
+            for sucesor in sucesores:
+                if sucesor.indice not in visitados:
+                    visitados.add(sucesor.indice)
+                    pila.append((sucesor, iter(sucesor.sucesores)))
+                    break
+            else:
+                pila.pop()
+                orden.append(bloque)
+        orden.reverse()
+        return orden + [b for b in self.bloques if b.indice not in visitados]
+
+    def _eventos(self, bloque: Bloque):
+        for inicio, fin in bloque.tramos:
+            for indice in range(inicio, fin):
+                yield indice, self.eventos[indice]
+
+    def analizar(self, bits: dict, efectosLlamadas: dict = None) -> dict:
+        """Resuelve los dos análisis para las variables de `bits` (símbolo -> número de bit).
+
+        `efectosLlamadas` da, por función, los bits que asigna por todos los caminos y los que lee: una
+        llamada cuenta como asignación de los primeros y lectura de los segundos (una función que no
+        figura no asigna ni lee nada). Lo que asigna solo por algunos caminos no cuenta: después de la
+        llamada, esas variables siguen sin inicializar. Devuelve las lecturas sin inicializar, como
+        (índice del evento, símbolo, token) en el orden del fuente, y el conjunto de variables vivas
+        en algún punto.
+        """
+        todos = (1 << len(bits)) - 1
+        efectosLlamadas = efectosLlamadas or {}
+        orden = self._ordenInverso()
+
+        # Resumen de cada bloque: asignación definida con (genera, mata) y vida con (lee, escribe)
+        genera, mata, lee, escribe = ([0] * len(self.bloques) for _ in range(4))
+        for bloque in self.bloques:
+            g = m = l = e = 0
+            for _, (clase, simbolo, _token) in self._eventos(bloque):
+                if clase == LLAMADA:
+                    escritas, leidas = efectosLlamadas.get(simbolo, (0, 0))
+                    g |= escritas
+                    l |= leidas & ~e
+                    continue
+                bit = bits.get(simbolo)
+                if bit is None:
+                    continue
+                b = 1 << bit
+                if clase == LECTURA:
+                    if not e & b:
+                        l |= b
+                elif clase == ASIGNACION:
+                    g |= b
+                    e |= b
+                else: # una declaración deja la variable sin valor (por ejemplo, en cada vuelta de un ciclo)
+                    g &= ~b
+                    m |= b
+                    e |= b
+            genera[bloque.indice], mata[bloque.indice], lee[bloque.indice], escribe[bloque.indice] = g, m, l, e
+
+        # Asignación definida: lo asignado al entrar es lo asignado por todos los predecesores
+        asignadas = [todos] * len(self.bloques) # al salir; arranca en "todo" (el neutro de la intersección)
+        entradaAsignadas = [todos] * len(self.bloques)
+        cambio = True
+        while cambio:
+            cambio = False
+            for bloque in orden:
+                if bloque is self.entrada:
+                    entrada = 0
+                else:
+                    entrada = todos
+                    for predecesor in bloque.predecesores:
+                        entrada &= asignadas[predecesor.indice]
+                salida = (entrada & ~mata[bloque.indice]) | genera[bloque.indice]
+                entradaAsignadas[bloque.indice] = entrada
+                if salida != asignadas[bloque.indice]:
+                    asignadas[bloque.indice] = salida
+                    cambio = True
+
+        # Vida: lo vivo al salir es lo vivo al entrar a algún sucesor
+        vivasEntrada = [0] * len(self.bloques)
+        vivasSalida = [0] * len(self.bloques)
+        cambio = True
+        while cambio:
+            cambio = False
+            for bloque in reversed(orden):
+                salida = 0
+                for sucesor in bloque.sucesores:
+                    salida |= vivasEntrada[sucesor.indice]
+                entrada = lee[bloque.indice] | (salida & ~escribe[bloque.indice])
+                vivasSalida[bloque.indice] = salida
+                if entrada != vivasEntrada[bloque.indice]:
+                    vivasEntrada[bloque.indice] = entrada
+                    cambio = True
+
+        # Con los valores de entrada de cada bloque, se recorren sus eventos una vez más
+        sinInicializar = []
+        algunaVezVivas = 0
+        for bloque in self.bloques:
+            actuales = entradaAsignadas[bloque.indice]
+            vivas = vivasSalida[bloque.indice]
+            eventos = list(self._eventos(bloque))
+            for indice, (clase, simbolo, token) in eventos:
+                if clase == LLAMADA:
+                    actuales |= efectosLlamadas.get(simbolo, (0, 0))[0]
+                    continue
+                bit = bits.get(simbolo)
+                if bit is None:
+                    continue
+                b = 1 << bit
+                if clase == LECTURA and not actuales & b:
+                    sinInicializar.append((indice, simbolo, token))
+                elif clase == ASIGNACION:
+                    actuales |= b
+                elif clase == DECLARACION:
+                    actuales &= ~b
+            for _, (clase, simbolo, _token) in reversed(eventos):
+                if clase == LLAMADA:
+                    vivas |= efectosLlamadas.get(simbolo, (0, 0))[1]
+                else:
+                    bit = bits.get(simbolo)
+                    if bit is None:
+                        continue
+                    if clase == LECTURA:
+                        vivas |= 1 << bit
+                    else:
+                        vivas &= ~(1 << bit)
+                algunaVezVivas |= vivas
+        sinInicializar.sort(key=lambda lectura: lectura[0])
+
+        self.entradaAsignadas = entradaAsignadas
+        self.vivasEntrada = vivasEntrada
+        self.vivasSalida = vivasSalida
+        return {"sinInicializar": sinInicializar, "vivas": algunaVezVivas}
@@ -0,0 +1,174 @@
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Patrón con el que se buscan programas fuente cuando la entrada es un directorio
+PATRON_POR_DEFECTO = "*.txt"
+
+_compilar = None # Función de compilación del worker, se importa una única vez por proceso
+_CompileSession = None
+_Perfilador = None
+_cache = None # CacheCompilacion del worker, si el lote usa caché
+
+
+def expandirEntradas(entradas, patron: str = PATRON_POR_DEFECTO) -> list:
+    """Convierte una lista de archivos, directorios y globs en la lista ordenada de archivos a compilar (sin repetidos)."""
+    archivos = []
+    vistos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            encontrados = sorted(glob.glob(os.path.join(entrada, "**", patron), recursive=True))
+        elif glob.has_magic(entrada):
+            encontrados = sorted(glob.glob(entrada, recursive=True))
+        else:
+            encontrados = [entrada]
+
+        for archivo in encontrados:
+            if archivo not in vistos and not os.path.isdir(archivo):
+                vistos.add(archivo)
+                archivos.append(archivo)
+    return archivos
+
+
+def _inicializarWorker():
+    """Prepara un proceso del pool. Importar compiladorLexer/compiladorParser deserializa el ATN, así que se hace una sola vez por worker."""
+    global _compilar, _CompileSession, _Perfilador
+    from Compilador import compilar
+    from CompileSession import CompileSession
+    from Perfilador import Perfilador
+    _compilar = compilar
+    _CompileSession = CompileSession
+    _Perfilador = Perfilador
+
+
+def rutaTSLote(archivo: str, directorioTS: str, formatoTS: str = "texto") -> str:
+    """Ruta del volcado de la TS de un archivo del lote. Se aplana la ruta de entrada para que no choquen archivos homónimos."""
+    from tablaDeSimbolos.Exportadores import EXPORTADORES
+    nombre = os.path.splitext(os.path.normpath(archivo))[0].replace(os.sep, "__").lstrip(".")
+    return os.path.join(directorioTS, f"{nombre}.ContenidoTS{EXPORTADORES[formatoTS].extension}")
+
+
+def _cacheWorker(opciones: dict):
+    """El caché del worker: todos los workers comparten el directorio, cada uno con su instancia."""
+    global _cache
+    if not opciones.get("directorioCache"):
+        return None
+    if _cache is None:
+        from Cache import CacheCompilacion
+        _cache = CacheCompilacion(opciones["directorioCache"], opciones.get("maxBytesCache", 64 * 1024 * 1024))
+    return _cache
+
+
+def _compilarEnWorker(archivo: str, opciones: dict) -> dict:
+    """Compila un archivo dentro del worker con una sesión propia y sin eco: los diagnósticos vuelven en el resultado."""
+    directorioTS = opciones.get("directorioTS")
+    formatoTS = opciones.get("formatoTS", "texto")
+    rutaTS = rutaTSLote(archivo, directorioTS, formatoTS) if directorioTS else None
+    perfilador = _Perfilador() if opciones.get("perfilar") else None
+    sesion = _CompileSession(archivo, rutaTS=rutaTS, eco=False, perfilador=perfilador, maxErrores=opciones.get("maxErrores"),
+                             cache=_cacheWorker(opciones), formatoTS=formatoTS)
+    try:
+        return _compilar(archivo, sesion, opciones.get("dosEtapas", True))
+    except Exception as e: # Un archivo ilegible o un árbol demasiado profundo no debe tirar abajo todo el lote
+        return {"archivo": archivo, "fallo": f"{type(e).__name__}: {e}", "huboErrores": True,
+                "diagnosticos": sesion.diagnosticos.textos(), "registros": [d.aDict() for d in sesion.diagnosticos.registros]}
+
+
+def compilarLote(archivos: list, procesos: int = None, **opciones) -> list:
+    """Reparte los archivos entre un pool de procesos con workers precalentados. Devuelve los resultados en el orden de entrada.
+
+    Opciones de cada compilación:
+    - directorioTS: cada archivo vuelca su TS ahí con un nombre propio (si no se indica, no se genera).
+    - formatoTS: formato de esos volcados (texto, json o binario; ver tablaDeSimbolos.Exportadores).
+    - dosEtapas: parseo SLL con reintento LL (por defecto True).
+    - perfilar: cada resultado trae el perfil por fases de su compilación.
+    - maxErrores: cada compilación se detiene al llegar a esa cantidad de errores.
+    - directorioCache: caché de compilaciones compartido por los workers (ver Cache); maxBytesCache es su tamaño máximo.
+    """
+    if not archivos:
+        return []
+    if opciones.get("directorioTS"):
+        os.makedirs(opciones["directorioTS"], exist_ok=True)
+    procesos = procesos or os.cpu_count() or 1
+    # Lotes chicos de archivos por tarea: menos viajes entre procesos sin desbalancear la carga
+    chunksize = max(1, len(archivos) // (procesos * 4))
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializarWorker) as pool:
+        return list(pool.map(partial(_compilarEnWorker, opciones=opciones), archivos, chunksize=chunksize))
+
+
+def resumirLote(resultados: list, segundos: float) -> dict:
+    """Calcula las métricas de throughput de un lote ya compilado."""
+    lineas = sum(r.get("lineas", 0) for r in resultados)
+    tokens = sum(r.get("tokens", 0) for r in resultados)
+    return {
+        "archivos": len(resultados),
+        "conErrores": sum(1 for r in resultados if r.get("huboErrores")),
+        "fallidos": sum(1 for r in resultados if "fallo" in r),
+        "fallbackLL": sum(1 for r in resultados if r.get("fallbackLL")),
+        "desdeCache": sum(1 for r in resultados if r.get("desdeCache")),
+        "lineas": lineas,
+        "tokens": tokens,
+        "segundos": segundos,
+        "segundosWorkers": sum(r.get("segundos", 0.0) for r in resultados),
+        "archivosPorSegundo": len(resultados) / segundos if segundos else 0.0,
+        "lineasPorSegundo": lineas / segundos if segundos else 0.0,
+        "tokensPorSegundo": tokens / segundos if segundos else 0.0,
+    }
+
+
+def imprimirLote(resultados: list, resumen: dict, dosEtapas: bool = True):
+    """Imprime los diagnósticos de cada archivo del lote y el resumen, en el formato de texto de siempre."""
+    for resultado in resultados:
+        print(f"===== {resultado['archivo']} =====")
+        for linea in resultado["diagnosticos"]:
+            print(linea)
+        if resultado.get("detenido"):
+            print("Compilación detenida al llegar al máximo de errores.")
+        if "fallo" in resultado:
+            print(f"FALLO: {resultado['fallo']}")
+
+    print(" ------ Resumen del lote ------ ")
+    print(f"Archivos: {resumen['archivos']} (con errores: {resumen['conErrores']}, fallidos: {resumen['fallidos']})")
+    print(f"Líneas: {resumen['lineas']} - Tokens: {resumen['tokens']}")
+    if dosEtapas:
+        print(f"Reparseos con LL completo: {resumen['fallbackLL']} de {resumen['archivos']}")
+    if resumen["desdeCache"]:
+        print(f"Repuestos desde el caché: {resumen['desdeCache']} de {resumen['archivos']}")
+    print(f"Tiempo total: {resumen['segundos']:.3f} s (suma en workers: {resumen['segundosWorkers']:.3f} s)")
+    print(f"Throughput: {resumen['archivosPorSegundo']:.1f} archivos/s, {resumen['lineasPorSegundo']:.0f} líneas/s, {resumen['tokensPorSegundo']:.0f} tokens/s")
+
+
+def ejecutarLote(entradas: list, procesos: int = None, patron: str = PATRON_POR_DEFECTO, rutaPerfil: str = None,
+                 formato: str = "texto", **opciones) -> dict:
+    """Compila todas las entradas, imprime los diagnósticos de cada archivo y un resumen final.
+
+    Con `formato="json"` se imprime un único documento con los diagnósticos de cada archivo y el resumen.
+    Con `rutaPerfil` se perfila cada compilación y se escribe el JSON con los perfiles por archivo y su agregado ('-' = consola).
+    """
+    archivos = expandirEntradas(entradas, patron)
+    if rutaPerfil:
+        opciones["perfilar"] = True
+    inicio = time.perf_counter()
+    resultados = compilarLote(archivos, procesos, **opciones)
+    resumen = resumirLote(resultados, time.perf_counter() - inicio)
+
+    if formato == "json":
+        print(json.dumps({
+            "archivos": [{"archivo": r["archivo"], "detenido": r.get("detenido", False), "fallo": r.get("fallo"),
+                          "diagnosticos": r.get("registros", [])} for r in resultados],
+            "resumen": resumen,
+        }, indent=2, ensure_ascii=False))
+    else:
+        imprimirLote(resultados, resumen, opciones.get("dosEtapas", True))
+
+    if rutaPerfil:
+        from Perfilador import agregarPerfiles, escribirJSON
+        escribirJSON({
+            "resumen": resumen,
+            "agregado": agregarPerfiles([r.get("perfil") for r in resultados]),
+            "archivos": [{"archivo": r["archivo"], "segundos": r.get("segundos"), **(r.get("perfil") or {})} for r in resultados],
+        }, rutaPerfil)
+    return resumen
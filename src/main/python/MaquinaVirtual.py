@@ -0,0 +1,296 @@
+import time
+from array import array
+from CodigoIntermedio import (ETIQUETA, SALTO, SALTO_SI, SALTO_SI_NO, APILAR, DESAPILAR, COPIA, CONVERSION, OPERACION,
+                              leerArchivo, esTemporal, esConstante, valorConstante, calcular, definida, leidas)
+
+# Códigos de operación de la máquina. Cada instrucción ocupa una posición en cuatro arreglos paralelos:
+# el código y hasta tres operandos, que son índices de la memoria o posiciones del programa.
+_COPIAR = 0       # memoria[a] = memoria[b]
+_SUMAR = 1        # memoria[a] = memoria[b] + memoria[c] (y así hasta _O con el resto de los operadores)
+_RESTAR = 2
+_MULTIPLICAR = 3
+_DIVIDIR = 4
+_RESTO = 5
+_IGUAL = 6
+_DISTINTO = 7
+_MENOR = 8
+_MAYOR = 9
+_MENOR_IGUAL = 10
+_MAYOR_IGUAL = 11
+_Y = 12
+_O = 13
+_CONVERTIR = 14   # memoria[a] = float(memoria[b])
+_SALTAR = 15      # pc = a
+_SALTAR_SI = 16   # if memoria[a]: pc = b
+_SALTAR_SI_NO = 17
+_APILAR = 18      # pila.append(memoria[a])
+_DESAPILAR = 19   # memoria[a] = pila.pop()
+_LLAMAR = 20      # guarda memoria[b:c] (las locales de la función) y salta a a
+_RETORNAR = 21    # salta a memoria[a] y restaura las locales de la función que termina
+
+_OPERACIONES = {"+": _SUMAR, "-": _RESTAR, "*": _MULTIPLICAR, "/": _DIVIDIR, "%": _RESTO, "==": _IGUAL, "!=": _DISTINTO,
+                "<": _MENOR, ">": _MAYOR, "<=": _MENOR_IGUAL, ">=": _MAYOR_IGUAL, "&&": _Y, "||": _O}
+
+
+class ErrorEjecucion(Exception):
+    """El programa no se puede cargar o falló al ejecutarse (división por cero, pila vacía, límite de pasos)."""
+
+
+class MaquinaVirtual:
+    """Intérprete del código de tres direcciones que genera Caminante.
+
+    Al cargar, resuelve cada etiqueta a una posición del programa y cada variable, temporal y
+    constante a un índice de la memoria, así que al ejecutar no se busca ningún nombre. Las
+    etiquetas no ocupan lugar en el programa: saltar a una es saltar a la instrucción siguiente.
+
+    Como Caminante da un nombre único a cada declaración, cada nombre es global (aparece en el
+    código que se ejecuta fuera de las funciones) o local de una sola función. Las locales de cada
+    función ocupan un tramo contiguo de la memoria: una llamada guarda ese tramo en la pila de
+    marcos y el retorno lo restaura, lo que alcanza para la recursión. Los argumentos y los
+    valores de retorno pasan por la pila de valores, como en el código generado.
+
+    Las variables arrancan en 0 y la aritmética entre enteros trunca como en C.
+    """
+
+    def __init__(self, instrucciones: list):
+        self.nombres = {} # variable o temporal -> índice en la memoria
+        self.globales = [] # nombres de las variables globales (sin temporales), en orden de aparición
+        self.marcos = {} # función -> lugares de su marco (las locales que se guardan en cada llamada)
+        self.estadisticas = {}
+        self._cargar(list(instrucciones))
+
+    @classmethod
+    def desdeArchivo(cls, ruta: str) -> "MaquinaVirtual":
+        return cls(leerArchivo(ruta))
+
+    # ------------------------------
+    # Carga
+    # ------------------------------
+    def _cargar(self, programa: list):
+        etiquetas = {} # etiqueta -> posición en `programa`
+        for i, instruccion in enumerate(programa):
+            if instruccion[0] == ETIQUETA:
+                etiquetas[instruccion[1]] = i
+        for instruccion in programa:
+            if instruccion[0] in (SALTO_SI, SALTO_SI_NO) and instruccion[2] not in etiquetas:
+                raise ErrorEjecucion(f"Salto a una etiqueta que no existe: '{instruccion[2]}'")
+
+        # Una llamada es `push Lret; jmp f`: f es una función y la instrucción siguiente es donde sigue el llamador
+        llamadas = {i: programa[i][1] for i in range(1, len(programa))
+                    if programa[i][0] == SALTO and programa[i][1] in etiquetas
+                    and programa[i - 1][0] == APILAR and programa[i - 1][1] in etiquetas}
+
+        # Memoria: constantes, globales y después las locales de cada función, cada una en su tramo
+        memoria = []
+        constantes = {}
+        posicion = self._posiciones(programa)
+        globales = self._nombresAlcanzables(programa, 0, etiquetas, llamadas)
+        locales = {}
+        duenos = {}
+        for funcion in dict.fromkeys(llamadas.values()):
+            for nombre in self._nombresAlcanzables(programa, etiquetas[funcion], etiquetas, llamadas):
+                if nombre not in globales:
+                    duenos.setdefault(nombre, []).append(funcion)
+        for nombre, funciones in duenos.items():
+            if len(funciones) == 1:
+                locales.setdefault(funciones[0], []).append(nombre)
+            else:
+                globales[nombre] = None # compartida entre funciones: no debería pasar con nombres únicos
+
+        def reservar(nombre):
+            self.nombres[nombre] = len(memoria)
+            memoria.append(0)
+
+        for nombre in globales:
+            reservar(nombre)
+            if not esTemporal(nombre):
+                self.globales.append(nombre)
+        tramos = {}
+        for funcion, nombres in locales.items():
+            inicio = len(memoria)
+            for nombre in nombres:
+                reservar(nombre)
+            tramos[funcion] = (inicio, len(memoria))
+            self.marcos[funcion] = len(memoria) - inicio
+
+        def operando(texto):
+            if texto in self.nombres:
+                return self.nombres[texto]
+            if texto in etiquetas: # una etiqueta usada como valor: la dirección de retorno de una llamada
+                valor = posicion[etiquetas[texto]]
+            elif esConstante(texto):
+                valor = valorConstante(texto)
+            else: # solo aparece en código inalcanzable
+                reservar(texto)
+                return self.nombres[texto]
+            if (texto, type(valor)) not in constantes:
+                constantes[(texto, type(valor))] = len(memoria)
+                memoria.append(valor)
+            return constantes[(texto, type(valor))]
+
+        codigos, a, b, c = array("B"), array("l"), array("l"), array("l")
+        for i, instruccion in enumerate(programa):
+            clase = instruccion[0]
+            if clase == ETIQUETA:
+                continue
+            if clase == OPERACION:
+                fila = (_OPERACIONES[instruccion[3]], operando(instruccion[1]), operando(instruccion[2]), operando(instruccion[4]))
+            elif clase == COPIA:
+                fila = (_COPIAR, operando(instruccion[1]), operando(instruccion[2]), 0)
+            elif clase == CONVERSION:
+                fila = (_CONVERTIR, operando(instruccion[1]), operando(instruccion[2]), 0)
+            elif clase in (SALTO_SI, SALTO_SI_NO):
+                fila = (_SALTAR_SI if clase == SALTO_SI else _SALTAR_SI_NO, operando(instruccion[1]), posicion[etiquetas[instruccion[2]]], 0)
+            elif clase == APILAR:
+                fila = (_APILAR, operando(instruccion[1]), 0, 0)
+            elif clase == DESAPILAR:
+                fila = (_DESAPILAR, operando(instruccion[1]), 0, 0)
+            elif i in llamadas:
+                inicio, fin = tramos.get(llamadas[i], (0, 0))
+                fila = (_LLAMAR, posicion[etiquetas[instruccion[1]]], inicio, fin)
+            elif instruccion[1] in etiquetas:
+                fila = (_SALTAR, posicion[etiquetas[instruccion[1]]], 0, 0)
+            else: # salto a la dirección guardada en una variable: el retorno de una función
+                fila = (_RETORNAR, operando(instruccion[1]), 0, 0)
+            for arreglo, valor in zip((codigos, a, b, c), fila):
+                arreglo.append(valor)
+
+        self._codigos, self._a, self._b, self._c = codigos, a, b, c
+        self._memoriaInicial = memoria
+        self._memoria = list(memoria)
+
+    @staticmethod
+    def _posiciones(programa: list) -> list:
+        """Para cada instrucción, su posición en el programa cargado (las etiquetas no ocupan lugar)."""
+        posiciones = []
+        actual = 0
+        for instruccion in programa:
+            posiciones.append(actual)
+            if instruccion[0] != ETIQUETA:
+                actual += 1
+        return posiciones
+
+    @staticmethod
+    def _nombresAlcanzables(programa: list, inicio: int, etiquetas: dict, llamadas: dict) -> dict:
+        """Variables y temporales del código alcanzable desde `inicio` sin entrar en las funciones que llama."""
+        nombres = {}
+        vistos = set()
+        pendientes = [inicio]
+        while pendientes:
+            i = pendientes.pop()
+            while i < len(programa) and i not in vistos:
+                vistos.add(i)
+                instruccion = programa[i]
+                destino = definida(instruccion)
+                for nombre in leidas(instruccion) + ((destino,) if destino is not None else ()):
+                    if nombre not in etiquetas and not esConstante(nombre):
+                        nombres[nombre] = None
+                clase = instruccion[0]
+                if clase == SALTO and i not in llamadas:
+                    if instruccion[1] in etiquetas:
+                        pendientes.append(etiquetas[instruccion[1]])
+                    break # un salto incondicional (o un retorno) no sigue de largo
+                if clase in (SALTO_SI, SALTO_SI_NO):
+                    pendientes.append(etiquetas[instruccion[2]])
+                i += 1
+        return nombres
+
+    # ------------------------------
+    # Ejecución
+    # ------------------------------
+    def ejecutar(self, limite: int = None) -> dict:
+        """Ejecuta el programa desde el principio. `limite` corta la ejecución después de esa cantidad de instrucciones."""
+        codigos, A, B, C = self._codigos, self._a, self._b, self._c
+        memoria = list(self._memoriaInicial)
+        pila = []
+        marcos = []
+        fin = len(codigos)
+        limite = limite if limite is not None else float("inf")
+        pc = ejecutadas = llamadas = profundidad = 0
+        inicio = time.perf_counter()
+        try:
+            while pc < fin:
+                codigo = codigos[pc]
+                ejecutadas += 1
+                if codigo == _COPIAR:
+                    memoria[A[pc]] = memoria[B[pc]]
+                elif codigo == _SUMAR:
+                    memoria[A[pc]] = memoria[B[pc]] + memoria[C[pc]]
+                elif codigo == _RESTAR:
+                    memoria[A[pc]] = memoria[B[pc]] - memoria[C[pc]]
+                elif codigo == _MULTIPLICAR:
+                    memoria[A[pc]] = memoria[B[pc]] * memoria[C[pc]]
+                elif codigo <= _RESTO:
+                    memoria[A[pc]] = calcular("/" if codigo == _DIVIDIR else "%", memoria[B[pc]], memoria[C[pc]])
+                elif codigo == _MENOR:
+                    memoria[A[pc]] = 1 if memoria[B[pc]] < memoria[C[pc]] else 0
+                elif codigo == _SALTAR_SI_NO:
+                    if not memoria[A[pc]]:
+                        pc = B[pc]
+                        continue
+                elif codigo == _SALTAR:
+                    if ejecutadas > limite: # todo ciclo pasa por un salto incondicional o una llamada
+                        raise ErrorEjecucion(f"Se superó el límite de {limite} instrucciones ejecutadas")
+                    pc = A[pc]
+                    continue
+                elif codigo == _SALTAR_SI:
+                    if memoria[A[pc]]:
+                        pc = B[pc]
+                        continue
+                elif codigo == _APILAR:
+                    pila.append(memoria[A[pc]])
+                elif codigo == _DESAPILAR:
+                    memoria[A[pc]] = pila.pop()
+                elif codigo == _LLAMAR:
+                    if ejecutadas > limite:
+                        raise ErrorEjecucion(f"Se superó el límite de {limite} instrucciones ejecutadas")
+                    marcos.append((B[pc], C[pc], memoria[B[pc]:C[pc]]))
+                    llamadas += 1
+                    profundidad = max(profundidad, len(marcos))
+                    pc = A[pc]
+                    continue
+                elif codigo == _RETORNAR:
+                    retorno = memoria[A[pc]]
+                    desde, hasta, guardadas = marcos.pop()
+                    memoria[desde:hasta] = guardadas
+                    pc = retorno
+                    continue
+                elif codigo == _CONVERTIR:
+                    memoria[A[pc]] = float(memoria[B[pc]])
+                elif codigo == _IGUAL:
+                    memoria[A[pc]] = 1 if memoria[B[pc]] == memoria[C[pc]] else 0
+                elif codigo == _DISTINTO:
+                    memoria[A[pc]] = 1 if memoria[B[pc]] != memoria[C[pc]] else 0
+                elif codigo == _MAYOR:
+                    memoria[A[pc]] = 1 if memoria[B[pc]] > memoria[C[pc]] else 0
+                elif codigo == _MENOR_IGUAL:
+                    memoria[A[pc]] = 1 if memoria[B[pc]] <= memoria[C[pc]] else 0
+                elif codigo == _MAYOR_IGUAL:
+                    memoria[A[pc]] = 1 if memoria[B[pc]] >= memoria[C[pc]] else 0
+                elif codigo == _Y:
+                    memoria[A[pc]] = 1 if memoria[B[pc]] and memoria[C[pc]] else 0
+                else:
+                    memoria[A[pc]] = 1 if memoria[B[pc]] or memoria[C[pc]] else 0
+                pc += 1
+        except ZeroDivisionError:
+            raise ErrorEjecucion(f"División por cero en la instrucción {pc}") from None
+        except IndexError:
+            if not marcos and codigos[pc] == _RETORNAR:
+                raise ErrorEjecucion(f"Retorno fuera de una función en la instrucción {pc}") from None
+            raise ErrorEjecucion(f"Se desapiló de la pila vacía en la instrucción {pc}") from None
+        segundos = time.perf_counter() - inicio
+
+        self._memoria = memoria
+        self.estadisticas = {
+            "instrucciones": fin,
+            "ejecutadas": ejecutadas,
+            "segundos": segundos,
+            "opsPorSegundo": ejecutadas / segundos if segundos > 0 else 0.0,
+            "llamadas": llamadas,
+            "profundidadMaxima": profundidad,
+        }
+        return self.estadisticas
+
+    def valores(self) -> dict:
+        """Valor final de cada variable global de la última ejecución."""
+        return {nombre: self._memoria[self.nombres[nombre]] for nombre in self.globales}
@@ -0,0 +1,148 @@
+"""Archivos objeto: un módulo compilado por separado, listo para el enlazador (ver Enlazador).
+
+Un objeto guarda el código de tres direcciones del módulo (sin la llamada a `main`, que agrega el
+enlazador) y las firmas de sus funciones: las que define (exportadas) y los prototipos (las que
+pueden venir de otro módulo). El formato es binario:
+
+    cabecera: "DHSO", formato (uint16), versión del compilador (32 bytes), huella del fuente (32 bytes)
+    resto, comprimido con zlib: largo de los metadatos (uint32), metadatos en JSON, instrucciones
+
+Cada instrucción es su clase seguida de sus operandos, todos como enteros de 32 bits: los operandos
+son índices en la tabla de cadenas de los metadatos. La cabecera alcanza para saber si el objeto
+sigue al día con su fuente sin descomprimir el resto.
+"""
+import hashlib
+import json
+import struct
+import sys
+import zlib
+from array import array
+from Cache import versionCompilador
+from CodigoIntermedio import ETIQUETA, SALTO, SALTO_SI, SALTO_SI_NO, APILAR, DESAPILAR, COPIA, CONVERSION, OPERACION, leer
+
+MAGIA = b"DHSO"
+FORMATO = 1
+EXTENSION = ".obj"
+
+_CABECERA = struct.Struct("<4sH32s32s")
+_LARGO = struct.Struct("<I")
+
+# Cantidad de operandos de cada clase de instrucción
+ARIDAD = {ETIQUETA: 1, SALTO: 1, APILAR: 1, DESAPILAR: 1, SALTO_SI: 2, SALTO_SI_NO: 2, COPIA: 2, CONVERSION: 2, OPERACION: 4}
+
+
+class ErrorObjeto(Exception):
+    """El archivo no es un objeto válido o es de otro formato."""
+
+
+def huella(fuente: str) -> bytes:
+    return hashlib.sha256(fuente.encode("utf-8")).digest()
+
+
+class Instrucciones(list):
+    """Salida para Caminante que junta las instrucciones generadas en una lista de tuplas."""
+
+    def write(self, texto: str):
+        instruccion = leer(texto)
+        if instruccion is not None:
+            self.append(instruccion)
+
+
+class Objeto:
+    """Un módulo compilado.
+
+    - etiquetas: nombre en el fuente -> etiqueta en el código, de cada función definida o prototipada.
+    - definidas: nombre -> [tipo de retorno, tipos de los parámetros].
+    - prototipos: nombre -> [tipo de retorno, tipos de los parámetros, línea].
+    - llamadas: funciones que el módulo llama (un prototipo sin definición solo es un error si se llama).
+    """
+
+    def __init__(self, modulo: str, codigo: list, etiquetas: dict, definidas: dict, prototipos: dict, llamadas: list,
+                 huellaFuente: bytes = b"", version: str = None):
+        self.modulo = modulo
+        self.codigo = codigo
+        self.etiquetas = etiquetas
+        self.definidas = definidas
+        self.prototipos = prototipos
+        self.llamadas = llamadas
+        self.huellaFuente = huellaFuente
+        self.version = version or versionCompilador()
+
+    @classmethod
+    def desdeCaminante(cls, modulo: str, caminante, codigo: list, fuente: str) -> "Objeto":
+        return cls(modulo, codigo, caminante.etiquetas(),
+                   {nombre: [tipo, list(params)] for nombre, (tipo, params) in caminante.definidas.items()},
+                   {nombre: [tipo, list(params), linea] for nombre, (tipo, params, linea) in caminante.prototipos.items()},
+                   sorted(n for n in caminante.llamadas if n is not None), huella(fuente))
+
+    def importadas(self) -> list:
+        """Prototipos sin definición en el módulo: las funciones que tiene que resolver el enlazador."""
+        return [nombre for nombre in self.prototipos if nombre not in self.definidas]
+
+    # ------------------------------
+    # Formato binario
+    # ------------------------------
+    def guardar(self, ruta: str):
+        cadenas = {}
+        palabras = array("I")
+        for instruccion in self.codigo:
+            palabras.append(instruccion[0])
+            for operando in instruccion[1:]:
+                palabras.append(cadenas.setdefault(operando, len(cadenas)))
+        if sys.byteorder == "big":
+            palabras.byteswap()
+        metadatos = json.dumps({"modulo": self.modulo, "etiquetas": self.etiquetas, "definidas": self.definidas,
+                                "prototipos": self.prototipos, "llamadas": self.llamadas, "cadenas": list(cadenas)},
+                               ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with open(ruta, "wb") as f:
+            f.write(_CABECERA.pack(MAGIA, FORMATO, bytes.fromhex(self.version), self.huellaFuente.ljust(32, b"\0")))
+            f.write(zlib.compress(_LARGO.pack(len(metadatos)) + metadatos + palabras.tobytes()))
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "Objeto":
+        with open(ruta, "rb") as f:
+            cabecera = f.read(_CABECERA.size)
+            version, huellaFuente = cls._cabecera(cabecera, ruta)
+            try:
+                datos = zlib.decompress(f.read())
+            except zlib.error:
+                raise ErrorObjeto(f"'{ruta}' está dañado") from None
+        largo = _LARGO.unpack_from(datos)[0]
+        inicio = _LARGO.size + largo
+        metadatos = json.loads(datos[_LARGO.size:inicio].decode("utf-8"))
+        palabras = array("I")
+        palabras.frombytes(datos[inicio:])
+        if sys.byteorder == "big":
+            palabras.byteswap()
+
+        cadenas = metadatos["cadenas"]
+        codigo = []
+        i = 0
+        while i < len(palabras):
+            clase = palabras[i]
+            aridad = ARIDAD[clase]
+            codigo.append((clase, *(cadenas[p] for p in palabras[i + 1:i + 1 + aridad])))
+            i += 1 + aridad
+        return cls(metadatos["modulo"], codigo, metadatos["etiquetas"], metadatos["definidas"], metadatos["prototipos"],
+                   metadatos["llamadas"], huellaFuente, version)
+
+    @staticmethod
+    def _cabecera(cabecera: bytes, ruta: str) -> tuple:
+        if len(cabecera) < _CABECERA.size:
+            raise ErrorObjeto(f"'{ruta}' no es un archivo objeto")
+        magia, formato, version, huellaFuente = _CABECERA.unpack(cabecera)
+        if magia != MAGIA:
+            raise ErrorObjeto(f"'{ruta}' no es un archivo objeto")
+        if formato != FORMATO:
+            raise ErrorObjeto(f"'{ruta}' tiene el formato {formato} y se esperaba el {FORMATO}")
+        return version.hex(), huellaFuente
+
+    @staticmethod
+    def vigente(ruta: str, fuente: str) -> bool:
+        """True si el objeto existe y salió de este fuente con esta versión del compilador (solo lee la cabecera)."""
+        try:
+            with open(ruta, "rb") as f:
+                version, huellaFuente = Objeto._cabecera(f.read(_CABECERA.size), ruta)
+        except (OSError, ErrorObjeto):
+            return False
+        return version == versionCompilador() and huellaFuente == huella(fuente)
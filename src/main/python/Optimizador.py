@@ -0,0 +1,197 @@
+from collections import Counter
+from CodigoIntermedio import (ETIQUETA, SALTO, SALTO_SI, SALTO_SI_NO, DESAPILAR, COPIA, CONVERSION, OPERACION,
+                              CONMUTATIVOS, leer, escribir, leerArchivo, esTemporal, esConstante, valorConstante,
+                              formatearConstante, calcular, definida, leidas, reemplazarLecturas)
+
+# Pases disponibles, en el orden en que se aplican a cada bloque básico
+PASES = ("plegado", "subexpresiones", "copias", "temporalesMuertos")
+
+
+def bloquesBasicos(instrucciones):
+    """Parte la secuencia de instrucciones en bloques básicos: cada etiqueta abre uno y cada salto lo cierra."""
+    bloque = []
+    for instruccion in instrucciones:
+        if instruccion[0] == ETIQUETA and bloque:
+            yield bloque
+            bloque = []
+        bloque.append(instruccion)
+        if instruccion[0] in (SALTO, SALTO_SI, SALTO_SI_NO):
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+class Optimizador:
+    """Optimizaciones locales (dentro de cada bloque básico) sobre el código de tres direcciones.
+
+    Trabaja bloque por bloque, así que sobre un archivo nunca tiene el programa entero en memoria.
+    Antes hace una pasada que solo cuenta cuántas veces se lee cada temporal: un temporal que se lee
+    en otro bloque (por ejemplo, el resultado de una llamada usado después de otra llamada) no se borra.
+    """
+
+    def __init__(self, pases=PASES):
+        desconocidos = set(pases) - set(PASES)
+        if desconocidos:
+            raise ValueError(f"Pases de optimización desconocidos: {', '.join(sorted(desconocidos))}")
+        self.pases = [p for p in PASES if p in pases]
+        self.estadisticas = {"antes": 0, "despues": 0, "bloques": 0, **{p: 0 for p in self.pases}}
+
+    # ------------------------------
+    # Entradas
+    # ------------------------------
+    def optimizarArchivo(self, entrada: str, salida: str) -> dict:
+        """Optimiza el archivo `entrada` y escribe el resultado en `salida` (lee la entrada dos veces)."""
+        with open(salida, "w") as f:
+            for instruccion in self.optimizar(lambda: leerArchivo(entrada)):
+                f.write(escribir(instruccion) + "\n")
+        return self.estadisticas
+
+    def optimizarLineas(self, lineas: list) -> list:
+        instrucciones = [i for i in map(leer, lineas) if i is not None]
+        return [escribir(i) for i in self.optimizar(lambda: instrucciones)]
+
+    def optimizar(self, fuente):
+        """Generador de las instrucciones optimizadas. `fuente()` debe devolver cada vez un iterable nuevo de la entrada."""
+        lecturas = Counter()
+        for instruccion in fuente():
+            for operando in leidas(instruccion):
+                if esTemporal(operando):
+                    lecturas[operando] += 1
+
+        for bloque in bloquesBasicos(fuente()):
+            self.estadisticas["antes"] += len(bloque)
+            self.estadisticas["bloques"] += 1
+            propias = Counter(o for i in bloque for o in leidas(i) if esTemporal(o))
+            afuera = lambda t: lecturas[t] > propias[t] # se lee en algún otro bloque
+
+            for pase in self.pases:
+                largo = len(bloque)
+                bloque = getattr(self, pase)(bloque, afuera)
+                self.estadisticas[pase] += largo - len(bloque)
+            self.estadisticas["despues"] += len(bloque)
+            yield from bloque
+
+    # ------------------------------
+    # Pases (cada uno recibe y devuelve la lista de instrucciones de un bloque)
+    # ------------------------------
+    def plegado(self, bloque: list, afuera) -> list:
+        """Propaga las constantes dentro del bloque y calcula las operaciones y saltos condicionales que quedan constantes."""
+        constantes = {}
+        resultado = []
+        for instruccion in bloque:
+            instruccion = reemplazarLecturas(instruccion, lambda x: constantes.get(x, x))
+            clase = instruccion[0]
+            if clase == OPERACION and esConstante(instruccion[2]) and esConstante(instruccion[4]):
+                try:
+                    valor = formatearConstante(calcular(instruccion[3], valorConstante(instruccion[2]), valorConstante(instruccion[4])))
+                except ZeroDivisionError:
+                    valor = None # se deja para que falle al ejecutarse, como en el programa original
+                if valor is not None:
+                    instruccion = (COPIA, instruccion[1], valor)
+            elif clase == CONVERSION and esConstante(instruccion[2]):
+                valor = formatearConstante(float(valorConstante(instruccion[2])))
+                if valor is not None:
+                    instruccion = (COPIA, instruccion[1], valor)
+            elif clase in (SALTO_SI, SALTO_SI_NO) and esConstante(instruccion[1]):
+                if bool(valorConstante(instruccion[1])) != (clase == SALTO_SI):
+                    continue # el salto nunca se toma
+                instruccion = (SALTO, instruccion[2])
+
+            destino = definida(instruccion)
+            if destino is not None:
+                constantes.pop(destino, None)
+                if instruccion[0] == COPIA and esConstante(instruccion[2]):
+                    constantes[destino] = instruccion[2]
+            resultado.append(instruccion)
+        return resultado
+
+    def subexpresiones(self, bloque: list, afuera) -> list:
+        """Reemplaza una operación ya calculada en el bloque (con los mismos operandos sin modificar) por una copia."""
+        disponibles = {} # (op, a, b) -> variable que tiene el resultado
+        porOperando = {} # variable -> claves de `disponibles` que dejan de valer si se modifica
+        resultado = []
+        for instruccion in bloque:
+            clave = None
+            if instruccion[0] == OPERACION:
+                _, destino, a, op, b = instruccion
+                clave = (op, min(a, b), max(a, b)) if op in CONMUTATIVOS else (op, a, b)
+                if clave in disponibles:
+                    instruccion = (COPIA, destino, disponibles[clave])
+                    clave = None
+
+            destino = definida(instruccion)
+            if destino is not None:
+                for invalida in porOperando.pop(destino, ()):
+                    disponibles.pop(invalida, None)
+            if clave is not None and destino not in clave:
+                disponibles[clave] = destino
+                for variable in (clave[1], clave[2], destino):
+                    porOperando.setdefault(variable, set()).add(clave)
+            resultado.append(instruccion)
+        return resultado
+
+    def copias(self, bloque: list, afuera) -> list:
+        """Propagación de copias en los dos sentidos.
+
+        Hacia adelante, después de `x = y` se lee y en lugar de x. Hacia atrás, `t = a op b; x = t`
+        queda `x = a op b` cuando t no se usa en ningún otro lado (la copia final de cada expresión).
+        """
+        copias = {} # x -> y, para cada `x = y` vigente
+        dependientes = {} # y -> {x}: copias que dejan de valer si se modifica y
+        propagado = []
+        for instruccion in bloque:
+            instruccion = reemplazarLecturas(instruccion, lambda x: copias.get(x, x))
+            destino = definida(instruccion)
+            if destino is not None:
+                origen = copias.pop(destino, None)
+                if origen is not None:
+                    dependientes[origen].discard(destino)
+                for copia in dependientes.pop(destino, ()):
+                    copias.pop(copia, None)
+                if instruccion[0] == COPIA and not esConstante(instruccion[2]) and instruccion[2] != destino:
+                    copias[destino] = instruccion[2]
+                    dependientes.setdefault(instruccion[2], set()).add(destino)
+            propagado.append(instruccion)
+
+        lecturas = Counter(o for i in propagado for o in leidas(i) if esTemporal(o))
+        resultado = []
+        definicion = {} # temporal -> posición en `resultado` de la instrucción que lo escribe
+        ultimoUso = {} # variable -> última posición en `resultado` donde se lee o se escribe
+        for instruccion in propagado:
+            if instruccion[0] == COPIA and esTemporal(instruccion[2]):
+                destino, temporal = instruccion[1], instruccion[2]
+                posicion = definicion.get(temporal)
+                if (posicion is not None and lecturas[temporal] == 1 and not afuera(temporal)
+                        and ultimoUso.get(destino, -1) <= posicion):
+                    anterior = resultado[posicion]
+                    resultado[posicion] = (anterior[0], destino) + anterior[2:]
+                    ultimoUso[destino] = posicion
+                    continue
+
+            posicion = len(resultado)
+            for operando in leidas(instruccion):
+                ultimoUso[operando] = posicion
+            destino = definida(instruccion)
+            if destino is not None:
+                ultimoUso[destino] = posicion
+                if esTemporal(destino):
+                    definicion[destino] = posicion
+            resultado.append(instruccion)
+        return resultado
+
+    def temporalesMuertos(self, bloque: list, afuera) -> list:
+        """Borra las asignaciones a temporales que nadie lee después (ni en este bloque ni en otro)."""
+        vivos = set()
+        resultado = []
+        for instruccion in reversed(bloque):
+            destino = definida(instruccion)
+            if (destino is not None and instruccion[0] != DESAPILAR and esTemporal(destino)
+                    and destino not in vivos and not afuera(destino)):
+                continue
+            if destino is not None:
+                vivos.discard(destino)
+            vivos.update(o for o in leidas(instruccion) if esTemporal(o))
+            resultado.append(instruccion)
+        resultado.reverse()
+        return resultado
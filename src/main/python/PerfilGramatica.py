@@ -0,0 +1,273 @@
+"""Perfil de las decisiones de la gramática: cuánto cuesta predecir cada una al parsear un corpus.
+
+El runtime de Python no trae el ProfilingATNSimulator de ANTLR: SimuladorPerfilado es el mismo
+simulador con las mismas mediciones. Por cada decisión (y sumado por regla) cuenta:
+
+- invocaciones y tiempo dentro de adaptivePredict;
+- lookahead SLL y LL: cuántos tokens miró la predicción antes de decidir (promedio y máximo);
+- transiciones resueltas con el DFA y las que tuvieron que simularse en el ATN (fallos del DFA);
+- conflictosSLL: con predicción SLL, las veces que terminó en un estado que pedía contexto completo
+  (ahí la primera etapa elige la alternativa mínima; si se equivoca, la compilación se reparsea con LL);
+- fallbacksLL: con predicción LL, las veces que hubo que simular con contexto completo;
+- sensiblesAlContexto: fallbacks en los que LL eligió otra alternativa que SLL;
+- ambigüedades (LL no pudo resolver: gana la alternativa mínima) y errores de predicción.
+
+Se parsea sin el análisis semántico, con la misma estrategia del compilador (SLL y, si falla,
+LL completo) o solo con una de las dos. Los DFA son los de la clase del parser, como en una
+compilación: el primer archivo del corpus es el que más simula en el ATN.
+
+Uso (desde src/main/python):
+    python PerfilGramatica.py [ENTRADAS ...] [--patron "*.txt"] [--modo dosEtapas|ll|sll] [--top 20] [--json RUTA]
+"""
+import sys
+import argparse
+import time
+from antlr4 import CommonTokenStream, FileStream
+from antlr4.atn.ATN import ATN
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from compiladorLexer import compiladorLexer
+from compiladorParser import compiladorParser
+from Lotes import PATRON_POR_DEFECTO, expandirEntradas
+
+MODOS = ("dosEtapas", "ll", "sll")
+
+
+class InfoDecision:
+    """Contadores de una decisión (el DecisionInfo de ANTLR)."""
+
+    CAMPOS = ("invocaciones", "nanosegundos", "lookaheadSLL", "maxLookaheadSLL", "fallbacksLL", "lookaheadLL",
+              "maxLookaheadLL", "transicionesDFA", "transicionesATN", "conflictosSLL", "sensiblesAlContexto",
+              "ambiguedades", "errores", "predicados")
+
+    def __init__(self, decision: int, regla: str, alternativas: int):
+        self.decision = decision
+        self.regla = regla
+        self.alternativas = alternativas
+        for campo in self.CAMPOS:
+            setattr(self, campo, 0)
+
+    def aDict(self) -> dict:
+        datos = {"decision": self.decision, "regla": self.regla, "alternativas": self.alternativas}
+        datos.update((campo, getattr(self, campo)) for campo in self.CAMPOS)
+        return datos
+
+
+class SimuladorPerfilado(ParserATNSimulator):
+    """ParserATNSimulator que registra en `decisiones` lo que hace cada predicción (ver el docstring del módulo)."""
+
+    def __init__(self, parser, decisiones: list):
+        super().__init__(parser, parser.atn, parser.decisionsToDFA, parser.sharedContextCache)
+        self.decisiones = decisiones
+        self._actual = None # InfoDecision de la predicción en curso
+        self._estado = None # último estado del DFA al que llegó
+        self._finSLL = -1 # índice del último token que miró la predicción SLL
+        self._finLL = -1 # ídem con contexto completo (-1 si no hizo falta)
+        self._alternativaSLL = ATN.INVALID_ALT_NUMBER # lo que hubiera elegido SLL en un fallback a LL
+
+    def adaptivePredict(self, input, decision: int, outerContext):
+        info = self._actual = self.decisiones[decision]
+        self._estado = None
+        self._finSLL = self._finLL = -1
+        inicio = time.perf_counter_ns()
+        try:
+            return super().adaptivePredict(input, decision, outerContext)
+        finally:
+            info.nanosegundos += time.perf_counter_ns() - inicio
+            info.invocaciones += 1
+            if self._finSLL >= 0:
+                k = self._finSLL - self._startIndex + 1
+                info.lookaheadSLL += k
+                info.maxLookaheadSLL = max(info.maxLookaheadSLL, k)
+            if self._finLL >= 0:
+                k = self._finLL - self._startIndex + 1
+                info.fallbacksLL += 1
+                info.lookaheadLL += k
+                info.maxLookaheadLL = max(info.maxLookaheadLL, k)
+            elif (self.predictionMode == PredictionMode.SLL and self._estado is not None
+                  and self._estado is not self.ERROR and self._estado.requiresFullContext):
+                info.conflictosSLL += 1
+
+    def getExistingTargetState(self, previousD, t: int):
+        self._finSLL = self._input.index
+        estado = super().getExistingTargetState(previousD, t)
+        if estado is not None:
+            self._actual.transicionesDFA += 1
+            if estado is self.ERROR:
+                self._actual.errores += 1
+        self._estado = estado
+        return estado
+
+    def computeTargetState(self, dfa, previousD, t: int):
+        self._estado = super().computeTargetState(dfa, previousD, t)
+        return self._estado
+
+    def computeReachSet(self, closure, t: int, fullCtx: bool):
+        if fullCtx:
+            self._finLL = self._input.index
+        alcanzados = super().computeReachSet(closure, t, fullCtx)
+        self._actual.transicionesATN += 1
+        if alcanzados is None:
+            self._actual.errores += 1
+        return alcanzados
+
+    def evalSemanticContext(self, predPredictions: list, outerContext, complete: bool):
+        self._actual.predicados += 1
+        return super().evalSemanticContext(predPredictions, outerContext, complete)
+
+    def reportAttemptingFullContext(self, dfa, conflictingAlts: set, configs, startIndex: int, stopIndex: int):
+        self._alternativaSLL = min(conflictingAlts) if conflictingAlts else min(c.alt for c in configs)
+        super().reportAttemptingFullContext(dfa, conflictingAlts, configs, startIndex, stopIndex)
+
+    def reportContextSensitivity(self, dfa, prediction: int, configs, startIndex: int, stopIndex: int):
+        if prediction != self._alternativaSLL:
+            self._actual.sensiblesAlContexto += 1
+        super().reportContextSensitivity(dfa, prediction, configs, startIndex, stopIndex)
+
+    def reportAmbiguity(self, dfa, D, startIndex: int, stopIndex: int, exact: bool, ambigAlts: set, configs):
+        prediccion = min(ambigAlts) if ambigAlts else min(c.alt for c in configs)
+        if configs.fullCtx and prediccion != self._alternativaSLL:
+            self._actual.sensiblesAlContexto += 1
+        self._actual.ambiguedades += 1
+        super().reportAmbiguity(dfa, D, startIndex, stopIndex, exact, ambigAlts, configs)
+
+
+class PerfilGramatica:
+    """Acumula el perfil de las decisiones a lo largo de los archivos de un corpus."""
+
+    def __init__(self, modo: str = "dosEtapas"):
+        if modo not in MODOS:
+            raise ValueError(f"modo desconocido: {modo} (se espera uno de {', '.join(MODOS)})")
+        self.modo = modo
+        atn, reglas = compiladorParser.atn, compiladorParser.ruleNames
+        self.decisiones = [InfoDecision(i, reglas[estado.ruleIndex], len(estado.transitions))
+                           for i, estado in enumerate(atn.decisionToState)]
+        self.archivos = 0
+        self.tokens = 0
+        self.reparseosLL = 0 # archivos en los que falló la etapa SLL (modo dosEtapas)
+        self.conErrores = 0 # archivos con errores sintácticos (en la última etapa)
+        self.segundosParseo = 0.0
+
+    def perfilar(self, archivo: str):
+        """Tokeniza el archivo (fuera de la medición) y lo parsea con el simulador perfilado."""
+        stream = CommonTokenStream(compiladorLexer(FileStream(archivo, encoding="utf-8")))
+        stream.fill()
+        parser = compiladorParser(stream)
+        parser.removeErrorListeners()
+        parser._interp = SimuladorPerfilado(parser, self.decisiones)
+
+        inicio = time.perf_counter()
+        if self.modo != "ll":
+            parser._interp.predictionMode = PredictionMode.SLL
+            parser._errHandler = BailErrorStrategy() if self.modo == "dosEtapas" else DefaultErrorStrategy()
+            try:
+                parser.programa()
+                pendiente = False
+            except ParseCancellationException:
+                parser.reset()
+                self.reparseosLL += 1
+                pendiente = True
+        if self.modo == "ll" or pendiente:
+            parser._interp.predictionMode = PredictionMode.LL
+            parser._errHandler = DefaultErrorStrategy()
+            parser.programa()
+        self.segundosParseo += time.perf_counter() - inicio
+
+        self.archivos += 1
+        self.tokens += len(stream.tokens)
+        if parser.getNumberOfSyntaxErrors():
+            self.conErrores += 1
+
+    def porRegla(self) -> list:
+        """Los contadores de las decisiones sumados por regla, en el orden de las reglas de la gramática."""
+        reglas = {}
+        for info in self.decisiones:
+            total = reglas.get(info.regla)
+            if total is None:
+                total = reglas[info.regla] = {"regla": info.regla, "decisiones": 0, **{campo: 0 for campo in InfoDecision.CAMPOS}}
+            total["decisiones"] += 1
+            for campo in InfoDecision.CAMPOS:
+                if campo.startswith("max"):
+                    total[campo] = max(total[campo], getattr(info, campo))
+                else:
+                    total[campo] += getattr(info, campo)
+        return list(reglas.values())
+
+    def aDict(self) -> dict:
+        return {
+            "modo": self.modo,
+            "archivos": self.archivos,
+            "tokens": self.tokens,
+            "reparseosLL": self.reparseosLL,
+            "conErrores": self.conErrores,
+            "segundosParseo": self.segundosParseo,
+            "decisiones": [info.aDict() for info in self.decisiones if info.invocaciones],
+            "reglas": [regla for regla in self.porRegla() if regla["invocaciones"]],
+        }
+
+
+def _promedio(total: int, cantidad: int) -> float:
+    return total / cantidad if cantidad else 0.0
+
+
+def imprimirPerfil(datos: dict, top: int = None):
+    """Tablas por decisión (las más caras primero) y por regla, a partir de PerfilGramatica.aDict()."""
+    nanosegundos = sum(d["nanosegundos"] for d in datos["decisiones"]) or 1
+    print(f"Modo {datos['modo']}: {datos['archivos']} archivo(s), {datos['tokens']} tokens, "
+          f"{datos['reparseosLL']} reparseo(s) LL, {datos['conErrores']} con errores sintácticos")
+    print(f"Parseo: {datos['segundosParseo'] * 1000:.1f} ms, de los que {nanosegundos / 1e6:.1f} ms son predicción")
+    print()
+
+    decisiones = sorted(datos["decisiones"], key=lambda d: d["nanosegundos"], reverse=True)[:top]
+    print(f"{'Dec':>4} {'Regla':<16} {'Alt':>3} {'Invoc.':>8} {'ms':>8} {'%':>5} {'k SLL':>6} {'máx':>4} "
+          f"{'LL':>6} {'k LL':>6} {'máx':>4} {'DFA':>8} {'ATN':>6} {'Confl.':>6} {'Sens.':>5} {'Ambig.':>6} {'Err.':>4}")
+    for d in decisiones:
+        print(f"{d['decision']:>4} {d['regla']:<16} {d['alternativas']:>3} {d['invocaciones']:>8} {d['nanosegundos'] / 1e6:>8.1f} "
+              f"{100 * d['nanosegundos'] / nanosegundos:>5.1f} {_promedio(d['lookaheadSLL'], d['invocaciones']):>6.2f} {d['maxLookaheadSLL']:>4} "
+              f"{d['fallbacksLL']:>6} {_promedio(d['lookaheadLL'], d['fallbacksLL']):>6.2f} {d['maxLookaheadLL']:>4} "
+              f"{d['transicionesDFA']:>8} {d['transicionesATN']:>6} {d['conflictosSLL']:>6} {d['sensiblesAlContexto']:>5} "
+              f"{d['ambiguedades']:>6} {d['errores']:>4}")
+    print()
+
+    print(f"{'Regla':<16} {'Dec':>3} {'Invoc.':>8} {'ms':>8} {'%':>5} {'k SLL':>6} {'máx':>4} {'LL':>6} {'k LL':>6} {'máx':>4} "
+          f"{'Confl.':>6} {'Sens.':>5} {'Ambig.':>6}")
+    for r in sorted(datos["reglas"], key=lambda r: r["nanosegundos"], reverse=True):
+        print(f"{r['regla']:<16} {r['decisiones']:>3} {r['invocaciones']:>8} {r['nanosegundos'] / 1e6:>8.1f} "
+              f"{100 * r['nanosegundos'] / nanosegundos:>5.1f} {_promedio(r['lookaheadSLL'], r['invocaciones']):>6.2f} {r['maxLookaheadSLL']:>4} "
+              f"{r['fallbacksLL']:>6} {_promedio(r['lookaheadLL'], r['fallbacksLL']):>6.2f} {r['maxLookaheadLL']:>4} "
+              f"{r['conflictosSLL']:>6} {r['sensiblesAlContexto']:>5} {r['ambiguedades']:>6}")
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Perfil de las decisiones de la gramática sobre un corpus")
+    argumentos.add_argument("entradas", nargs="*", default=["input"], help="archivos, directorios y globs del corpus (por defecto, input)")
+    argumentos.add_argument("--patron", default=PATRON_POR_DEFECTO, help="patrón de archivos a buscar dentro de los directorios")
+    argumentos.add_argument("--modo", choices=MODOS, default="dosEtapas",
+                            help="dosEtapas: SLL y, si falla, LL completo (como el compilador); ll o sll: solo esa predicción")
+    argumentos.add_argument("--top", type=int, default=None, metavar="N", help="muestra solo las N decisiones más caras")
+    argumentos.add_argument("--json", default=None, metavar="RUTA", help="escribe el perfil completo como JSON en RUTA ('-' = consola)")
+    args = argumentos.parse_args(argv[1:])
+
+    archivos = expandirEntradas(args.entradas, args.patron)
+    if not archivos:
+        print("No hay archivos para perfilar.")
+        return 1
+    perfil = PerfilGramatica(args.modo)
+    for archivo in archivos:
+        try:
+            perfil.perfilar(archivo)
+        except OSError as error:
+            print(f"No se pudo leer {archivo}: {error}", file=sys.stderr)
+
+    if args.json:
+        from Perfilador import escribirJSON
+        escribirJSON(perfil.aDict(), args.json)
+    if args.json != "-":
+        imprimirPerfil(perfil.aDict(), args.top)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,176 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class Perfilador:
+    """Instrumentación por fases de una compilación.
+
+    Cada fase registra tiempo de pared, tiempo de CPU y (si se mide memoria) el pico de memoria
+    reservada por Python durante la fase, relativo a lo que ya estaba reservado al empezarla.
+    Las fases pueden anidarse; el tiempo de una fase incluye el de las fases que contiene.
+    """
+
+    def __init__(self, memoria: bool = True):
+        self.memoria = memoria
+        self.fases = {} # nombre -> {"segundos", "cpu", "picoMemoriaBytes", "veces"}
+        self.contadores = {} # métricas que no son tiempos: tokens, nodos, símbolos, ...
+        self._abiertas = [] # pila de fases en curso, para combinar los picos de memoria anidados
+        self._inicioTracemalloc = False
+
+    # ------------------------------
+    # Ciclo de vida
+    # ------------------------------
+    def iniciar(self):
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._inicioTracemalloc = True
+
+    def detener(self):
+        if self._inicioTracemalloc:
+            tracemalloc.stop()
+            self._inicioTracemalloc = False
+
+    # ------------------------------
+    # Registro
+    # ------------------------------
+    @contextmanager
+    def fase(self, nombre: str):
+        """Mide el bloque `with` como la fase `nombre` (si la fase se repite, se acumula)."""
+        abierta = {"base": 0, "pico": 0}
+        if self.memoria and tracemalloc.is_tracing():
+            actual, pico = tracemalloc.get_traced_memory()
+            if self._abiertas: # el reset de abajo borraría el pico que lleva la fase que nos contiene
+                self._abiertas[-1]["pico"] = max(self._abiertas[-1]["pico"], pico)
+            tracemalloc.reset_peak()
+            abierta["base"] = actual
+        self._abiertas.append(abierta)
+
+        inicioPared = time.perf_counter()
+        inicioCPU = time.process_time()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicioPared
+            cpu = time.process_time() - inicioCPU
+            self._abiertas.pop()
+
+            picoBytes = None
+            if self.memoria and tracemalloc.is_tracing():
+                pico = max(abierta["pico"], tracemalloc.get_traced_memory()[1])
+                picoBytes = max(0, pico - abierta["base"])
+                if self._abiertas:
+                    self._abiertas[-1]["pico"] = max(self._abiertas[-1]["pico"], pico)
+            self.sumar(nombre, segundos, cpu, picoBytes)
+
+    def sumar(self, nombre: str, segundos: float, cpu: float, picoMemoriaBytes: int = None):
+        """Acumula tiempo en una fase que no es un bloque contiguo (por ejemplo, los callbacks de un listener)."""
+        fase = self.fases.setdefault(nombre, {"segundos": 0.0, "cpu": 0.0, "picoMemoriaBytes": None, "veces": 0})
+        fase["segundos"] += segundos
+        fase["cpu"] += cpu
+        fase["veces"] += 1
+        if picoMemoriaBytes is not None:
+            fase["picoMemoriaBytes"] = max(fase["picoMemoriaBytes"] or 0, picoMemoriaBytes)
+
+    def contar(self, nombre: str, valor: int):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + valor
+
+    def descontar(self, fase: str, *subfases: str):
+        """Resta de `fase` el tiempo de las subfases que ocurrieron dentro de ella, para dejar solo su tiempo propio."""
+        if fase not in self.fases:
+            return
+        for subfase in subfases:
+            if subfase in self.fases:
+                self.fases[fase]["segundos"] -= self.fases[subfase]["segundos"]
+                self.fases[fase]["cpu"] -= self.fases[subfase]["cpu"]
+
+    def derivar(self, nombre: str, fases: list, menos: list):
+        """Crea la fase `nombre` con el tiempo de `fases` menos el de `menos` (fases que se midieron entrelazadas)."""
+        presentes = [self.fases[f] for f in fases if f in self.fases]
+        if not presentes:
+            return
+        restadas = [self.fases[f] for f in menos if f in self.fases]
+        self.fases[nombre] = {
+            "segundos": sum(f["segundos"] for f in presentes) - sum(f["segundos"] for f in restadas),
+            "cpu": sum(f["cpu"] for f in presentes) - sum(f["cpu"] for f in restadas),
+            "picoMemoriaBytes": None,
+            "veces": 1,
+        }
+
+    def aDict(self) -> dict:
+        return {"fases": self.fases, "contadores": self.contadores}
+
+
+class ListenerCronometrado:
+    """Envuelve un listener de parseo y acumula en una fase del perfilador el tiempo pasado dentro de sus métodos.
+
+    Sirve para separar el análisis semántico (que corre como parse listener) del tiempo del parser.
+    """
+
+    def __init__(self, listener, perfilador: Perfilador, fase: str):
+        self._listener = listener
+        self._perfilador = perfilador
+        self._fase = fase
+
+    def __getattr__(self, nombre):
+        metodo = getattr(self._listener, nombre)
+        if not callable(metodo):
+            return metodo
+
+        perfilador, fase = self._perfilador, self._fase
+        def cronometrado(*args):
+            inicioPared = time.perf_counter()
+            inicioCPU = time.process_time()
+            try:
+                return metodo(*args)
+            finally:
+                perfilador.sumar(fase, time.perf_counter() - inicioPared, time.process_time() - inicioCPU)
+
+        setattr(self, nombre, cronometrado) # la próxima vez no pasa por __getattr__
+        return cronometrado
+
+
+def contarNodos(arbol) -> int:
+    """Cuenta los nodos (reglas y tokens) de un árbol de parseo sin recursión."""
+    if arbol is None:
+        return 0
+    total = 0
+    pendientes = [arbol]
+    while pendientes:
+        nodo = pendientes.pop()
+        total += 1
+        hijos = getattr(nodo, "children", None)
+        if hijos:
+            pendientes.extend(hijos)
+    return total
+
+
+def agregarPerfiles(perfiles: list) -> dict:
+    """Suma los perfiles de varias compilaciones (modo lote): tiempos y contadores se suman, los picos se maximizan."""
+    agregado = {"fases": {}, "contadores": {}, "compilaciones": 0}
+    for perfil in perfiles:
+        if not perfil:
+            continue
+        agregado["compilaciones"] += 1
+        for nombre, fase in perfil["fases"].items():
+            total = agregado["fases"].setdefault(nombre, {"segundos": 0.0, "cpu": 0.0, "picoMemoriaBytes": None, "veces": 0})
+            total["segundos"] += fase["segundos"]
+            total["cpu"] += fase["cpu"]
+            total["veces"] += fase["veces"]
+            if fase["picoMemoriaBytes"] is not None:
+                total["picoMemoriaBytes"] = max(total["picoMemoriaBytes"] or 0, fase["picoMemoriaBytes"])
+        for nombre, valor in perfil["contadores"].items():
+            agregado["contadores"][nombre] = agregado["contadores"].get(nombre, 0) + valor
+    return agregado
+
+
+def escribirJSON(datos: dict, ruta: str):
+    """Escribe un perfil como JSON en `ruta` ('-' = salida estándar)."""
+    if ruta == "-":
+        json.dump(datos, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
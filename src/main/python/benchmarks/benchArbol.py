@@ -0,0 +1,73 @@
+"""Memoria del árbol de parseo de ANTLR contra el AST compacto (ver Arbol).
+
+Para programas sintéticos de tamaño creciente mide:
+- el parseo solo, guardando el árbol completo de ANTLR (lo que la compilación tendría en memoria si
+  lo conservara): nodos del árbol y pico de memoria;
+- la compilación completa (semántico, flujo de datos y código de tres direcciones), que baja cada
+  regla al AST mientras se parsea y suelta los contextos: nodos del AST y pico de memoria.
+
+Los picos son los de tracemalloc (memoria reservada por Python) durante cada medición.
+
+Uso (desde src/main/python):
+    python benchmarks/benchArbol.py [--tamanos 1000 4000 16000] [--semilla 0]
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from antlr4 import InputStream, CommonTokenStream
+from compiladorLexer import compiladorLexer
+from compiladorParser import compiladorParser
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+from Perfilador import Perfilador, contarNodos
+from generadorProgramas import generarPrograma
+
+
+def medirArbolANTLR(fuente: str) -> dict:
+    """Parsea con el árbol completo y lo mantiene vivo hasta el final de la medición."""
+    perfilador = Perfilador()
+    perfilador.iniciar()
+    try:
+        with perfilador.fase("parseo"):
+            parser = compiladorParser(CommonTokenStream(compiladorLexer(InputStream(fuente))))
+            parser.removeErrorListeners()
+            arbol = parser.programa()
+            nodos = contarNodos(arbol)
+    finally:
+        perfilador.detener()
+    return {"nodos": nodos, "pico": perfilador.fases["parseo"]["picoMemoriaBytes"]}
+
+
+def medirAST(fuente: str, rutaTAC: str) -> dict:
+    sesion = CompileSession(rutaTS=None, eco=False, rutaTAC=rutaTAC, perfilador=Perfilador())
+    resultado = compilarEntrada(InputStream(fuente), sesion)
+    perfil = resultado["perfil"]
+    return {"nodos": perfil["contadores"]["nodosAST"], "pico": perfil["fases"]["total"]["picoMemoriaBytes"],
+            "tokens": resultado["tokens"]}
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Memoria del árbol de parseo contra el AST")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[1000, 4000, 16000], help="instrucciones de los programas sintéticos")
+    argumentos.add_argument("--semilla", type=int, default=0)
+    args = argumentos.parse_args(argv[1:])
+
+    print(f"{'Instr.':>7} {'Tokens':>8} {'Nodos ANTLR':>12} {'Nodos AST':>10} {'Pico parseo (MB)':>17} {'Pico compilación (MB)':>22} {'Relación':>9}")
+    with tempfile.TemporaryDirectory() as directorio:
+        rutaTAC = os.path.join(directorio, "programa.tac")
+        for tamano in args.tamanos:
+            fuente = generarPrograma(instrucciones=tamano, semilla=args.semilla)
+            antlr = medirArbolANTLR(fuente)
+            ast = medirAST(fuente, rutaTAC)
+            print(f"{tamano:>7} {ast['tokens']:>8} {antlr['nodos']:>12} {ast['nodos']:>10} {antlr['pico'] / 1e6:>17.1f}"
+                  f" {ast['pico'] / 1e6:>22.1f} {ast['pico'] / antlr['pico']:>8.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,88 @@
+"""Latencia de arranque: cuánto tarda un proceso nuevo en importar el compilador y en compilar su primer programa.
+
+Cada medición corre en un proceso aparte, porque los DFA de ANTLR y los módulos importados quedan
+en el proceso. Se compara el arranque en frío con el que carga los DFA guardados (ver CacheDFA). El
+caché se entrena antes con otros programas sintéticos (otras semillas), para no medir un caché armado
+con el mismo programa: cuantos más programas distintos vio, más decisiones del programa medido ya
+encuentra resueltas. La segunda compilación del mismo proceso es la referencia de un DFA ya caliente.
+
+Uso (desde src/main/python):
+    python benchmarks/benchArranque.py [--instrucciones 1 300] [--entrenamiento 5] [--repeticiones 5] [--semilla 0]
+"""
+import os
+import sys
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generadorProgramas import generarPrograma
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Lo que corre cada proceso medido: imprime los tiempos en JSON
+MEDICION = """
+import json, sys, time
+inicio = time.perf_counter()
+from Compilador import compilar
+from CompileSession import CompileSession
+tiempos = {"importar": time.perf_counter() - inicio, "cargarDFA": 0.0}
+archivo, directorioDFA, guardar = sys.argv[1], sys.argv[2], sys.argv[3] == "1"
+if directorioDFA:
+    from CacheDFA import CacheDFA
+    cache = CacheDFA(directorioDFA)
+    inicio = time.perf_counter()
+    cache.cargar()
+    tiempos["cargarDFA"] = time.perf_counter() - inicio
+for clave in ("primera", "segunda"):
+    inicio = time.perf_counter()
+    compilar(archivo, CompileSession(archivo, rutaTS=None, eco=False))
+    tiempos[clave] = time.perf_counter() - inicio
+if directorioDFA and guardar:
+    cache.guardar()
+print(json.dumps(tiempos))
+"""
+
+
+def medir(archivo: str, directorioDFA: str = "", guardar: bool = False) -> dict:
+    """Corre MEDICION en un proceso nuevo y devuelve sus tiempos, en segundos."""
+    proceso = subprocess.run([sys.executable, "-c", MEDICION, archivo, directorioDFA, "1" if guardar else "0"],
+                             cwd=DIRECTORIO, capture_output=True, text=True, check=True)
+    return json.loads(proceso.stdout.splitlines()[-1])
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Latencia de importación y del primer parseo, con y sin caché de DFA")
+    argumentos.add_argument("--instrucciones", type=int, nargs="+", default=[1, 300], help="instrucciones de los programas sintéticos")
+    argumentos.add_argument("--entrenamiento", type=int, default=5, help="programas con los que se arma el caché de DFA antes de medir")
+    argumentos.add_argument("--repeticiones", type=int, default=5, help="procesos por medición (se informa la mediana)")
+    argumentos.add_argument("--semilla", type=int, default=0)
+    args = argumentos.parse_args(argv[1:])
+
+    print(f"{'Instr.':>7} {'Arranque':>10} {'Importar':>9} {'Cargar DFA':>11} {'1ra compilación':>16} {'2da compilación':>16}  (ms)")
+    with tempfile.TemporaryDirectory() as directorio:
+        directorioDFA = os.path.join(directorio, "dfa")
+        entrenamiento = os.path.join(directorio, "entrenamiento.txt")
+        for i in range(args.entrenamiento): # cada proceso carga el caché, compila y lo guarda con lo que agregó
+            with open(entrenamiento, "w") as f:
+                f.write(generarPrograma(instrucciones=max(args.instrucciones), semilla=args.semilla + 1 + i))
+            medir(entrenamiento, directorioDFA, guardar=True)
+
+        for instrucciones in args.instrucciones:
+            programa = os.path.join(directorio, f"programa{instrucciones}.txt")
+            with open(programa, "w") as f:
+                f.write(generarPrograma(instrucciones=instrucciones, semilla=args.semilla))
+            for nombre, dfa in (("frío", ""), ("caché DFA", directorioDFA)):
+                mediciones = [medir(programa, dfa) for _ in range(args.repeticiones)]
+                mediana = {clave: statistics.median(m[clave] for m in mediciones) * 1000 for clave in mediciones[0]}
+                print(f"{instrucciones:>7} {nombre:>10} {mediana['importar']:>9.1f} {mediana['cargarDFA']:>11.1f} "
+                      f"{mediana['primera']:>16.1f} {mediana['segunda']:>16.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,65 @@
+"""Tiempo de compilación con el caché de compilaciones (ver Cache) en frío y en caliente.
+
+Compila programas sintéticos de varios tamaños tres veces: sin caché, con el caché vacío (cada
+compilación es un fallo y se guarda) y con el caché lleno (cada compilación se repone del disco).
+Al final recorre dos veces los programas más grandes con un caché de la mitad del tamaño que
+ocupan sus entradas, para mostrar el desalojo LRU.
+
+Uso (desde src/main/python):
+    python benchmarks/benchCache.py [--tamanos 100 1000 4000] [--semillas 0 1 2] [--tac]
+"""
+import os
+import sys
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from antlr4 import InputStream
+from Cache import CacheCompilacion
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+from generadorProgramas import generarPrograma
+
+
+def pasada(fuentes: list, directorio: str, cache: CacheCompilacion, tac: bool) -> float:
+    """Compila todos los fuentes y devuelve los segundos totales."""
+    rutaTS = os.path.join(directorio, "ContenidoTS.txt")
+    rutaTAC = os.path.join(directorio, "programa.tac") if tac else None
+    inicio = time.perf_counter()
+    for fuente in fuentes:
+        compilarEntrada(InputStream(fuente), CompileSession(rutaTS=rutaTS, eco=False, rutaTAC=rutaTAC, cache=cache))
+    return time.perf_counter() - inicio
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Compilación con caché en frío y en caliente")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[100, 1000, 4000], help="instrucciones de los programas sintéticos")
+    argumentos.add_argument("--semillas", type=int, nargs="+", default=[0, 1, 2])
+    argumentos.add_argument("--tac", action="store_true", help="genera también el código de tres direcciones")
+    args = argumentos.parse_args(argv[1:])
+
+    print(f"{'Instr.':>7} {'Sin caché (ms)':>15} {'Frío (ms)':>10} {'Caliente (ms)':>14} {'Aceleración':>12}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for tamano in args.tamanos:
+            fuentes = [generarPrograma(instrucciones=tamano, semilla=s) for s in args.semillas]
+            cache = CacheCompilacion(os.path.join(directorio, f"cache{tamano}"))
+            sinCache = pasada(fuentes, directorio, None, args.tac)
+            frio = pasada(fuentes, directorio, cache, args.tac)
+            caliente = pasada(fuentes, directorio, cache, args.tac)
+            n = len(fuentes)
+            print(f"{tamano:>7} {sinCache * 1000 / n:>15.1f} {frio * 1000 / n:>10.1f} {caliente * 1000 / n:>14.2f} {sinCache / caliente:>11.0f}x")
+
+        # Desalojo: un caché con la mitad del espacio que ocupan las entradas del tamaño más grande, recorrido dos veces
+        maxBytes = cache.tamano() // 2
+        cache = CacheCompilacion(os.path.join(directorio, "desalojo"), maxBytes)
+        for _ in range(2):
+            pasada(fuentes, directorio, cache, args.tac)
+        print(cache.resumen())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
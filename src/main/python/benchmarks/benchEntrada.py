@@ -0,0 +1,66 @@
+"""Memoria de la entrada completa (FileStream y CommonTokenStream) contra la mapeada (ver Entrada).
+
+Compila programas sintéticos de distintos tamaños de las dos formas y muestra el pico de memoria
+que mide tracemalloc y el tiempo. El pico no baja a cero con la entrada mapeada: el AST, la tabla de
+símbolos y los diagnósticos siguen creciendo con el programa; lo que se acota son el texto y los tokens.
+
+Uso (desde src/main/python):
+    python benchmarks/benchEntrada.py [--tamanos 2000 8000] [--semilla 0]
+"""
+import os
+import sys
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Compilador import compilar
+from CompileSession import CompileSession
+from generadorProgramas import generarPrograma
+
+
+def medir(ruta: str, mapeado: bool) -> tuple:
+    """Compila el archivo dos veces y devuelve (segundos, pico de memoria en bytes, resultado).
+
+    El tiempo se toma en una compilación sin tracemalloc, que la hace varias veces más lenta.
+    """
+    inicio = time.perf_counter()
+    resultado = compilar(ruta, CompileSession(ruta, rutaTS=None, eco=False), mapeado=mapeado)
+    segundos = time.perf_counter() - inicio
+    tracemalloc.start()
+    compilar(ruta, CompileSession(ruta, rutaTS=None, eco=False), mapeado=mapeado)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del resultado["segundos"]
+    return segundos, pico, resultado
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Memoria de la entrada completa y de la mapeada")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[2000, 8000], help="instrucciones de los programas sintéticos")
+    argumentos.add_argument("--semilla", type=int, default=0)
+    args = argumentos.parse_args(argv[1:])
+
+    print(f"{'Instr.':>7} {'KB fuente':>10} {'Entrada':>9} {'Pico (KB)':>10} {'Tiempo (ms)':>12} {'Mismo resultado':>16}")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "programa.txt")
+        for tamano in args.tamanos:
+            with open(ruta, "w") as f:
+                f.write(generarPrograma(instrucciones=tamano, semilla=args.semilla))
+            kb = os.path.getsize(ruta) / 1024
+            compilar(ruta, CompileSession(ruta, rutaTS=None, eco=False)) # calienta el DFA del parser
+            base = None
+            for mapeado in (False, True):
+                segundos, pico, resultado = medir(ruta, mapeado)
+                if base is None:
+                    base = resultado
+                print(f"{tamano:>7} {kb:>10.0f} {'mmap' if mapeado else 'completa':>9} {pico / 1024:>10.0f} "
+                      f"{segundos * 1000:>12.1f} {'sí' if resultado == base else 'NO':>16}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
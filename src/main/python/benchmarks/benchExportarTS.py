@@ -0,0 +1,97 @@
+"""Costo de exportar tablas de símbolos grandes en cada formato.
+
+Compara la escritura anterior (una escritura por fila, directo al archivo) con los exportadores
+de tablaDeSimbolos.Exportadores, que arman todo en memoria y escriben una sola vez. Informa el
+tiempo y el tamaño del archivo de cada formato.
+
+Uso (desde src/main/python):
+    python benchmarks/benchExportarTS.py [--contextos 10 100 1000] [--simbolos 20] [--repeticiones 5]
+"""
+import os
+import sys
+import argparse
+import statistics
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tablaDeSimbolos.SymbolTable import TS
+from tablaDeSimbolos.Variable import Variable
+from tablaDeSimbolos.Funcion import Funcion
+from tablaDeSimbolos.Exportadores import EXPORTADORES
+
+
+def construirTS(contextos: int, simbolos: int) -> TS:
+    """Un contexto global con funciones y `contextos` contextos anidados de a dos niveles, cada uno con `simbolos` variables."""
+    ts = TS()
+    for i in range(contextos):
+        ts.addSimbolo(Funcion(f"f{i}", "int", [Variable("a", "int"), Variable("b", "double")], inicializado=True))
+    for c in range(contextos):
+        ts.addContexto()
+        if c % 2:
+            ts.addContexto()
+        for i in range(simbolos):
+            variable = Variable(f"v{c}_{i}", "int" if i % 3 else "double")
+            if i % 2:
+                variable.setInicializado()
+            ts.addSimbolo(variable)
+        ts.delContexto()
+        if c % 2:
+            ts.delContexto()
+    return ts
+
+
+def escribirPorFilas(ts: TS, ruta: str):
+    """La exportación anterior: cada fila se formatea y se escribe por separado en el archivo."""
+    with open(ruta, "w") as f:
+        for idx, contexto in enumerate(ts.historialCTX):
+            prefijo = '    ' * contexto.nivel
+            f.write(f"{prefijo}--- Contexto #{idx} (nivel {contexto.nivel}) ---\n")
+            if not contexto.simbolos:
+                f.write(f"{prefijo}(vacío)\n")
+                continue
+            f.write(f"{prefijo}{'Nombre':<20} {'Tipo':<12} {'Inicializado':<12} {'Usado':<6} Argumentos\n")
+            for nombre, simbolo in contexto.simbolos.items():
+                if isinstance(simbolo, Variable):
+                    argumentos = "N/A"
+                else:
+                    argumentos = ', '.join([arg.tipoDato for arg in simbolo.getListaArgs()]) if simbolo.getListaArgs() else "void"
+                f.write(f"{prefijo}{nombre:<20} {str(simbolo.tipoDato):<12} {str(simbolo.inicializado):<12} {str(simbolo.usado):<6} {argumentos}\n")
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Mediana de los milisegundos de `funcion()`."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Tiempo y tamaño de la exportación de la TS en cada formato")
+    argumentos.add_argument("--contextos", type=int, nargs="+", default=[10, 100, 1000], help="contextos de cada TS")
+    argumentos.add_argument("--simbolos", type=int, default=20, help="variables por contexto")
+    argumentos.add_argument("--repeticiones", type=int, default=5)
+    args = argumentos.parse_args(argv[1:])
+
+    print(f"{'Contextos':>9} {'Símbolos':>9} {'Formato':<16} {'ms':>9} {'KiB':>9}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for contextos in args.contextos:
+            ts = construirTS(contextos, args.simbolos)
+            simbolos = sum(len(contexto.simbolos) for contexto in ts.historialCTX)
+            ruta = os.path.join(directorio, "ContenidoTS")
+
+            casos = {"texto por filas": lambda: escribirPorFilas(ts, ruta)}
+            for formato in EXPORTADORES:
+                casos[formato] = lambda formato=formato: ts.imprimirTS(ruta, formato)
+            for caso, funcion in casos.items():
+                ms = medir(funcion, args.repeticiones)
+                print(f"{contextos:>9} {simbolos:>9} {caso:<16} {ms:>9.2f} {os.path.getsize(ruta) / 1024:>9.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
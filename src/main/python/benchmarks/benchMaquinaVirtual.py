@@ -0,0 +1,85 @@
+"""Efecto del optimizador sobre la ejecución: instrucciones ejecutadas y ops/s en la máquina virtual.
+
+Para cada programa (los de `input/` que generan código y programas sintéticos de varios tamaños)
+genera el código de tres direcciones, lo optimiza con todos los pases y ejecuta las dos versiones.
+Informa las instrucciones del programa y las ejecutadas antes y después, la reducción, el tiempo
+y las ops/s de la máquina. También compara el estado final de las variables globales: si difiere,
+el optimizador cambió el comportamiento del programa y la suite termina con error.
+
+Uso (desde src/main/python):
+    python benchmarks/benchMaquinaVirtual.py [--tamanos 100 300 600] [--semillas 0 1] [--repeticiones 3]
+"""
+import os
+import sys
+import argparse
+import glob
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from antlr4 import InputStream
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+from Optimizador import Optimizador
+from MaquinaVirtual import MaquinaVirtual
+from generadorProgramas import generarPrograma
+
+
+def ejecutar(rutaTAC: str, repeticiones: int) -> tuple:
+    """Ejecuta el programa varias veces y se queda con la corrida más rápida. Devuelve (estadísticas, valores finales)."""
+    maquina = MaquinaVirtual.desdeArchivo(rutaTAC)
+    mejor = None
+    for _ in range(repeticiones):
+        estadisticas = dict(maquina.ejecutar())
+        if mejor is None or estadisticas["segundos"] < mejor["segundos"]:
+            mejor = estadisticas
+    return mejor, maquina.valores()
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Instrucciones ejecutadas antes y después de optimizar")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[100, 300, 600], help="instrucciones de los programas sintéticos")
+    argumentos.add_argument("--semillas", type=int, nargs="+", default=[0, 1])
+    argumentos.add_argument("--profundidad", type=int, default=3)
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    argumentos.add_argument("--sin-entradas", action="store_true", help="no incluir los programas de input/")
+    args = argumentos.parse_args(argv[1:])
+
+    fuentes = []
+    if not args.sin_entradas:
+        raiz = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input")
+        for ruta in sorted(glob.glob(os.path.join(raiz, "*.txt"))):
+            with open(ruta) as f:
+                fuentes.append((os.path.basename(ruta), f.read()))
+    for tamano in args.tamanos:
+        for semilla in args.semillas:
+            fuentes.append((f"sintetico-{tamano}-s{semilla}", generarPrograma(instrucciones=tamano, profundidad=args.profundidad, semilla=semilla)))
+
+    print(f"{'Entrada':<24} {'Programa':>17} {'Ejecutadas':>21} {'Reducción':>10} {'ms':>15} {'ops/s':>21}")
+    iguales = True
+    with tempfile.TemporaryDirectory() as directorio:
+        crudo = os.path.join(directorio, "crudo.tac")
+        optimizado = os.path.join(directorio, "optimizado.tac")
+        for nombre, fuente in fuentes:
+            resultado = compilarEntrada(InputStream(fuente), CompileSession(rutaTS=None, eco=False, rutaTAC=crudo))
+            if resultado["codigoIntermedio"] is None:
+                print(f"{nombre:<24} sin código: tiene errores sintácticos")
+                continue
+            Optimizador().optimizarArchivo(crudo, optimizado)
+            antes, valoresAntes = ejecutar(crudo, args.repeticiones)
+            despues, valoresDespues = ejecutar(optimizado, args.repeticiones)
+
+            # El código que el plegado deja inalcanzable puede llevarse variables: se comparan las que quedan
+            distintas = [v for v in valoresDespues if valoresAntes.get(v) != valoresDespues[v]]
+            iguales &= not distintas
+            reduccion = 100.0 * (antes["ejecutadas"] - despues["ejecutadas"]) / antes["ejecutadas"] if antes["ejecutadas"] else 0.0
+            print(f"{nombre:<24} {antes['instrucciones']:>8}>{despues['instrucciones']:<8} {antes['ejecutadas']:>10}>{despues['ejecutadas']:<10}"
+                  f" {reduccion:>9.1f}% {antes['segundos'] * 1000:>7.1f}>{despues['segundos'] * 1000:<7.1f}"
+                  f" {antes['opsPorSegundo']:>10.0f}>{despues['opsPorSegundo']:<10.0f}"
+                  + (f"  DISTINTO: {', '.join(distintas[:5])}" if distintas else ""))
+    return 0 if iguales else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
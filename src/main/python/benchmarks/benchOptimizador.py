@@ -0,0 +1,103 @@
+"""Cantidad de instrucciones del código de tres direcciones antes y después del optimizador.
+
+Genera el código sin optimizar de cada entrada (los programas de `input/` que no tienen errores
+sintácticos y programas sintéticos de `generadorProgramas` de varios tamaños) y lo pasa por el
+optimizador con cada pase solo y con todos juntos. Informa las instrucciones que quedan, el
+porcentaje de reducción y el tiempo de optimización.
+
+Uso (desde src/main/python):
+    python benchmarks/benchOptimizador.py [--tamanos 250 1000 4000] [--semillas 0 1] [--sin-entradas]
+"""
+import os
+import sys
+import argparse
+import glob
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from antlr4 import InputStream
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+from Optimizador import Optimizador, PASES
+from generadorProgramas import generarPrograma
+
+CONFIGURACIONES = [(p, (p,)) for p in PASES] + [("todos", PASES)]
+
+
+def generarTAC(fuente: str, rutaTAC: str) -> int:
+    """Compila `fuente` y deja el código sin optimizar en `rutaTAC`. Devuelve None si no se pudo generar."""
+    sesion = CompileSession(rutaTS=None, eco=False, rutaTAC=rutaTAC)
+    resultado = compilarEntrada(InputStream(fuente), sesion)
+    if resultado["codigoIntermedio"] is None:
+        return None
+    return resultado["codigoIntermedio"]["antes"]
+
+
+def medir(rutaTAC: str, directorio: str) -> dict:
+    """Optimiza el mismo archivo con cada configuración de pases."""
+    salida = os.path.join(directorio, "optimizado.tac")
+    medidas = {}
+    for nombre, pases in CONFIGURACIONES:
+        optimizador = Optimizador(pases)
+        inicio = time.perf_counter()
+        estadisticas = optimizador.optimizarArchivo(rutaTAC, salida)
+        medidas[nombre] = {"despues": estadisticas["despues"], "segundos": time.perf_counter() - inicio}
+    return medidas
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Instrucciones de tres direcciones antes y después de optimizar")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[250, 1000, 4000], help="instrucciones de los programas sintéticos")
+    argumentos.add_argument("--semillas", type=int, nargs="+", default=[0, 1])
+    argumentos.add_argument("--profundidad", type=int, default=3)
+    argumentos.add_argument("--largo-expresion", type=int, default=4)
+    argumentos.add_argument("--sin-entradas", action="store_true", help="no incluir los programas de input/")
+    args = argumentos.parse_args(argv[1:])
+
+    fuentes = []
+    if not args.sin_entradas:
+        raiz = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input")
+        for ruta in sorted(glob.glob(os.path.join(raiz, "*.txt"))):
+            with open(ruta) as f:
+                fuentes.append((os.path.basename(ruta), f.read()))
+    for tamano in args.tamanos:
+        for semilla in args.semillas:
+            fuentes.append((f"sintetico-{tamano}-s{semilla}",
+                            generarPrograma(instrucciones=tamano, profundidad=args.profundidad,
+                                            largoExpresion=args.largo_expresion, semilla=semilla)))
+
+    print(f"{'Entrada':<24} {'Sin opt.':>9} " + " ".join(f"{n:>16}" for n, _ in CONFIGURACIONES) + f" {'ms (todos)':>11}")
+    totalAntes = 0
+    totalDespues = {n: 0 for n, _ in CONFIGURACIONES}
+    with tempfile.TemporaryDirectory() as directorio:
+        rutaTAC = os.path.join(directorio, "crudo.tac")
+        for nombre, fuente in fuentes:
+            antes = generarTAC(fuente, rutaTAC)
+            if antes is None:
+                print(f"{nombre:<24} sin código: tiene errores sintácticos")
+                continue
+            medidas = medir(rutaTAC, directorio)
+            totalAntes += antes
+            columnas = []
+            for configuracion, _ in CONFIGURACIONES:
+                despues = medidas[configuracion]["despues"]
+                totalDespues[configuracion] += despues
+                columnas.append(f"{despues:>7} ({_reduccion(antes, despues):>5.1f}%)")
+            print(f"{nombre:<24} {antes:>9} " + " ".join(f"{c:>16}" for c in columnas)
+                  + f" {medidas['todos']['segundos'] * 1000:>11.1f}")
+
+    if totalAntes:
+        print(f"{'Total':<24} {totalAntes:>9} "
+              + " ".join(f"{f'{d:>7} ({_reduccion(totalAntes, d):>5.1f}%)':>16}" for d in totalDespues.values()))
+    return 0
+
+
+def _reduccion(antes: int, despues: int) -> float:
+    return 100.0 * (antes - despues) / antes if antes else 0.0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
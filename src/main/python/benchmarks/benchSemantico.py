@@ -0,0 +1,64 @@
+"""Análisis semántico en serie contra el de las funciones globales en paralelo (ver AnalisisParalelo).
+
+Compila programas sintéticos con muchas funciones de las dos formas, verifica que la salida (los
+diagnósticos y la TS) sea la misma y muestra los tiempos. La ganancia depende de qué parte del
+programa está dentro de funciones y de cuántas CPU hay: con una sola, el modo paralelo solo suma
+el costo de repartir el trabajo.
+
+Uso (desde src/main/python):
+    python benchmarks/benchSemantico.py [--tamanos 1000 4000] [--funciones 40] [--procesos 1 2 4] [--semilla 0]
+"""
+import os
+import sys
+import argparse
+import io
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from antlr4 import InputStream
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+from generadorProgramas import generarPrograma
+
+
+def compilarCon(fuente: str, rutaTS: str, procesos: int) -> tuple:
+    """Compila el fuente y devuelve (segundos, salida de consola, contenido de la TS)."""
+    sesion = CompileSession(rutaTS=rutaTS, eco=False, procesosSemantico=procesos)
+    inicio = time.perf_counter()
+    compilarEntrada(InputStream(fuente), sesion)
+    segundos = time.perf_counter() - inicio
+    salida = io.StringIO()
+    sesion.volcar(salida)
+    with open(rutaTS) as f:
+        return segundos, salida.getvalue(), f.read()
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Análisis semántico en serie y en paralelo")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[1000, 4000], help="instrucciones de los programas sintéticos")
+    argumentos.add_argument("--funciones", type=int, default=40, help="funciones de cada programa")
+    argumentos.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4], help="procesos del modo paralelo (1 = en serie)")
+    argumentos.add_argument("--semilla", type=int, default=0)
+    args = argumentos.parse_args(argv[1:])
+
+    print(f"CPU disponibles: {os.cpu_count()}")
+    print(f"{'Instr.':>7} {'Procesos':>9} {'Tiempo (ms)':>12} {'Aceleración':>12} {'Misma salida':>13}")
+    with tempfile.TemporaryDirectory() as directorio:
+        rutaTS = os.path.join(directorio, "ContenidoTS.txt")
+        for tamano in args.tamanos:
+            fuente = generarPrograma(instrucciones=tamano, funciones=args.funciones, semilla=args.semilla)
+            compilarCon(fuente, rutaTS, None) # calienta el DFA del parser
+            base = None
+            for procesos in args.procesos:
+                segundos, *salida = compilarCon(fuente, rutaTS, procesos if procesos > 1 else None)
+                if base is None:
+                    base = (segundos, salida)
+                print(f"{tamano:>7} {procesos:>9} {segundos * 1000:>12.1f} {base[0] / segundos:>11.2f}x {'sí' if salida == base[1] else 'NO':>13}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
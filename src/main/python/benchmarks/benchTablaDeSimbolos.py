@@ -0,0 +1,75 @@
+"""Microbenchmark de búsquedas en la tabla de símbolos.
+
+Barre la profundidad de anidamiento y la cantidad de símbolos por contexto, y compara
+el índice de la cadena de contextos de `TS.buscarSimbolo` contra el recorrido lineal
+de contextos que se usaba antes.
+
+Uso (desde src/main/python):
+    python benchmarks/benchTablaDeSimbolos.py [--busquedas N]
+"""
+import os
+import sys
+import argparse
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tablaDeSimbolos.SymbolTable import TS
+from tablaDeSimbolos.Variable import Variable
+
+PROFUNDIDADES = [1, 4, 16, 64, 256]
+SIMBOLOS_POR_CONTEXTO = [1, 10, 100]
+
+
+def construirTS(profundidad: int, simbolos: int) -> TS:
+    """Arma una TS con `profundidad` contextos anidados, cada uno con `simbolos` variables propias."""
+    ts = TS()
+    for nivel in range(profundidad):
+        if nivel > 0:
+            ts.addContexto()
+        for i in range(simbolos):
+            ts.addSimbolo(Variable(f"v{nivel}_{i}", "int"))
+    return ts
+
+
+def buscarLineal(ts: TS, nombre: str):
+    """Búsqueda anterior al índice: recorre los contextos del más interno al global y cada diccionario clave por clave."""
+    for contexto in reversed(ts.contextos):
+        for identificador in contexto.simbolos:
+            if identificador == nombre:
+                return contexto.simbolos[identificador]
+    return None
+
+
+def medir(funcion, nombres: list, busquedas: int) -> float:
+    """Devuelve los nanosegundos promedio por búsqueda."""
+    repeticiones = max(1, busquedas // len(nombres))
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for nombre in nombres:
+            funcion(nombre)
+    return (time.perf_counter() - inicio) * 1e9 / (repeticiones * len(nombres))
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Microbenchmark de TS.buscarSimbolo")
+    argumentos.add_argument("--busquedas", type=int, default=20000, help="búsquedas por caso y tipo de símbolo")
+    args = argumentos.parse_args(argv[1:])
+
+    print(f"{'Prof.':>6} {'Simb.':>6} {'Caso':<10} {'Índice (ns)':>12} {'Lineal (ns)':>12} {'Mejora':>8}")
+    for profundidad in PROFUNDIDADES:
+        for simbolos in SIMBOLOS_POR_CONTEXTO:
+            ts = construirTS(profundidad, simbolos)
+            casos = {
+                "global": [f"v0_{i}" for i in range(simbolos)],
+                "interno": [f"v{profundidad - 1}_{i}" for i in range(simbolos)],
+                "ausente": [f"nada{i}" for i in range(simbolos)],
+            }
+            for caso, nombres in casos.items():
+                indice = medir(ts.buscarSimbolo, nombres, args.busquedas)
+                lineal = medir(lambda nombre: buscarLineal(ts, nombre), nombres, args.busquedas)
+                print(f"{profundidad:>6} {simbolos:>6} {caso:<10} {indice:>12.0f} {lineal:>12.0f} {lineal / indice:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
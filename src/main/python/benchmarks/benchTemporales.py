@@ -0,0 +1,93 @@
+"""Efecto de la reutilización de temporales sobre el tamaño de los marcos de la máquina virtual.
+
+Para cada programa (los de `input/` que generan código y programas sintéticos con expresiones
+largas) genera el código de tres direcciones optimizado y lo pasa por AsignacionTemporales, sin
+máximo y con cada máximo de `--maximos`. Informa los temporales distintos, el máximo de temporales
+vivos a la vez, los guardados en la pila, la suma de los marcos de las funciones (lo que se guarda
+y restaura en cada llamada), las celdas de memoria de la máquina y las instrucciones ejecutadas.
+También compara el estado final de las variables globales: si difiere, la reasignación cambió el
+comportamiento del programa y la suite termina con error.
+
+Uso (desde src/main/python):
+    python benchmarks/benchTemporales.py [--tamanos 100 300 600] [--semillas 0 1] [--maximos 4]
+"""
+import os
+import sys
+import argparse
+import glob
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from antlr4 import InputStream
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+from CodigoIntermedio import leerArchivo
+from Optimizador import Optimizador
+from AsignacionTemporales import AsignadorTemporales
+from MaquinaVirtual import MaquinaVirtual, ErrorEjecucion
+from generadorProgramas import generarPrograma
+
+
+def ejecutar(programa: list) -> tuple:
+    """Ejecuta el programa. Devuelve (suma de los marcos, variables y temporales en memoria, instrucciones ejecutadas, valores finales)."""
+    maquina = MaquinaVirtual(programa)
+    estadisticas = maquina.ejecutar()
+    return sum(maquina.marcos.values()), len(maquina.nombres), estadisticas["ejecutadas"], maquina.valores()
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Temporales y tamaño de los marcos antes y después de reutilizarlos")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[100, 300, 600], help="instrucciones de los programas sintéticos")
+    argumentos.add_argument("--semillas", type=int, nargs="+", default=[0, 1])
+    argumentos.add_argument("--profundidad", type=int, default=3)
+    argumentos.add_argument("--largo-expresion", type=int, default=6, help="operandos de las expresiones de los programas sintéticos")
+    argumentos.add_argument("--maximos", type=int, nargs="*", default=[4], help="máximos de temporales vivos a probar además de sin máximo")
+    argumentos.add_argument("--sin-entradas", action="store_true", help="no incluir los programas de input/")
+    args = argumentos.parse_args(argv[1:])
+
+    fuentes = []
+    if not args.sin_entradas:
+        raiz = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "input")
+        for ruta in sorted(glob.glob(os.path.join(raiz, "*.txt"))):
+            with open(ruta) as f:
+                fuentes.append((os.path.basename(ruta), f.read()))
+    for tamano in args.tamanos:
+        for semilla in args.semillas:
+            fuentes.append((f"sintetico-{tamano}-s{semilla}",
+                            generarPrograma(instrucciones=tamano, profundidad=args.profundidad, semilla=semilla, largoExpresion=args.largo_expresion)))
+
+    print(f"{'Entrada':<24} {'Máximo':>6} {'Temporales':>13} {'Vivos':>7} {'Pila':>5} {'Marcos':>11} {'Memoria':>11} {'Ejecutadas':>21}")
+    iguales = True
+    with tempfile.TemporaryDirectory() as directorio:
+        crudo = os.path.join(directorio, "crudo.tac")
+        optimizado = os.path.join(directorio, "optimizado.tac")
+        for nombre, fuente in fuentes:
+            resultado = compilarEntrada(InputStream(fuente), CompileSession(rutaTS=None, eco=False, rutaTAC=crudo))
+            if resultado["codigoIntermedio"] is None:
+                print(f"{nombre:<24} sin código: tiene errores sintácticos")
+                continue
+            Optimizador().optimizarArchivo(crudo, optimizado)
+            programa = list(leerArchivo(optimizado))
+            try:
+                marcosAntes, memoriaAntes, ejecutadasAntes, valoresAntes = ejecutar(programa)
+            except (ErrorEjecucion, ArithmeticError) as error:
+                print(f"{nombre:<24} no se ejecuta: {error}")
+                continue
+
+            for maximo in [None] + args.maximos:
+                asignador = AsignadorTemporales(maximo)
+                marcos, memoria, ejecutadas, valores = ejecutar(asignador.asignar(programa))
+                e = asignador.estadisticas
+                mismos = repr(valores) == repr(valoresAntes) # con repr, un nan es igual a otro nan
+                iguales &= mismos
+                print(f"{nombre:<24} {'-' if maximo is None else maximo:>6} {e['temporalesAntes']:>6}>{e['temporalesDespues']:<6}"
+                      f" {e['maxVivosAntes']:>3}>{e['maxVivosDespues']:<3} {e['derramados']:>5} {marcosAntes:>5}>{marcos:<5}"
+                      f" {memoriaAntes:>5}>{memoria:<5} {ejecutadasAntes:>10}>{ejecutadas:<10}"
+                      + ("" if mismos else "  DISTINTO"))
+    return 0 if iguales else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,74 @@
+"""Benchmark del tipado de expresiones largas.
+
+Genera asignaciones con expresiones de N términos y mide el costo del análisis
+semántico (parseo con `Escucha` menos parseo solo) por término. Con el tipado de
+abajo hacia arriba cada nodo se tipa una sola vez, así que el costo por término
+debe mantenerse aproximadamente constante al crecer N.
+
+Uso (desde src/main/python):
+    python benchmarks/benchTipadoExpresiones.py [--terminos 1000 2000 4000 8000]
+"""
+import os
+import sys
+import argparse
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from antlr4 import InputStream, CommonTokenStream
+from compiladorLexer import compiladorLexer
+from compiladorParser import compiladorParser
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+
+OPERADORES = ["+", "-", "*", "/"]
+
+
+def generarPrograma(terminos: int) -> str:
+    """Programa con una única asignación cuya expresión tiene `terminos` operandos int y double alternados."""
+    operandos = [("a" if i % 2 == 0 else "b") for i in range(terminos)]
+    expresion = operandos[0]
+    for i, operando in enumerate(operandos[1:]):
+        expresion += f" {OPERADORES[i % len(OPERADORES)]} {operando}"
+    return f"int a = 1;\ndouble b = 2;\ndouble r;\nr = {expresion};\nb = r;\n"
+
+
+def soloParseo(fuente: str) -> float:
+    inicio = time.perf_counter()
+    parser = compiladorParser(CommonTokenStream(compiladorLexer(InputStream(fuente))))
+    parser.removeErrorListeners()
+    parser.programa()
+    return time.perf_counter() - inicio
+
+
+def parseoConSemantica(fuente: str) -> float:
+    inicio = time.perf_counter()
+    resultado = compilarEntrada(InputStream(fuente), CompileSession(rutaTS=None, eco=False))
+    assert not resultado["huboErrores"], resultado["diagnosticos"]
+    return time.perf_counter() - inicio
+
+
+def medir(funcion, fuente: str, repeticiones: int) -> float:
+    return min(funcion(fuente) for _ in range(repeticiones))
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Escalado del tipado de expresiones")
+    argumentos.add_argument("--terminos", type=int, nargs="+", default=[1000, 2000, 4000, 8000])
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    args = argumentos.parse_args(argv[1:])
+
+    print(f"{'Términos':>9} {'Parseo (s)':>11} {'Con semántica (s)':>18} {'Semántica (s)':>14} {'µs/término':>11}")
+    base = None
+    for terminos in args.terminos:
+        fuente = generarPrograma(terminos)
+        parseo = medir(soloParseo, fuente, args.repeticiones)
+        total = medir(parseoConSemantica, fuente, args.repeticiones)
+        semantica = max(total - parseo, 0.0)
+        porTermino = semantica * 1e6 / terminos
+        base = base or porTermino
+        print(f"{terminos:>9} {parseo:>11.3f} {total:>18.3f} {semantica:>14.3f} {porTermino:>11.2f}  ({porTermino / base:.2f}x)")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
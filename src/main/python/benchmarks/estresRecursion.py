@@ -0,0 +1,79 @@
+"""Pruebas de estrés de profundidad de pila.
+
+Compila un programa de 100k instrucciones y una expresión de 50k términos con un
+límite de recursión de Python muy por debajo del que trae por defecto. Como las
+listas de instrucciones y las cadenas de operadores de la gramática son iterativas,
+la profundidad de la pila no depende del largo de la entrada y ambos casos pasan.
+Si alguna regla vuelve a ser recursiva, el caso falla con RecursionError.
+
+Uso (desde src/main/python):
+    python benchmarks/estresRecursion.py [--instrucciones 100000] [--terminos 50000] [--limite 300]
+"""
+import os
+import sys
+import argparse
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from antlr4 import InputStream
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+
+
+def programaLargo(instrucciones: int) -> str:
+    """Muchas instrucciones seguidas en el nivel global."""
+    lineas = ["int x = 0;", "double y = 1;"]
+    for i in range(instrucciones - 2):
+        lineas.append("x = x + 1;" if i % 2 == 0 else "y = y * x;")
+    return "\n".join(lineas) + "\n"
+
+
+def expresionLarga(terminos: int) -> str:
+    """Una única asignación con una cadena de `terminos` operandos."""
+    operadores = ["+", "-", "*", "/"]
+    partes = ["a"]
+    for i in range(1, terminos):
+        partes.append(operadores[i % len(operadores)])
+        partes.append("a" if i % 2 == 0 else "b")
+    return f"int a = 1;\ndouble b = 2;\ndouble r;\nr = {' '.join(partes)};\nb = r;\n"
+
+
+def caso(nombre: str, fuente: str) -> bool:
+    inicio = time.perf_counter()
+    try:
+        resultado = compilarEntrada(InputStream(fuente), CompileSession(rutaTS=None, eco=False))
+    except RecursionError as e:
+        print(f"[FALLA] {nombre}: RecursionError ({e})")
+        return False
+    segundos = time.perf_counter() - inicio
+    if resultado["huboErrores"]:
+        print(f"[FALLA] {nombre}: diagnósticos inesperados {resultado['diagnosticos'][:3]}")
+        return False
+    print(f"[OK] {nombre}: {resultado['tokens']} tokens en {segundos:.2f} s")
+    return True
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Estrés de profundidad de pila del compilador")
+    argumentos.add_argument("--instrucciones", type=int, default=100_000)
+    argumentos.add_argument("--terminos", type=int, default=50_000)
+    argumentos.add_argument("--limite", type=int, default=300, help="límite de recursión de Python durante las pruebas")
+    args = argumentos.parse_args(argv[1:])
+
+    fuentes = [
+        (f"{args.instrucciones} instrucciones", programaLargo(args.instrucciones)),
+        (f"expresión de {args.terminos} términos", expresionLarga(args.terminos)),
+    ]
+
+    limiteOriginal = sys.getrecursionlimit()
+    sys.setrecursionlimit(args.limite)
+    try:
+        resultados = [caso(nombre, fuente) for nombre, fuente in fuentes]
+    finally:
+        sys.setrecursionlimit(limiteOriginal)
+    return 0 if all(resultados) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,316 @@
+"""Generador de programas sintéticos en el lenguaje de compilador.g4.
+
+Produce programas válidos (sin ningún diagnóstico: todo lo declarado se inicializa y se usa,
+los tipos son compatibles y los bucles terminan) o con errores sintácticos y semánticos
+inyectados con una densidad configurable. Con la misma semilla, el programa es siempre el mismo.
+
+Uso (desde src/main/python):
+    python benchmarks/generadorProgramas.py [--instrucciones N] [--profundidad P] [--funciones F]
+        [--prototipos K] [--largo-expresion L] [--errores D] [--semilla S] [-o salida.txt]
+"""
+import sys
+import argparse
+import random
+
+TIPOS = ["int", "double"]
+
+
+class GeneradorProgramas:
+    """Arma un programa instrucción por instrucción, llevando los contextos para usar solo variables visibles."""
+
+    def __init__(self, instrucciones: int = 200, profundidad: int = 3, funciones: int = 5, prototipos: int = 2,
+                 largoExpresion: int = 4, densidadErrores: float = 0.0, semilla: int = 0,
+                 variablesPorBloque: int = 2, iteraciones: int = 2):
+        self.instrucciones = instrucciones # instrucciones aproximadas del programa completo
+        self.profundidad = profundidad # anidamiento máximo de if/while/for/bloques
+        self.funciones = funciones
+        self.prototipos = min(prototipos, funciones) # las primeras K funciones se prototipan y se definen al final
+        self.largoExpresion = largoExpresion # operandos por expresión
+        self.densidadErrores = densidadErrores # probabilidad de que una instrucción simple lleve un error
+        self.variablesPorBloque = variablesPorBloque
+        self.iteraciones = iteraciones # vueltas de cada while/for (los programas se pueden ejecutar)
+        self.rng = random.Random(semilla)
+
+        self.lineas = []
+        self.contextos = [] # pila de contextos: listas de [nombre, tipo, usada]
+        self.firmas = {} # nombre -> (tipo de retorno, cantidad de parámetros int, cantidad de parámetros double)
+        self.llamables = [] # funciones que se pueden llamar desde el código que se está generando
+        self.contadores = set() # variables de control de los ciclos: no se asignan, así todo ciclo termina
+        self.contador = 0
+        self.restantes = 0
+        self.errores = 0
+
+    # ------------------------------
+    # Utilidades
+    # ------------------------------
+    def _nombre(self, prefijo: str) -> str:
+        self.contador += 1
+        return f"{prefijo}{self.contador}"
+
+    def _emitir(self, nivel: int, texto: str):
+        self.lineas.append("    " * nivel + texto)
+        self.restantes -= 1
+
+    def _declarar(self, nombre: str, tipo: str):
+        self.contextos[-1].append([nombre, tipo, False])
+
+    def _variables(self, tipo: str = None) -> list:
+        """Variables visibles (opcionalmente de un tipo). Los acumuladores globales no se ofrecen como operandos."""
+        visibles = []
+        for contexto in self.contextos:
+            for simbolo in contexto:
+                if simbolo[0] in ("acc", "accD"):
+                    continue
+                if tipo is None or simbolo[1] == tipo:
+                    visibles.append(simbolo)
+        return visibles
+
+    def _conError(self) -> bool:
+        return self.densidadErrores > 0 and self.rng.random() < self.densidadErrores
+
+    # ------------------------------
+    # Expresiones
+    # ------------------------------
+    def _operando(self, tipo: str, presupuesto: int) -> str:
+        candidatos = self._variables("int") if tipo == "int" else self._variables()
+        eleccion = self.rng.random()
+        if presupuesto > 1 and self.llamables and eleccion < 0.15:
+            funcion = self.rng.choice(self.llamables)
+            retorno, enteros, reales = self.firmas[funcion]
+            if retorno == "int" or (retorno == "double" and tipo == "double"):
+                args = [self._expresion("int", 1) for _ in range(enteros)] + [self._expresion("double", 1) for _ in range(reales)]
+                return f"{funcion}({', '.join(args)})"
+        if presupuesto > 2 and eleccion < 0.25:
+            return f"({self._expresion(tipo, min(3, presupuesto - 1))})"
+        if candidatos and eleccion < 0.85:
+            simbolo = self.rng.choice(candidatos)
+            simbolo[2] = True
+            return simbolo[0]
+        return str(self.rng.randint(0, 99))
+
+    def _expresion(self, tipo: str, largo: int) -> str:
+        partes = [self._operando(tipo, largo)]
+        for _ in range(largo - 1):
+            operador = self.rng.choice(["+", "-", "*", "/", "%"] if tipo == "int" else ["+", "-", "*", "/"])
+            if operador in ("/", "%"):
+                partes.append(f"{operador} {self.rng.randint(1, 9)}") # divisores constantes: el programa nunca divide por cero
+            else:
+                partes.append(f"{operador} {self._operando(tipo, largo)}")
+        return " ".join(partes)
+
+    def _condicion(self) -> str:
+        tipo = self.rng.choice(TIPOS)
+        comparacion = f"{self._expresion(tipo, 2)} {self.rng.choice(['<', '>', '<=', '>=', '==', '!='])} {self._expresion(tipo, 2)}"
+        if self.rng.random() < 0.2:
+            comparacion += f" {self.rng.choice(['&&', '||'])} {self._expresion('int', 1)} < {self.rng.randint(1, 50)}"
+        return comparacion
+
+    # ------------------------------
+    # Instrucciones
+    # ------------------------------
+    def _declaraciones(self, nivel: int):
+        """Declara las variables del bloque, a veces varias en una misma declaración (todas inicializadas)."""
+        pendientes = self.variablesPorBloque
+        while pendientes > 0:
+            tipo = self.rng.choice(TIPOS)
+            declaradores = []
+            for _ in range(self.rng.randint(1, pendientes)):
+                nombre = self._nombre("v")
+                declaradores.append(f"{nombre} = {self._expresion(tipo, self.largoExpresion)}")
+                self._declarar(nombre, tipo)
+            self._emitir(nivel, f"{tipo} {', '.join(declaradores)};")
+            pendientes -= len(declaradores)
+
+    def _asignacion(self, nivel: int):
+        tipo = self.rng.choice(TIPOS)
+        destinos = [s for s in self._variables(tipo) if s[0] not in self.contadores]
+        destino = self.rng.choice(destinos)[0] if destinos else ("acc" if tipo == "int" else "accD")
+        expresion = self._expresion(tipo, self.largoExpresion)
+        if self._conError():
+            self.errores += 1
+            falla = self.rng.randrange(4)
+            if falla == 0: # falta el punto y coma
+                self._emitir(nivel, f"{destino} = {expresion}")
+            elif falla == 1: # paréntesis sin cerrar
+                self._emitir(nivel, f"{destino} = ({expresion};")
+            elif falla == 2: # identificador no declarado
+                self._emitir(nivel, f"{destino} = {expresion} + {self._nombre('noDeclarada')};")
+            else: # double asignado a un int
+                self._emitir(nivel, "acc = accD * 2;")
+            return
+        self._emitir(nivel, f"{destino} = {expresion};")
+
+    def _llamada(self, nivel: int):
+        funcion = self.rng.choice(self.llamables)
+        retorno, enteros, reales = self.firmas[funcion]
+        args = [self._expresion("int", 2) for _ in range(enteros)] + [self._expresion("double", 2) for _ in range(reales)]
+        llamada = f"{funcion}({', '.join(args)})"
+        if retorno == "int":
+            self._emitir(nivel, f"acc = acc + {llamada};")
+        elif retorno == "double":
+            self._emitir(nivel, f"accD = accD + {llamada};")
+        else:
+            self._emitir(nivel, f"{llamada};")
+
+    def _consumirNoUsadas(self, nivel: int):
+        """Cierra un contexto usando las variables que quedaron sin leer (así el programa no tiene avisos)."""
+        for nombre, tipo, usada in self.contextos[-1]:
+            if not usada:
+                acumulador = "acc" if tipo == "int" else "accD"
+                self._emitir(nivel, f"{acumulador} = {acumulador} + {nombre};")
+
+    def _bloque(self, nivel: int, cantidad: int, profundidad: int, previas: list = None):
+        self.contextos.append(previas or [])
+        self._declaraciones(nivel)
+        for _ in range(max(1, cantidad)):
+            if self.restantes <= 0:
+                break
+            self._instruccion(nivel, profundidad)
+        self._consumirNoUsadas(nivel)
+        self.contextos.pop()
+
+    def _instruccion(self, nivel: int, profundidad: int):
+        eleccion = self.rng.random()
+        anidable = profundidad < self.profundidad and self.restantes > 4
+        cuerpo = self.rng.randint(1, 4)
+
+        if anidable and eleccion < 0.12:
+            self._emitir(nivel, f"if ({self._condicion()}) {{")
+            self._bloque(nivel + 1, cuerpo, profundidad + 1)
+            if self.rng.random() < 0.5:
+                self._emitir(nivel, "} else {")
+                self._bloque(nivel + 1, cuerpo, profundidad + 1)
+            self._emitir(nivel, "}")
+        elif anidable and eleccion < 0.22:
+            contador = self._nombre("w")
+            self.contadores.add(contador)
+            self._emitir(nivel, f"int {contador} = 0;")
+            self._declarar(contador, "int")
+            self.contextos[-1][-1][2] = True
+            self._emitir(nivel, f"while ({contador} < {self.iteraciones}) {{")
+            self._bloque(nivel + 1, cuerpo, profundidad + 1)
+            self._emitir(nivel + 1, f"{contador} = {contador} + 1;")
+            self._emitir(nivel, "}")
+        elif anidable and eleccion < 0.32:
+            indice = self._nombre("i")
+            self.contadores.add(indice)
+            self._emitir(nivel, f"for (int {indice} = 0; {indice} < {self.iteraciones}; {indice}++) {{")
+            self._bloque(nivel + 1, cuerpo, profundidad + 1, [[indice, "int", True]])
+            self._emitir(nivel, "}")
+        elif anidable and eleccion < 0.36:
+            self._emitir(nivel, "{")
+            self._bloque(nivel + 1, cuerpo, profundidad + 1)
+            self._emitir(nivel, "}")
+        elif self.llamables and eleccion < 0.5:
+            self._llamada(nivel)
+        else:
+            self._asignacion(nivel)
+
+    # ------------------------------
+    # Funciones
+    # ------------------------------
+    def _firma(self, indice: int):
+        nombre = f"f{indice}"
+        retorno = self.rng.choice(["int", "int", "double", "void"])
+        self.firmas[nombre] = (retorno, self.rng.randint(0, 2), self.rng.randint(0, 1))
+        return nombre
+
+    def _parametros(self, nombre: str, conNombres: bool) -> tuple:
+        _, enteros, reales = self.firmas[nombre]
+        params = [("int", self._nombre("p")) for _ in range(enteros)] + [("double", self._nombre("p")) for _ in range(reales)]
+        texto = ", ".join(f"{tipo} {param}" if conNombres or self.rng.random() < 0.5 else tipo for tipo, param in params)
+        return params, texto
+
+    def _prototipo(self, nombre: str):
+        retorno = self.firmas[nombre][0]
+        _, texto = self._parametros(nombre, conNombres=False)
+        self._emitir(0, f"{retorno} {nombre}({texto});")
+
+    def _funcion(self, nombre: str, cantidad: int):
+        retorno = self.firmas[nombre][0]
+        params, texto = self._parametros(nombre, conNombres=True)
+        self._emitir(0, f"{retorno} {nombre}({texto}) {{")
+        self.contextos.append([[param, tipo, False] for tipo, param in params])
+        self._declaraciones(1)
+        # El cuerpo usa su parte del presupuesto, así el código global conserva la suya
+        presupuesto, self.restantes = self.restantes, cantidad
+        self._instruccion(1, 1)
+        while self.restantes > 0:
+            self._instruccion(1, 1)
+        self.restantes = presupuesto - cantidad
+        if retorno == "void":
+            self._consumirNoUsadas(1)
+            self._emitir(1, "return;")
+        else:
+            valor = self._expresion(retorno, self.largoExpresion)
+            self._consumirNoUsadas(1)
+            self._emitir(1, f"return {valor};")
+        self.contextos.pop()
+        self._emitir(0, "}")
+
+    # ------------------------------
+    # Programa
+    # ------------------------------
+    def generar(self) -> str:
+        self.lineas = []
+        self.restantes = self.instrucciones
+        self.contextos = [[["acc", "int", True], ["accD", "double", True]]]
+        self._emitir(0, "int acc = 0;")
+        self._emitir(0, "double accD = 0;")
+
+        nombres = [self._firma(i) for i in range(self.funciones)]
+        prototipadas = nombres[:self.prototipos]
+        definidasAntes = nombres[self.prototipos:]
+        porFuncion = max(1, self.instrucciones // (2 * max(1, self.funciones)))
+
+        for nombre in prototipadas:
+            self._prototipo(nombre)
+
+        # Las funciones sin prototipo se definen antes de usarse y no llaman a nadie: con llamadas en cadena
+        # dentro de ciclos, la cantidad de instrucciones ejecutadas crecería exponencialmente con las funciones
+        self.llamables = []
+        for nombre in definidasAntes:
+            self._funcion(nombre, porFuncion)
+
+        # El código global puede llamar a todo: las prototipadas se definen recién al final
+        self.llamables = definidasAntes + prototipadas
+        while self.restantes > 0:
+            self._instruccion(0, 0)
+        self._emitir(0, "acc = acc + 1;")
+        self._emitir(0, "accD = accD + acc;")
+
+        for nombre in prototipadas:
+            self.llamables = list(definidasAntes) # una prototipada solo llama a las definidas antes (no hay recursión)
+            self._funcion(nombre, porFuncion)
+        return "\n".join(self.lineas) + "\n"
+
+
+def generarPrograma(**config) -> str:
+    """Atajo: genera un programa con la configuración dada (ver GeneradorProgramas)."""
+    return GeneradorProgramas(**config).generar()
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Generador de programas sintéticos")
+    argumentos.add_argument("--instrucciones", type=int, default=200)
+    argumentos.add_argument("--profundidad", type=int, default=3)
+    argumentos.add_argument("--funciones", type=int, default=5)
+    argumentos.add_argument("--prototipos", type=int, default=2)
+    argumentos.add_argument("--largo-expresion", type=int, default=4)
+    argumentos.add_argument("--errores", type=float, default=0.0, help="densidad de errores por instrucción (0 a 1)")
+    argumentos.add_argument("--semilla", type=int, default=0)
+    argumentos.add_argument("-o", "--salida", default=None, help="archivo de salida (por defecto, la consola)")
+    args = argumentos.parse_args(argv[1:])
+
+    programa = generarPrograma(instrucciones=args.instrucciones, profundidad=args.profundidad, funciones=args.funciones,
+                               prototipos=args.prototipos, largoExpresion=args.largo_expresion,
+                               densidadErrores=args.errores, semilla=args.semilla)
+    if args.salida:
+        with open(args.salida, "w") as f:
+            f.write(programa)
+    else:
+        sys.stdout.write(programa)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
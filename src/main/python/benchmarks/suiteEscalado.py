@@ -0,0 +1,148 @@
+"""Suite de escalado del compilador sobre programas sintéticos.
+
+Genera programas con `generadorProgramas` y mide cada fase (léxico, sintáctico, semántico y
+volcado de la TS) con el perfilador de la compilación. Hace dos barridos:
+
+- tamaño: cantidad de instrucciones creciente con la misma forma de programa.
+- profundidad: el mismo tamaño con anidamiento creciente (lo que estresa la cadena de contextos).
+
+Para cada fase estima el exponente de crecimiento del tiempo respecto de los tokens y marca
+como SUPERLINEAL la que crece claramente más rápido que la entrada.
+
+Uso (desde src/main/python):
+    python benchmarks/suiteEscalado.py [--tamanos 500 1000 2000 4000] [--profundidades 1 4 8 16]
+        [--errores 0.0] [--repeticiones 3] [--memoria] [--tolerancia 1.25]
+"""
+import os
+import sys
+import argparse
+import math
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from antlr4 import InputStream
+from Compilador import compilarEntrada
+from CompileSession import CompileSession
+from Perfilador import Perfilador
+from generadorProgramas import generarPrograma
+
+FASES = ["lexico", "sintactico", "semantico", "exportTS", "total"]
+PISO_DE_RUIDO = 0.05 # una fase que nunca llega a este porcentaje del total no se evalúa: su tiempo es casi todo ruido
+
+
+def medirPrograma(fuente: str, rutaTS: str, repeticiones: int, memoria: bool) -> dict:
+    """Compila `fuente` varias veces y se queda con la corrida más rápida de cada fase (menos ruido)."""
+    mejor = None
+    for _ in range(repeticiones):
+        sesion = CompileSession(rutaTS=rutaTS, eco=False, perfilador=Perfilador(memoria=memoria))
+        resultado = compilarEntrada(InputStream(fuente), sesion)
+        fases = {f: datos["segundos"] for f, datos in resultado["perfil"]["fases"].items()}
+        if mejor is None:
+            mejor = {"tokens": resultado["tokens"], "lineas": resultado["lineas"], "errores": len(resultado["diagnosticos"]),
+                     "fallbackLL": resultado["fallbackLL"],
+                     "fases": fases, "picoMemoriaBytes": resultado["perfil"]["fases"]["total"]["picoMemoriaBytes"]}
+        else:
+            for fase, segundos in fases.items():
+                mejor["fases"][fase] = min(mejor["fases"].get(fase, segundos), segundos)
+    return mejor
+
+
+def exponente(muestras: list, fase: str) -> float:
+    """Pendiente de log(segundos) contra log(tokens) por mínimos cuadrados: 1 es lineal, 2 es cuadrático."""
+    puntos = [(math.log(m["tokens"]), math.log(m["fases"][fase])) for m in muestras if m["fases"].get(fase, 0) > 0]
+    if len(puntos) < 2:
+        return None
+    mediaX = sum(x for x, _ in puntos) / len(puntos)
+    mediaY = sum(y for _, y in puntos) / len(puntos)
+    varianza = sum((x - mediaX) ** 2 for x, _ in puntos)
+    if varianza == 0:
+        return None
+    return sum((x - mediaX) * (y - mediaY) for x, y in puntos) / varianza
+
+
+def imprimirTabla(titulo: str, etiqueta: str, muestras: list):
+    print(f"\n== {titulo} ==")
+    print(f"{etiqueta:>8} {'Líneas':>8} {'Tokens':>8} {'Errores':>8} {'LL':>3} " + " ".join(f"{f + ' (ms)':>15}" for f in FASES)
+          + f" {'tokens/s':>10} {'líneas/s':>10} {'µs/token':>9}")
+    for m in muestras:
+        total = m["fases"]["total"]
+        tiempos = " ".join(f"{m['fases'].get(f, 0.0) * 1000:>15.1f}" for f in FASES)
+        print(f"{m['parametro']:>8} {m['lineas']:>8} {m['tokens']:>8} {m['errores']:>8} {'sí' if m['fallbackLL'] else 'no':>3} {tiempos}"
+              f" {m['tokens'] / total:>10.0f} {m['lineas'] / total:>10.0f} {total * 1e6 / m['tokens']:>9.1f}")
+
+
+def despreciable(muestras: list, fase: str) -> bool:
+    return all(m["fases"].get(fase, 0.0) < PISO_DE_RUIDO * m["fases"]["total"] for m in muestras)
+
+
+def evaluarTamano(muestras: list, tolerancia: float) -> bool:
+    """Marca las fases cuyo exponente de crecimiento supera la tolerancia. Devuelve True si todas escalan linealmente."""
+    lineal = True
+    for fase in FASES:
+        k = exponente(muestras, fase)
+        if k is None or despreciable(muestras, fase):
+            continue
+        marca = "SUPERLINEAL" if k > tolerancia else "ok"
+        lineal &= k <= tolerancia
+        print(f"  {fase:<12} tiempo ~ tokens^{k:.2f}  [{marca}]")
+    return lineal
+
+
+def evaluarProfundidad(muestras: list, tolerancia: float) -> bool:
+    """Con el tamaño fijo, el costo por token no debería depender del anidamiento."""
+    lineal = True
+    for fase in FASES:
+        porToken = [m["fases"].get(fase, 0.0) / m["tokens"] for m in muestras]
+        if not porToken[0] or despreciable(muestras, fase):
+            continue
+        crecimiento = porToken[-1] / porToken[0]
+        marca = "SUPERLINEAL" if crecimiento > tolerancia else "ok"
+        lineal &= crecimiento <= tolerancia
+        print(f"  {fase:<12} costo por token x{crecimiento:.2f} de la menor a la mayor profundidad  [{marca}]")
+    return lineal
+
+
+def main(argv):
+    argumentos = argparse.ArgumentParser(description="Suite de escalado sobre programas sintéticos")
+    argumentos.add_argument("--tamanos", type=int, nargs="+", default=[500, 1000, 2000, 4000], help="instrucciones por programa")
+    argumentos.add_argument("--profundidades", type=int, nargs="+", default=[1, 4, 8, 16])
+    argumentos.add_argument("--instrucciones", type=int, default=2000, help="tamaño fijo del barrido de profundidad")
+    argumentos.add_argument("--funciones", type=int, default=8)
+    argumentos.add_argument("--largo-expresion", type=int, default=4)
+    argumentos.add_argument("--errores", type=float, default=0.0, help="densidad de errores inyectados (0 = programas válidos)")
+    argumentos.add_argument("--semilla", type=int, default=0)
+    argumentos.add_argument("--repeticiones", type=int, default=3)
+    argumentos.add_argument("--memoria", action="store_true", help="medir también el pico de memoria (más lento)")
+    argumentos.add_argument("--tolerancia", type=float, default=1.25,
+                            help="exponente (o crecimiento por token) a partir del cual una fase se marca como superlineal")
+    args = argumentos.parse_args(argv[1:])
+
+    config = {"funciones": args.funciones, "largoExpresion": args.largo_expresion,
+              "densidadErrores": args.errores, "semilla": args.semilla}
+    with tempfile.TemporaryDirectory() as directorio:
+        rutaTS = os.path.join(directorio, "ContenidoTS.txt")
+
+        porTamano = []
+        for tamano in args.tamanos:
+            fuente = generarPrograma(instrucciones=tamano, profundidad=3, **config)
+            porTamano.append({"parametro": tamano, **medirPrograma(fuente, rutaTS, args.repeticiones, args.memoria)})
+
+        porProfundidad = []
+        for profundidad in args.profundidades:
+            fuente = generarPrograma(instrucciones=args.instrucciones, profundidad=profundidad, **config)
+            porProfundidad.append({"parametro": profundidad, **medirPrograma(fuente, rutaTS, args.repeticiones, args.memoria)})
+
+    imprimirTabla("Barrido de tamaño", "Instr.", porTamano)
+    linealTamano = evaluarTamano(porTamano, args.tolerancia)
+    imprimirTabla(f"Barrido de profundidad ({args.instrucciones} instrucciones)", "Prof.", porProfundidad)
+    linealProfundidad = evaluarProfundidad(porProfundidad, args.tolerancia)
+
+    if args.memoria:
+        print("\nPico de memoria (total): " + ", ".join(f"{m['parametro']}: {m['picoMemoriaBytes'] / 1e6:.1f} MB" for m in porTamano))
+    return 0 if linealTamano and linealProfundidad else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -65,9 +65,9 @@ OTRO : . ;
 
 programa : instrucciones EOF ;
 
-instrucciones : instruccion instrucciones
-              |
-              ;
+// Las listas y las cadenas de operadores se escriben con repeticiones (*) en lugar de
+// recursión a derecha: así el árbol queda ancho y no tan profundo como largo es el programa
+instrucciones : instruccion* ;
 
 instruccion : asignacion
             | declaracion
@@ -130,27 +130,19 @@ test : opal
      ;
 
 // Lista de expresiones separadas por coma o vacío
-step: exp listStep
-     |
-     ;
-listStep : COMA step
-         |
-         ;
+step : (exp (COMA exp)*)? ;
 
 // ======= Declaraciones y asignación de variables =======
 
 declaracion : expDEC PYC ;
-expDEC: tipo ID inic listavar ;
+expDEC : tipo declarador (COMA declarador)* ;
+declarador : ID inic ;
 tipo : INT
      | DOUBLE
      | CHAR
      | VOID
      ;
 
-listavar : COMA ID inic listavar 
-         |
-         ;
-
 inic : ASIG opal 
      |
      ;
@@ -172,43 +164,18 @@ hora de leer, "ENTRAR" por "lo más grande" y ver cómo está formado).
 */
 
 // Operaciones lógicas
-expOR : expAND o; // Toda operación OR puede contener varias operaciones AND
-o : OR expAND o
-  |
-  ;
-
-expAND: expIGUALDAD a; // Las operaciones AND pueden necesitar resolver alguna operación de igualdad
-a : AND expIGUALDAD a
-  |
-  ;
-
-expIGUALDAD: expCOMP i; // Las igualdades pueden necesitar resolver alguna comparación primero
-i : IGUAL expCOMP i
-  | DISTINTO expCOMP i
-  |
-  ;
-
-expCOMP: exp c; // Las comparaciones pueden necesitar resolver alguna expresión aritmética primero
-c : MAYOR exp c
-  | MAYORIG exp c
-  | MENOR exp c
-  | MENORIG exp c
-  |
-  ;
+expOR : expAND (OR expAND)* ; // Toda operación OR puede contener varias operaciones AND
+
+expAND : expIGUALDAD (AND expIGUALDAD)* ; // Las operaciones AND pueden necesitar resolver alguna operación de igualdad
+
+expIGUALDAD : expCOMP ((IGUAL | DISTINTO) expCOMP)* ; // Las igualdades pueden necesitar resolver alguna comparación primero
+
+expCOMP : exp ((MAYOR | MAYORIG | MENOR | MENORIG) exp)* ; // Las comparaciones pueden necesitar resolver alguna expresión aritmética primero
 
 // Operaciones aritméticas
-exp : term e ; // Las expresiones aritméticas están formadas por uno o más términos
-e : SUMA term e
-  | RESTA term e
-  |
-  ;
-
-term : factor t ; // Los términos están formados por uno o más factores
-t : MULT factor t
-  | DIV factor t
-  | MOD factor t
-  |
-  ;
+exp : term ((SUMA | RESTA) term)* ; // Las expresiones aritméticas están formadas por uno o más términos
+
+term : factor ((MULT | DIV | MOD) factor)* ; // Los términos están formados por uno o más factores
 
 factor : (NOT | INC | DEC)? factorSufix; 
 factorSufix : factorCore (INC | DEC)? ;
@@ -6,21 +6,19 @@ class Contexto:
         self.nivel = 0 # Nivel de anidamiento del contexto (para impresión)
         self.declaraciones_permitidas = True # Control para permitir solo declaraciones al comienzo del contexto
 
-    def addSimbolo(self, simbolo: ID):
-        """Agrega un símbolo al contexto actual."""
+    def addSimbolo(self, simbolo: ID) -> bool:
+        """Agrega un símbolo al contexto actual. Devuelve False si ya existía uno con el mismo nombre."""
         nombre = simbolo.getNombre()
-        if self.buscarSimbolo(nombre) is None:  # Verifica si el símbolo ya existe
+        if nombre not in self.simbolos:  # Verifica si el símbolo ya existe
             self.simbolos[nombre] = simbolo
-        else:
-            print(f"El símbolo '{nombre}' ya existe en el contexto actual.")
-            # Acá podríamos lanzar una excepción
+            return True
+        print(f"El símbolo '{nombre}' ya existe en el contexto actual.")
+        # Acá podríamos lanzar una excepción
+        return False
 
     def buscarSimbolo(self, nombre: str) -> ID:
         """Busca un símbolo en el contexto actual."""
-        for identificador in self.simbolos:
-            if identificador == nombre:
-                return self.simbolos[identificador]
-        return None  # Si no se encuentra el símbolo
+        return self.simbolos.get(nombre)  # None si no se encuentra el símbolo
 
     def canDeclarar(self) -> bool:
         """Devuelve True si aún se permiten declaraciones en este contexto."""
@@ -0,0 +1,235 @@
+"""Formatos de exportación de la tabla de símbolos.
+
+Cada exportador arma el contenido completo en memoria (str o bytes) y recién después se escribe,
+de una sola vez, en la ruta que elija quien compila (ver CompileSession.exportarTS).
+
+- texto: el ContenidoTS.txt de siempre, con la jerarquía de contextos indentada.
+- json: los mismos datos como documento JSON (ver datosTS).
+- binario: un formato compacto con los nombres y tipos en una tabla de strings y enteros como
+  varints (ver leerBinario).
+"""
+import json
+from tablaDeSimbolos.Variable import Variable
+
+
+def datosTS(ts) -> dict:
+    """La TS como estructura de datos: contextos en orden de creación, cada uno con sus símbolos en orden de declaración."""
+    contextos = []
+    for idx, contexto in enumerate(ts.historialCTX):
+        simbolos = []
+        for nombre, simbolo in contexto.simbolos.items():
+            funcion = not isinstance(simbolo, Variable)
+            simbolos.append({
+                "nombre": nombre,
+                "tipo": simbolo.tipoDato,
+                "funcion": funcion,
+                "inicializado": simbolo.inicializado,
+                "usado": simbolo.usado,
+                "argumentos": [arg.tipoDato for arg in simbolo.getListaArgs()] if funcion else None,
+            })
+        contextos.append({"indice": idx, "nivel": contexto.nivel, "simbolos": simbolos})
+    return {"contextos": contextos}
+
+
+class ExportadorTS:
+    """Interfaz de los exportadores: `exportar` arma la TS y `exportarError` el aviso de que no se pudo generar."""
+    formato = None
+    extension = None
+    binario = False # el contenido es bytes (se escribe en modo binario)
+
+    def exportar(self, ts):
+        raise NotImplementedError
+
+    def exportarError(self, mensaje: str):
+        raise NotImplementedError
+
+    def escribir(self, contenido, ruta: str):
+        """Escribe el contenido ya armado en una única escritura."""
+        if self.binario:
+            with open(ruta, "wb") as f:
+                f.write(contenido)
+        else:
+            with open(ruta, "w") as f:
+                f.write(contenido)
+
+
+class ExportadorTexto(ExportadorTS):
+    formato = "texto"
+    extension = ".txt"
+
+    def exportar(self, ts) -> str:
+        if not ts.historialCTX:
+            return "Tabla de símbolos vacía.\n"
+
+        # Las columnas de tipo y banderas se repiten mucho: se rellenan una sola vez por valor distinto
+        columnas = {True: f"{'True':<12} ", False: f"{'False':<12} "}
+        usados = {True: f"{'True':<6} ", False: f"{'False':<6} "}
+        tipos = {}
+        lineas = []
+        for idx, contexto in enumerate(ts.historialCTX):
+            prefijo = '    ' * contexto.nivel
+            lineas.append(f"{prefijo}--- Contexto #{idx} (nivel {contexto.nivel}) ---")
+
+            if not contexto.simbolos:
+                lineas.append(f"{prefijo}(vacío)")
+                continue
+
+            lineas.append(f"{prefijo}{'Nombre':<20} {'Tipo':<12} {'Inicializado':<12} {'Usado':<6} Argumentos")
+            for nombre, simbolo in contexto.simbolos.items():
+                if isinstance(simbolo, Variable):
+                    argumentos = "N/A"
+                else:
+                    argumentos = ', '.join([arg.tipoDato for arg in simbolo.getListaArgs()]) if simbolo.getListaArgs() else "void"
+                tipo = tipos.get(simbolo.tipoDato)
+                if tipo is None:
+                    tipo = tipos[simbolo.tipoDato] = f"{str(simbolo.tipoDato):<12} "
+                lineas.append(f"{prefijo}{nombre:<20} {tipo}{columnas[simbolo.inicializado]}{usados[simbolo.usado]}{argumentos}")
+        lineas.append("")
+        return "\n".join(lineas)
+
+    def exportarError(self, mensaje: str) -> str:
+        return mensaje + "\n"
+
+
+class ExportadorJSON(ExportadorTS):
+    formato = "json"
+    extension = ".json"
+
+    def exportar(self, ts) -> str:
+        return json.dumps(datosTS(ts), ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def exportarError(self, mensaje: str) -> str:
+        return json.dumps({"error": mensaje, "contextos": []}, ensure_ascii=False) + "\n"
+
+
+# Formato binario:
+#   MAGIA, versión (1 byte), estado (1 byte: 0 = TS, 1 = error)
+#   error: el mensaje (string)
+#   TS:    cantidad de strings, cada string (largo en bytes + UTF-8);
+#          cantidad de contextos, cada uno con su nivel, la cantidad de símbolos y cada símbolo:
+#          nombre, tipo (índices en la tabla; el tipo va +1, 0 = sin tipo), banderas (1 byte)
+#          y, si es función, la cantidad de argumentos y el tipo de cada uno.
+# Todos los enteros son varints (7 bits por byte, el bit alto indica que sigue otro byte).
+MAGIA = b"DHTS"
+VERSION_BINARIO = 1
+_INICIALIZADO, _USADO, _FUNCION = 1, 2, 4
+
+
+def _varint(salida: bytearray, n: int):
+    while n >= 0x80:
+        salida.append((n & 0x7F) | 0x80)
+        n >>= 7
+    salida.append(n)
+
+
+class ExportadorBinario(ExportadorTS):
+    formato = "binario"
+    extension = ".bin"
+    binario = True
+
+    def exportar(self, ts) -> bytes:
+        strings = {} # string -> índice en la tabla
+        def indice(s: str) -> int:
+            i = strings.get(s)
+            if i is None:
+                i = strings[s] = len(strings)
+            return i
+        def tipo(t) -> int:
+            return 0 if t is None else indice(t) + 1
+
+        cuerpo = bytearray()
+        _varint(cuerpo, len(ts.historialCTX))
+        for contexto in ts.historialCTX:
+            _varint(cuerpo, contexto.nivel)
+            _varint(cuerpo, len(contexto.simbolos))
+            for nombre, simbolo in contexto.simbolos.items():
+                funcion = not isinstance(simbolo, Variable)
+                _varint(cuerpo, indice(nombre))
+                _varint(cuerpo, tipo(simbolo.tipoDato))
+                cuerpo.append((_INICIALIZADO if simbolo.inicializado else 0) | (_USADO if simbolo.usado else 0) | (_FUNCION if funcion else 0))
+                if funcion:
+                    args = simbolo.getListaArgs()
+                    _varint(cuerpo, len(args))
+                    for arg in args:
+                        _varint(cuerpo, tipo(arg.tipoDato))
+
+        salida = bytearray(MAGIA)
+        salida += bytes((VERSION_BINARIO, 0))
+        _varint(salida, len(strings))
+        for s in strings: # los dict conservan el orden de inserción: el de los índices
+            codificado = s.encode("utf-8")
+            _varint(salida, len(codificado))
+            salida += codificado
+        salida += cuerpo
+        return bytes(salida)
+
+    def exportarError(self, mensaje: str) -> bytes:
+        codificado = mensaje.encode("utf-8")
+        salida = bytearray(MAGIA)
+        salida += bytes((VERSION_BINARIO, 1))
+        _varint(salida, len(codificado))
+        salida += codificado
+        return bytes(salida)
+
+
+def leerBinario(datos: bytes) -> dict:
+    """Decodifica lo que genera ExportadorBinario, con la misma forma que datosTS (o {"error": ..., "contextos": []})."""
+    if datos[:len(MAGIA)] != MAGIA or datos[len(MAGIA)] != VERSION_BINARIO:
+        raise ValueError("no es una TS en formato binario (o es de otra versión)")
+    posicion = len(MAGIA) + 2
+
+    def leer() -> int:
+        nonlocal posicion
+        n = desplazamiento = 0
+        while True:
+            byte = datos[posicion]
+            posicion += 1
+            n |= (byte & 0x7F) << desplazamiento
+            if byte < 0x80:
+                return n
+            desplazamiento += 7
+
+    def leerString() -> str:
+        nonlocal posicion
+        largo = leer()
+        posicion += largo
+        return datos[posicion - largo:posicion].decode("utf-8")
+
+    if datos[len(MAGIA) + 1] == 1:
+        return {"error": leerString(), "contextos": []}
+
+    strings = [leerString() for _ in range(leer())]
+    def tipo() -> str:
+        i = leer()
+        return strings[i - 1] if i else None
+
+    contextos = []
+    for idx in range(leer()):
+        nivel = leer()
+        simbolos = []
+        for _ in range(leer()):
+            nombre = strings[leer()]
+            tipoDato = tipo()
+            banderas = datos[posicion]
+            posicion += 1
+            funcion = bool(banderas & _FUNCION)
+            simbolos.append({
+                "nombre": nombre,
+                "tipo": tipoDato,
+                "funcion": funcion,
+                "inicializado": bool(banderas & _INICIALIZADO),
+                "usado": bool(banderas & _USADO),
+                "argumentos": [tipo() for _ in range(leer())] if funcion else None,
+            })
+        contextos.append({"indice": idx, "nivel": nivel, "simbolos": simbolos})
+    return {"contextos": contextos}
+
+
+EXPORTADORES = {exportador.formato: exportador for exportador in (ExportadorTexto, ExportadorJSON, ExportadorBinario)}
+
+
+def exportadorTS(formato: str = "texto") -> ExportadorTS:
+    """El exportador de un formato ("texto", "json" o "binario")."""
+    if formato not in EXPORTADORES:
+        raise ValueError(f"formato de TS desconocido: {formato} (se espera uno de {', '.join(EXPORTADORES)})")
+    return EXPORTADORES[formato]()
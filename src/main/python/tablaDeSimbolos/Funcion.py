@@ -11,6 +11,8 @@ class Funcion(ID):
     - (inicializado, usado) están definidos en la clase base ID y representan si es definición/prototipo y si fue llamada.
     """
 
+    __slots__ = ("args",)
+
     def __init__(self, nombre: str, tipoDato: str, args: Optional[List[Variable]] = None, inicializado: bool = False):
         # ID espera (nombre, tipoDato)
         super().__init__(nombre, tipoDato)
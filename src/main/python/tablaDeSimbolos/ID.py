@@ -1,4 +1,7 @@
 class ID:
+    # Los registros de la TS se crean por cada declaración: __slots__ evita un dict por instancia
+    __slots__ = ("nombre", "tipoDato", "inicializado", "usado")
+
     def __init__(self, nombre: str, tipoDato: str):
         self.nombre = nombre
         self.tipoDato = tipoDato
@@ -1,4 +1,4 @@
 from tablaDeSimbolos.ID import ID
 
 class Variable(ID) : 
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file